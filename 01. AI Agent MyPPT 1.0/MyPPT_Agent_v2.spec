@@ -5,7 +5,7 @@ a = Analysis(
     ['gui_v2.py'],
     pathex=[],
     binaries=[],
-    datas=[('makeppt001_1.ico', '.')],
+    datas=[('makeppt001_1.ico', '.'), ('hymnal_new.tsv', '.')],
     hiddenimports=[],
     hookspath=[],
     hooksconfig={},
@@ -0,0 +1,157 @@
+"""
+HTML 파싱 백엔드 벤치마크
+저장된 샘플 페이지로 백엔드별 페이지당 파싱 비용을 측정하고,
+추출 결과가 'full'(기존 전체 트리 방식)과 동일한지 확인합니다.
+
+기본 샘플(fixtures/pages)은 저장소에 포함되어 있습니다. 실제 페이지 구조(검색 결과 목록,
+본문 article 유무, 첨부파일 블록)를 따르되 블로그 고유 정보는 뺀 정리본입니다.
+
+사용법:
+  python bench_html_parser.py                       # 샘플 폴더(fixtures/pages)로 벤치마크
+  python bench_html_parser.py --repeat 50 --dir 경로
+  python bench_html_parser.py --record "새찬송가 ppt 28장" "찬송하라 여호와의 종들아"
+      → 실제 사이트에서 검색 결과/게시물 페이지를 받아 샘플로 저장
+"""
+
+import argparse
+import json
+import os
+import re
+import statistics
+import time
+from urllib.parse import quote
+
+import html_parser
+import http_client
+from song_search import (SEARCH_URL, CWY_SEARCH_URL, parse_getwater_results,
+                         parse_cwy0675_results, parse_download_info)
+
+DEFAULT_SAMPLE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "pages")
+MANIFEST_NAME = "manifest.json"
+
+# 샘플 종류별 추출 함수 (keyword가 필요 없는 게시물 페이지는 무시)
+EXTRACTORS = {
+    'getwater': lambda html, keyword: parse_getwater_results(html, keyword),
+    'cwy0675': lambda html, keyword: parse_cwy0675_results(html, keyword),
+    'post': lambda html, keyword: parse_download_info(html),
+}
+
+
+def load_manifest(sample_dir):
+    path = os.path.join(sample_dir, MANIFEST_NAME)
+    if not os.path.exists(path):
+        return []
+    with open(path, encoding='utf-8') as f:
+        return json.load(f)
+
+
+def save_manifest(sample_dir, entries):
+    with open(os.path.join(sample_dir, MANIFEST_NAME), 'w', encoding='utf-8') as f:
+        json.dump(entries, f, ensure_ascii=False, indent=2)
+
+
+def record_samples(keywords, sample_dir, posts_per_source=2):
+    """실제 사이트에서 검색/게시물 페이지를 받아 샘플 폴더에 저장합니다."""
+    os.makedirs(sample_dir, exist_ok=True)
+    entries = load_manifest(sample_dir)
+    known_files = {e['file'] for e in entries}
+
+    def save(kind, keyword, name, html):
+        filename = re.sub(r'[^\w.-]+', '_', name) + ".html"
+        with open(os.path.join(sample_dir, filename), 'w', encoding='utf-8') as f:
+            f.write(html)
+        if filename not in known_files:
+            known_files.add(filename)
+            entries.append({'file': filename, 'kind': kind, 'keyword': keyword})
+        print(f"  저장: {filename}")
+
+    for keyword in keywords:
+        print(f"[기록] {keyword}")
+        for kind, url_format in (('getwater', SEARCH_URL), ('cwy0675', CWY_SEARCH_URL)):
+            response = http_client.get(url_format.format(keyword=quote(keyword)))
+            response.raise_for_status()
+            save(kind, keyword, f"{kind}_search_{keyword}", response.text)
+
+            results = EXTRACTORS[kind](response.text, keyword)
+            for result in results[:posts_per_source]:
+                post_response = http_client.get(result['url'])
+                post_response.raise_for_status()
+                post_id = result['url'].rstrip('/').rsplit('/', 1)[-1]
+                save('post', keyword, f"post_{kind}_{post_id}", post_response.text)
+
+    save_manifest(sample_dir, entries)
+
+
+def run_benchmark(sample_dir, repeat):
+    entries = load_manifest(sample_dir)
+    missing = sorted({e['file'] for e in entries
+                      if not os.path.exists(os.path.join(sample_dir, e['file']))})
+    if not entries or missing:
+        print(f"샘플이 없습니다: {sample_dir}" + (f" (없는 파일: {', '.join(missing)})" if missing else ""))
+        print("기본 샘플은 저장소의 fixtures/pages 폴더에 있습니다. 다른 폴더를 쓰려면")
+        print(f"  python bench_html_parser.py --record \"새찬송가 ppt 28장\" --dir {sample_dir}")
+        print("로 실제 사이트에서 샘플을 받은 뒤 다시 실행하세요. (manifest.json이 함께 만들어짐)")
+        return 1
+
+    pages = []
+    for entry in entries:
+        with open(os.path.join(sample_dir, entry['file']), encoding='utf-8') as f:
+            pages.append((entry, f.read()))
+
+    backends = [b for b in html_parser.BACKENDS if b != 'lxml' or html_parser.HAS_LXML]
+    original_backend = html_parser.get_backend()
+    expected = {}
+    mismatches = 0
+
+    print(f"샘플 {len(pages)}개, 반복 {repeat}회")
+    print(f"{'백엔드':<10} {'종류':<10} {'페이지당(ms)':>12} {'중앙값(ms)':>12}")
+
+    try:
+        for backend in backends:
+            html_parser.set_backend(backend)
+            timings = {}
+
+            for entry, html in pages:
+                extract = EXTRACTORS[entry['kind']]
+                result = extract(html, entry['keyword'])
+
+                # 'full' 결과를 기준으로 동일 여부 확인
+                key = (entry['file'], entry['keyword'])
+                if backend == 'full':
+                    expected[key] = result
+                elif result != expected[key]:
+                    mismatches += 1
+                    print(f"  [불일치] {backend}: {entry['file']}")
+
+                samples = []
+                for _ in range(repeat):
+                    start = time.perf_counter()
+                    extract(html, entry['keyword'])
+                    samples.append((time.perf_counter() - start) * 1000)
+                timings.setdefault(entry['kind'], []).extend(samples)
+
+            for kind, samples in sorted(timings.items()):
+                print(f"{backend:<10} {kind:<10} {statistics.mean(samples):>12.2f} "
+                      f"{statistics.median(samples):>12.2f}")
+    finally:
+        html_parser.set_backend(original_backend)
+
+    if mismatches:
+        print(f"결과 불일치 {mismatches}건")
+        return 1
+    print("모든 백엔드의 추출 결과가 기존 방식과 동일합니다.")
+    return 0
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="HTML 파싱 백엔드 벤치마크")
+    arg_parser.add_argument('--dir', default=DEFAULT_SAMPLE_DIR, help="샘플 페이지 폴더")
+    arg_parser.add_argument('--repeat', type=int, default=20, help="페이지당 반복 횟수")
+    arg_parser.add_argument('--record', nargs='+', metavar='KEYWORD',
+                            help="실제 사이트에서 샘플 페이지를 받아 저장할 검색어")
+    args = arg_parser.parse_args()
+
+    if args.record:
+        record_samples(args.record, args.dir)
+    else:
+        raise SystemExit(run_benchmark(args.dir, args.repeat))
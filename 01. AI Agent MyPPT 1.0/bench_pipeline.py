@@ -0,0 +1,137 @@
+"""
+찬송가/성경 처리량 벤치마크
+replay_server에 녹화된 응답으로 실제 작업 흐름을 반복 실행하여 지연 시간과 처리량을 측정합니다.
+
+  - 찬송가 작업: 검색(search_songs) → 다운로드 정보(get_download_info) → 첨부파일 받기(download_file)
+  - 성경 작업: search_and_get_verse
+
+매번 네트워크(재생 서버) 경로로 처리하도록 다음을 끄고 측정하므로, 최적화 전후 비교에 사용합니다.
+  - 검색 결과/다운로드 정보 캐시, 파일 보관소 (use_cache=False, use_store=False)
+  - 페이지 조건부 요청 캐시 (http_client.set_page_cache_enabled(False) - 304 재검증 없이 항상 본문 수신)
+  - 사이트별 요청 제한 (SourceAdapter.set_rate_limit(None) - 초당 2회 제한이 처리량 상한이 되지 않도록)
+  실제 앱은 위 캐시와 요청 제한을 모두 사용하므로, 결과는 캐시가 비었을 때의 최악 경로에 해당합니다.
+실제 캐시를 건드리지 않도록 임시 데이터 폴더에서 실행합니다.
+
+녹화 응답은 fixtures/replay에 함께 배포됩니다. (샘플 검색어 "새찬송가 ppt 28장", 성경 "요 3:16")
+실제 사이트로 다시 녹화하려면:
+  python replay_server.py record --keywords "새찬송가 ppt 28장" --verses "요 3:16"
+
+사용법:
+  python bench_pipeline.py --concurrency 4 --iterations 5 --latency 0.05 --jitter 0.02
+"""
+
+import argparse
+import os
+import shutil
+import statistics
+import tempfile
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+import http_client
+from cache_store import DATA_DIR_ENV
+from replay_server import DEFAULT_FIXTURE_DIR, ReplayServer, ReplayStore
+
+
+def _percentile(samples, percent):
+    ordered = sorted(samples)
+    index = min(len(ordered) - 1, max(0, int(round(percent / 100 * len(ordered))) - 1))
+    return ordered[index]
+
+
+def run_benchmark(fixture_dir, concurrency, iterations, latency, jitter, error_rate):
+    store = ReplayStore(fixture_dir)
+    if not store.entries:
+        print(f"녹화된 응답이 없습니다: {fixture_dir}")
+        print("먼저 python replay_server.py record --keywords ... --verses ... 로 녹화하세요.")
+        return 1
+
+    work_dir = tempfile.mkdtemp(prefix="myppt_bench_")
+    os.environ[DATA_DIR_ENV] = os.path.join(work_dir, "data")
+
+    # 데이터 폴더를 바꾼 뒤에 불러와야 모듈 캐시가 임시 폴더에 만들어짐
+    from bible_search import search_and_get_verse
+    from song_search import search_songs, get_download_info, download_file
+    from song_sources import get_source, source_names
+
+    server = ReplayServer(store, latency=latency, jitter=jitter, error_rate=error_rate).start()
+    http_client.use_replay_server(server.base_url)
+    http_client.set_page_cache_enabled(False)
+    adapters = [get_source(name) for name in source_names()]
+    for adapter in adapters:
+        adapter.set_rate_limit(None)
+
+    def hymn_job(keyword, n):
+        results = search_songs(keyword, use_cache=False)
+        if not results:
+            raise RuntimeError(f"검색 결과 없음: {keyword}")
+        info = get_download_info(results[0]['url'], use_cache=False)
+        if not info['download_url']:
+            raise RuntimeError(f"다운로드 링크 없음: {results[0]['url']}")
+        save_path = os.path.join(work_dir, "downloads", f"{n}_{info['filename']}")
+        download_file(info['download_url'], save_path, use_store=False)
+
+    def verse_job(reference, n):
+        verse_text, formatted_ref = search_and_get_verse(reference)
+        if formatted_ref is None:
+            raise RuntimeError(verse_text)
+
+    jobs = []
+    for i in range(iterations):
+        jobs += [('찬송가', hymn_job, keyword) for keyword in store.keywords]
+        jobs += [('성경', verse_job, reference) for reference in store.verses]
+
+    def timed(n, func, arg):
+        start = time.perf_counter()
+        func(arg, n)
+        return time.perf_counter() - start
+
+    print(f"작업 {len(jobs)}개 (반복 {iterations}회), 동시 실행 {concurrency}, "
+          f"지연 {latency * 1000:.0f}±{jitter * 1000:.0f}ms, 오류율 {error_rate:.0%}")
+
+    timings = {}
+    errors = {}
+    started = time.perf_counter()
+    try:
+        with ThreadPoolExecutor(max_workers=concurrency) as executor:
+            futures = {executor.submit(timed, n, func, arg): kind for n, (kind, func, arg) in enumerate(jobs)}
+            for future in as_completed(futures):
+                kind = futures[future]
+                try:
+                    timings.setdefault(kind, []).append(future.result() * 1000)
+                except Exception as e:
+                    errors[kind] = errors.get(kind, 0) + 1
+                    print(f"  [실패] {kind}: {e}")
+        elapsed = time.perf_counter() - started
+    finally:
+        for adapter in adapters:
+            adapter.set_rate_limit(adapter.rate_limit)
+        http_client.set_page_cache_enabled(True)
+        http_client.set_url_rewriter(None)
+        server.stop()
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    print(f"{'작업':<6} {'성공':>6} {'실패':>6} {'p50(ms)':>10} {'p95(ms)':>10}")
+    for kind in sorted(set(timings) | set(errors)):
+        samples = timings.get(kind, [])
+        p50 = f"{statistics.median(samples):.1f}" if samples else "-"
+        p95 = f"{_percentile(samples, 95):.1f}" if samples else "-"
+        print(f"{kind:<6} {len(samples):>6} {errors.get(kind, 0):>6} {p50:>10} {p95:>10}")
+
+    done = sum(len(samples) for samples in timings.values())
+    print(f"전체 {elapsed:.2f}초, 처리량 {done / elapsed:.2f}건/초")
+    return 1 if errors and not error_rate else 0
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="찬송가/성경 처리량 벤치마크 (녹화 응답 재생)")
+    arg_parser.add_argument('--dir', default=DEFAULT_FIXTURE_DIR, help="녹화 폴더")
+    arg_parser.add_argument('--concurrency', type=int, default=4, help="동시 실행 작업 수")
+    arg_parser.add_argument('--iterations', type=int, default=3, help="녹화된 작업 전체 반복 횟수")
+    arg_parser.add_argument('--latency', type=float, default=0.0, help="응답 지연(초)")
+    arg_parser.add_argument('--jitter', type=float, default=0.0, help="지연 흔들림(초)")
+    arg_parser.add_argument('--error-rate', type=float, default=0.0, help="오류 주입 확률 (0~1)")
+    args = arg_parser.parse_args()
+
+    raise SystemExit(run_benchmark(args.dir, args.concurrency, args.iterations,
+                                   args.latency, args.jitter, args.error_rate))
@@ -7,6 +7,8 @@ import re
 import requests
 from bs4 import BeautifulSoup
 
+import http_client
+
 # Mapping of Korean abbreviations to book codes
 BOOK_MAPPING = {
     # 구약 (Old Testament)
@@ -144,7 +146,8 @@ def fetch_bible_verse(book_code, chapter, start_verse, end_verse=None):
     }
 
     try:
-        response = requests.get(url, params=params, timeout=10)
+        # 장 본문은 거의 바뀌지 않으므로 조건부 요청으로 재검증 (304면 저장된 본문 사용)
+        response = http_client.get_cached(url, params=params, encoding='utf-8', timeout=10)
         response.raise_for_status()
         response.encoding = 'utf-8'
 
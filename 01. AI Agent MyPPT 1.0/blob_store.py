@@ -0,0 +1,259 @@
+"""
+내용 주소 파일 저장소 모듈
+다운로드한 찬송가 파일을 SHA-256 해시 이름으로 한 번만 보관하고,
+저장 폴더의 번호 붙은 파일(예: "3. 28장 ....ppt")은 보관본의 하드링크(불가능하면 복사본)로 만듭니다.
+같은 찬송가를 다음 주에 다른 번호로 받아도 변경 확인(304) 요청만 보내고 본문 전송과 추가 디스크 사용이 없습니다.
+
+색인:
+  - urls  : 첨부파일 URL → SHA-256, 받을 때의 검증값(ETag/Last-Modified)
+            (같은 URL에 파일이 다시 올라왔을 수 있으므로 보관본을 쓰기 전에 조건부 요청으로 확인)
+  - blobs : SHA-256 → 크기, 수정 시각(하드링크된 파일이 편집되었는지 확인용), 마지막 사용 시각
+
+저장 위치: <데이터 폴더>/blobs/<해시 앞 2자리>/<해시>
+"""
+
+import hashlib
+import os
+import shutil
+import sqlite3
+import threading
+import time
+
+from cache_store import get_data_dir
+
+BLOB_DIR_NAME = "blobs"
+BLOB_DB_NAME = "blob_index.db"
+BLOB_STORE_MAX_BYTES = 5 * 1024 * 1024 * 1024  # 5GB 초과 시 오래 사용하지 않은 파일부터 제거
+HASH_CHUNK_SIZE = 1024 * 1024
+
+_store = None
+_store_lock = threading.Lock()
+
+
+def file_sha256(path):
+    """파일의 SHA-256 해시 (16진수 문자열)"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(HASH_CHUNK_SIZE), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+
+def link_or_copy(src, dest):
+    """
+    dest를 src의 하드링크로 만듭니다. (다른 드라이브/하드링크 미지원 파일시스템이면 복사)
+
+    Returns:
+        str: 'link' 또는 'copy'
+    """
+    if os.path.exists(dest):
+        os.remove(dest)
+    try:
+        os.link(src, dest)
+        return 'link'
+    except OSError:
+        shutil.copy2(src, dest)
+        return 'copy'
+
+
+class BlobStore:
+    """SHA-256으로 주소가 정해지는 파일 보관소"""
+
+    def __init__(self, root=None, max_bytes=BLOB_STORE_MAX_BYTES):
+        self.root = root or os.path.join(get_data_dir(), BLOB_DIR_NAME)
+        self.max_bytes = max_bytes
+        os.makedirs(self.root, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(os.path.join(self.root, BLOB_DB_NAME), timeout=10,
+                                     check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS blobs ("
+                "sha256 TEXT PRIMARY KEY, "
+                "size INTEGER NOT NULL, "
+                "mtime_ns INTEGER NOT NULL, "
+                "last_used REAL NOT NULL)"
+            )
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS urls ("
+                "url TEXT PRIMARY KEY, "
+                "sha256 TEXT NOT NULL, "
+                "etag TEXT, "
+                "last_modified TEXT)"
+            )
+            # 검증값 열이 없던 이전 색인 (기존 항목은 검증값 없음 → 다음 다운로드 때 새로 받아 기록)
+            columns = {row[1] for row in self._conn.execute("PRAGMA table_info(urls)")}
+            for column in ('etag', 'last_modified'):
+                if column not in columns:
+                    self._conn.execute(f"ALTER TABLE urls ADD COLUMN {column} TEXT")
+            self._conn.commit()
+
+    def blob_path(self, sha256):
+        return os.path.join(self.root, sha256[:2], sha256)
+
+    def _is_intact(self, sha256, size, mtime_ns):
+        """보관본이 기록 당시 그대로인지 (하드링크된 저장 파일을 직접 편집하면 보관본도 바뀜)"""
+        try:
+            stat = os.stat(self.blob_path(sha256))
+        except OSError:
+            return False
+        return stat.st_size == size and stat.st_mtime_ns == mtime_ns
+
+    def _forget(self, sha256):
+        with self._lock:
+            self._conn.execute("DELETE FROM blobs WHERE sha256 = ?", (sha256,))
+            self._conn.execute("DELETE FROM urls WHERE sha256 = ?", (sha256,))
+            self._conn.commit()
+        try:
+            os.remove(self.blob_path(sha256))
+        except OSError:
+            pass
+
+    def lookup_url(self, url):
+        """
+        URL로 받은 적 있는 파일의 보관본 경로를 찾습니다.
+
+        Returns:
+            str: 보관본 경로 또는 None (받은 적 없음 / 보관본이 바뀌었거나 삭제됨)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT b.sha256, b.size, b.mtime_ns FROM urls u JOIN blobs b ON u.sha256 = b.sha256 "
+                "WHERE u.url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return None
+
+        sha256, size, mtime_ns = row
+        if not self._is_intact(sha256, size, mtime_ns):
+            self._forget(sha256)
+            return None
+
+        with self._lock:
+            self._conn.execute("UPDATE blobs SET last_used = ? WHERE sha256 = ?", (time.time(), sha256))
+            self._conn.commit()
+        return self.blob_path(sha256)
+
+    def has_url(self, url):
+        """URL의 보관본이 색인에 있는지 (사용 시각은 바꾸지 않음)"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM urls u JOIN blobs b ON u.sha256 = b.sha256 WHERE u.url = ?", (url,)
+            ).fetchone()
+        return row is not None
+
+    def validators(self, url):
+        """
+        URL을 받을 때 기록한 검증값
+
+        Returns:
+            dict: {'etag', 'last_modified'} 또는 None (보관본이 없거나 검증값이 없음)
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT u.etag, u.last_modified FROM urls u JOIN blobs b ON u.sha256 = b.sha256 "
+                "WHERE u.url = ?", (url,)
+            ).fetchone()
+        if row is None or not (row[0] or row[1]):
+            return None
+        return {'etag': row[0], 'last_modified': row[1]}
+
+    def add_file(self, path, url=None, etag=None, last_modified=None):
+        """
+        다운로드한 파일을 보관소에 등록합니다.
+        같은 내용이 없으면 path를 하드링크(또는 복사)해서 보관본을 만들고, URL 색인을 기록합니다.
+
+        Args:
+            path: 받은 파일 경로
+            url: 첨부파일 URL (생략하면 내용만 보관)
+            etag, last_modified: 응답의 검증값 (다음에 보관본을 쓰기 전 조건부 요청에 사용)
+
+        Returns:
+            str: 파일의 SHA-256
+        """
+        sha256 = file_sha256(path)
+        blob = self.blob_path(sha256)
+
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT size, mtime_ns FROM blobs WHERE sha256 = ?", (sha256,)
+            ).fetchone()
+
+        if row is None or not self._is_intact(sha256, *row):
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            link_or_copy(path, blob)
+            stat = os.stat(blob)
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO blobs (sha256, size, mtime_ns, last_used) VALUES (?, ?, ?, ?)",
+                    (sha256, stat.st_size, stat.st_mtime_ns, time.time())
+                )
+                self._conn.commit()
+
+        if url:
+            with self._lock:
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO urls (url, sha256, etag, last_modified) VALUES (?, ?, ?, ?)",
+                    (url, sha256, etag, last_modified)
+                )
+                self._conn.commit()
+
+        self._evict()
+        return sha256
+
+    def materialize(self, url, dest, validate=None):
+        """
+        URL로 받은 적 있는 파일을 dest에 하드링크(또는 복사)합니다.
+
+        Args:
+            url: 첨부파일 URL
+            dest: 만들 파일 경로
+            validate: 연결 전에 보관본을 검사하는 함수 (path) -> None, 실패 시 예외
+                      검사에 실패한 보관본은 보관소에서 지우고 예외를 그대로 발생시킴
+
+        Returns:
+            str: 'link' / 'copy', 보관본이 없으면 None
+        """
+        blob = self.lookup_url(url)
+        if blob is None:
+            return None
+        if validate is not None:
+            try:
+                validate(blob)
+            except Exception:
+                self._forget(os.path.basename(blob))
+                raise
+        dest_dir = os.path.dirname(dest)
+        if dest_dir:
+            os.makedirs(dest_dir, exist_ok=True)
+        return link_or_copy(blob, dest)
+
+    def total_size(self):
+        with self._lock:
+            return self._conn.execute("SELECT COALESCE(SUM(size), 0) FROM blobs").fetchone()[0]
+
+    def _evict(self):
+        """최대 용량을 넘으면 가장 오래 사용하지 않은 보관본부터 제거"""
+        if not self.max_bytes:
+            return
+        excess = self.total_size() - self.max_bytes
+        if excess <= 0:
+            return
+
+        with self._lock:
+            rows = self._conn.execute("SELECT sha256, size FROM blobs ORDER BY last_used").fetchall()
+        for sha256, size in rows:
+            if excess <= 0:
+                break
+            self._forget(sha256)
+            excess -= size
+
+
+def get_blob_store():
+    """공용 보관소 인스턴스 (처음 호출 시 생성)"""
+    global _store
+    with _store_lock:
+        if _store is None:
+            _store = BlobStore()
+        return _store
@@ -0,0 +1,177 @@
+"""
+영구 캐시 저장소 모듈
+SQLite 기반 키-값 캐시로, 항목별 TTL(만료 시간)과 최대 개수 제한(LRU 제거)을 지원합니다.
+검색 결과처럼 매주 반복 조회되는 데이터를 디스크에 보관하여 프로그램 재실행 후에도 재사용합니다.
+"""
+
+import json
+import os
+import re
+import sqlite3
+import sys
+import threading
+import time
+
+# 모든 캐시 테이블이 공유하는 DB 파일명
+CACHE_DB_NAME = "myppt_cache.db"
+
+# 데이터 폴더를 바꾸는 환경 변수
+DATA_DIR_ENV = "MYPPT_DATA_DIR"
+
+
+def get_data_dir():
+    """
+    캐시/데이터 파일을 저장할 폴더 경로를 반환합니다.
+    PyInstaller로 빌드된 경우 임시 폴더(_MEIPASS)가 아닌 exe 옆에 저장합니다.
+    환경 변수 MYPPT_DATA_DIR이 있으면 그 폴더를 사용합니다. (벤치마크 등에서 실제 캐시와 분리)
+
+    Returns:
+        str: 데이터 폴더 경로 (없으면 생성)
+    """
+    override_dir = os.environ.get(DATA_DIR_ENV)
+    if override_dir:
+        os.makedirs(override_dir, exist_ok=True)
+        return override_dir
+
+    if getattr(sys, 'frozen', False):
+        base_dir = os.path.dirname(sys.executable)
+    else:
+        base_dir = os.path.dirname(os.path.abspath(__file__))
+
+    data_dir = os.path.join(base_dir, "cache")
+    os.makedirs(data_dir, exist_ok=True)
+    return data_dir
+
+
+class PersistentCache:
+    """
+    SQLite 테이블 하나를 사용하는 영구 캐시.
+    값은 JSON으로 직렬화 가능한 객체여야 합니다.
+
+    - ttl: 기본 만료 시간(초). None이면 만료되지 않음 (set()에서 항목별 지정 가능)
+    - max_entries: 최대 항목 수. 초과 시 가장 오래 사용되지 않은 항목부터 제거(LRU)
+    - max_bytes: 저장된 값 전체 크기 상한(바이트, None이면 제한 없음). 초과 시 같은 LRU 순서로 제거
+    """
+
+    def __init__(self, name, ttl=None, max_entries=1000, db_path=None, max_bytes=None):
+        if not re.fullmatch(r'[A-Za-z_][A-Za-z0-9_]*', name):
+            raise ValueError(f"잘못된 캐시 이름: {name}")
+
+        self.name = name
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.db_path = db_path or os.path.join(get_data_dir(), CACHE_DB_NAME)
+
+        # 여러 작업 스레드(GUI 검색/다운로드)에서 공유하므로 연결 하나를 잠금으로 보호
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        with self._lock:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.name} ("
+                "key TEXT PRIMARY KEY, "
+                "value TEXT NOT NULL, "
+                "expires_at REAL, "
+                "last_access REAL NOT NULL)"
+            )
+            self._conn.execute(
+                f"CREATE INDEX IF NOT EXISTS {self.name}_last_access ON {self.name} (last_access)"
+            )
+            self._conn.commit()
+
+    def get(self, key):
+        """
+        캐시된 값을 반환합니다. 없거나 만료되었으면 None.
+        조회된 항목은 최근 사용 시각이 갱신됩니다 (LRU).
+        """
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                f"SELECT value, expires_at FROM {self.name} WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+
+            value, expires_at = row
+            if expires_at is not None and expires_at <= now:
+                self._conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+                self._conn.commit()
+                return None
+
+            self._conn.execute(
+                f"UPDATE {self.name} SET last_access = ? WHERE key = ?", (now, key)
+            )
+            self._conn.commit()
+
+        return json.loads(value)
+
+    def set(self, key, value, ttl=None):
+        """
+        값을 저장합니다. ttl을 생략하면 캐시 기본 TTL을 사용합니다.
+        저장 후 최대 항목 수를 넘으면 LRU 순서로 제거합니다.
+        """
+        now = time.time()
+        ttl = self.ttl if ttl is None else ttl
+        expires_at = now + ttl if ttl is not None else None
+
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.name} (key, value, expires_at, last_access) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now)
+            )
+            self._evict(now)
+            self._conn.commit()
+
+    def delete(self, key):
+        """항목 하나를 삭제합니다."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.name} WHERE key = ?", (key,))
+            self._conn.commit()
+
+    def clear(self):
+        """모든 항목을 삭제합니다."""
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self.name}")
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+
+    def _evict(self, now):
+        """
+        만료 항목 제거 후, 최대 개수/전체 크기 초과분을 가장 오래 사용되지 않은 순으로 제거
+        (잠금 보유 상태에서 호출)
+        """
+        self._conn.execute(
+            f"DELETE FROM {self.name} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+        )
+
+        if self.max_entries:
+            count = self._conn.execute(f"SELECT COUNT(*) FROM {self.name}").fetchone()[0]
+            overflow = count - self.max_entries
+            if overflow > 0:
+                self._conn.execute(
+                    f"DELETE FROM {self.name} WHERE key IN ("
+                    f"SELECT key FROM {self.name} ORDER BY last_access ASC LIMIT ?)",
+                    (overflow,)
+                )
+
+        if self.max_bytes:
+            total = self._conn.execute(
+                f"SELECT COALESCE(SUM(LENGTH(CAST(value AS BLOB))), 0) FROM {self.name}"
+            ).fetchone()[0]
+            if total <= self.max_bytes:
+                return
+            rows = self._conn.execute(
+                f"SELECT key, LENGTH(CAST(value AS BLOB)) FROM {self.name} ORDER BY last_access ASC"
+            ).fetchall()
+            evicted = []
+            for key, size in rows:
+                if total <= self.max_bytes:
+                    break
+                evicted.append((key,))
+                total -= size
+            self._conn.executemany(f"DELETE FROM {self.name} WHERE key = ?", evicted)
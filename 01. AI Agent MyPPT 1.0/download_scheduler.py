@@ -0,0 +1,160 @@
+"""
+다운로드 우선순위 스케줄러 모듈
+여러 다운로드가 동시에 진행될 때 사용자가 기다리는 곡이 먼저 끝나도록 대역폭을 나눕니다.
+
+우선순위 종류:
+  - interactive : 사용자가 직접 고른 곡 (select_song, 수동 확인 후 다운로드)
+  - agent       : 일괄 다운로드, 에이전트 자동 처리
+  - background  : 미리 받기(prefetch)
+
+  - 가중치 분배: 청크를 받을 때마다 가중치 비율만큼만 속도를 내도록 낮은 우선순위 스트림을 잠깐 쉬게 함
+    (interactive 8 : agent 3 : background 1 - 같은 우선순위끼리는 대기 없음)
+  - 선점: interactive 다운로드가 진행 중이면 background 스트림은 멈춤 (최대 PREEMPT_MAX_WAIT초)
+    (멈춘 연결이 끊기면 download_file이 이어받기로 재시도)
+
+사용 (download_file 내부):
+    with get_scheduler().stream(priority) as stream:
+        for chunk in ...:
+            stream.pace(len(chunk), elapsed, cancel_event)
+"""
+
+import threading
+import time
+
+PRIORITY_INTERACTIVE = 'interactive'
+PRIORITY_AGENT = 'agent'
+PRIORITY_BACKGROUND = 'background'
+
+PRIORITY_WEIGHTS = {
+    PRIORITY_INTERACTIVE: 8,
+    PRIORITY_AGENT: 3,
+    PRIORITY_BACKGROUND: 1,
+}
+
+# 이 우선순위 스트림이 있으면 멈추는 우선순위
+PREEMPTED_BY = {
+    PRIORITY_BACKGROUND: (PRIORITY_INTERACTIVE,),
+}
+
+MAX_PACE_DELAY = 1.0     # 청크 하나당 최대 대기 시간(초)
+PREEMPT_MAX_WAIT = 60    # 선점으로 멈춰 있는 최대 시간(초) - 넘으면 가중치 분배로 계속
+WAIT_SLICE = 0.25        # 대기 중 취소 확인 간격(초)
+
+_scheduler = None
+_scheduler_lock = threading.Lock()
+
+
+class DownloadStream:
+    """스케줄러에 등록된 다운로드 하나"""
+
+    def __init__(self, scheduler, priority):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def pace(self, nbytes, elapsed, cancel_event=None):
+        """
+        청크 하나를 받은 뒤 호출합니다. 우선순위에 따라 잠깐 쉬거나(가중치) 멈춥니다(선점).
+
+        Args:
+            nbytes: 받은 바이트 수
+            elapsed: 그 청크를 받는 데 걸린 시간(초)
+            cancel_event: 설정되면 대기를 끝내고 바로 반환
+        """
+        self.scheduler._wait_preempted(self.priority, cancel_event)
+
+        delay = self.scheduler._pace_delay(self.priority, elapsed)
+        _sleep(delay, cancel_event)
+
+
+class DownloadScheduler:
+    """우선순위별 진행 중 스트림 수를 보고 가중치 분배/선점을 결정"""
+
+    def __init__(self, weights=None):
+        self.weights = dict(weights or PRIORITY_WEIGHTS)
+        self._active = {priority: 0 for priority in self.weights}
+        self._cond = threading.Condition()
+
+    def stream(self, priority=PRIORITY_INTERACTIVE):
+        """다운로드 스트림 등록 (with 문으로 사용, 끝나면 자동 해제)"""
+        if priority not in self.weights:
+            raise ValueError(f"알 수 없는 우선순위: {priority}")
+        return _StreamContext(self, priority)
+
+    def active_counts(self):
+        """우선순위별 진행 중 스트림 수"""
+        with self._cond:
+            return dict(self._active)
+
+    def _register(self, priority):
+        with self._cond:
+            self._active[priority] += 1
+            self._cond.notify_all()
+
+    def _unregister(self, priority):
+        with self._cond:
+            self._active[priority] -= 1
+            # 멈춰 있던 낮은 우선순위 스트림 깨우기
+            self._cond.notify_all()
+
+    def _is_preempted(self, priority):
+        return any(self._active[higher] for higher in PREEMPTED_BY.get(priority, ()))
+
+    def _wait_preempted(self, priority, cancel_event):
+        deadline = time.monotonic() + PREEMPT_MAX_WAIT
+        with self._cond:
+            while self._is_preempted(priority):
+                if cancel_event is not None and cancel_event.is_set():
+                    return
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return
+                self._cond.wait(min(WAIT_SLICE, remaining))
+
+    def _pace_delay(self, priority, elapsed):
+        """
+        가중치 몫에 맞추기 위한 대기 시간.
+        연결들은 대략 같은 속도로 받으므로(1/N), 가중치 몫(w/Σw)이 그보다 작으면 그 비율만큼 쉼
+        """
+        with self._cond:
+            total_streams = sum(self._active.values())
+            total_weight = sum(self.weights[p] * count for p, count in self._active.items())
+        if total_streams <= 1 or not total_weight:
+            return 0
+
+        share = self.weights[priority] / total_weight
+        fair = 1 / total_streams
+        if share >= fair:
+            return 0
+        return min(elapsed * (fair / share - 1), MAX_PACE_DELAY)
+
+
+class _StreamContext:
+    def __init__(self, scheduler, priority):
+        self.scheduler = scheduler
+        self.priority = priority
+
+    def __enter__(self):
+        self.scheduler._register(self.priority)
+        return DownloadStream(self.scheduler, self.priority)
+
+    def __exit__(self, exc_type, exc, tb):
+        self.scheduler._unregister(self.priority)
+        return False
+
+
+def _sleep(seconds, cancel_event):
+    if seconds <= 0:
+        return
+    if cancel_event is not None:
+        cancel_event.wait(seconds)
+    else:
+        time.sleep(seconds)
+
+
+def get_scheduler():
+    """공용 스케줄러 인스턴스 (처음 호출 시 생성)"""
+    global _scheduler
+    with _scheduler_lock:
+        if _scheduler is None:
+            _scheduler = DownloadScheduler()
+        return _scheduler
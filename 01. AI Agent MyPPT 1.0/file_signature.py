@@ -0,0 +1,133 @@
+"""
+다운로드 파일 내용 검사 모듈
+첨부파일 서버가 오류 페이지(HTML)나 이미지(게시물의 ?original 이미지 링크)를 돌려주면
+.ppt 이름으로 저장되어 PPT 생성(COM 열기) 단계에서야 실패합니다.
+다운로드 중 첫 바이트로 파일 형식을 확인해 바로 중단하고, ZIP(.pptx)은 끝의 중앙 디렉터리까지 확인합니다.
+
+  - .ppt/.pps/.pot   : OLE2 복합 문서 (D0 CF 11 E0 A1 B1 1A E1)
+  - .pptx/.ppsx/.potx: ZIP (PK 03 04) + [Content_Types].xml
+  (.ppt 이름은 제목으로 만든 추정 파일명일 수 있으므로 ZIP 내용도 허용)
+"""
+
+import os
+import zipfile
+
+OLE2_MAGIC = b'\xD0\xCF\x11\xE0\xA1\xB1\x1A\xE1'
+ZIP_MAGIC = b'PK\x03\x04'
+HEADER_SIZE = len(OLE2_MAGIC)
+
+# 확장자별 허용 형식
+ALLOWED_KINDS = {
+    '.ppt': ('ole2', 'zip'),
+    '.pps': ('ole2', 'zip'),
+    '.pot': ('ole2', 'zip'),
+    '.pptx': ('zip',),
+    '.ppsx': ('zip',),
+    '.potx': ('zip',),
+}
+
+# 오류 메시지용 (흔히 잘못 받는 형식)
+KNOWN_SIGNATURES = (
+    (b'\x89PNG', "PNG 이미지"),
+    (b'\xFF\xD8\xFF', "JPEG 이미지"),
+    (b'GIF8', "GIF 이미지"),
+    (b'%PDF', "PDF 문서"),
+)
+
+
+class InvalidFileContent(Exception):
+    """다운로드한 내용이 파일 형식(확장자)과 맞지 않음"""
+
+
+def detect_kind(head):
+    """
+    첫 바이트로 파일 형식을 판별합니다.
+
+    Returns:
+        str: 'ole2' / 'zip' / 설명 문자열(HTML, 이미지 등) / None (알 수 없음)
+    """
+    if head.startswith(OLE2_MAGIC):
+        return 'ole2'
+    if head.startswith(ZIP_MAGIC):
+        return 'zip'
+    for magic, description in KNOWN_SIGNATURES:
+        if head.startswith(magic):
+            return description
+    if head.lstrip()[:1] == b'<':
+        return "HTML 페이지"
+    return None
+
+
+def needs_check(filename):
+    """내용을 검사할 확장자인지"""
+    return os.path.splitext(filename)[1].lower() in ALLOWED_KINDS
+
+
+def pick_check_name(*names):
+    """
+    검사 기준 파일명: 확장자로 형식을 알 수 있는 첫 이름
+    (저장 이름이 확장자 없는 임시 이름이어도 응답 헤더/URL의 첨부파일 이름으로 검사하도록)
+
+    Args:
+        names: 후보 파일명 (우선순위 순, None 허용)
+
+    Returns:
+        str: 검사할 파일명 또는 None (어느 이름으로도 형식을 알 수 없음)
+    """
+    for name in names:
+        if name and needs_check(name):
+            return name
+    return None
+
+
+def check_header(head, filename):
+    """
+    파일 앞부분이 확장자에 맞는 형식인지 확인합니다. (검사 대상 확장자가 아니면 통과)
+
+    Args:
+        head: 파일 앞부분 (HEADER_SIZE바이트 이상)
+        filename: 저장할 파일명 (확장자 확인용)
+
+    Raises:
+        InvalidFileContent: 형식이 맞지 않을 때
+    """
+    ext = os.path.splitext(filename)[1].lower()
+    allowed = ALLOWED_KINDS.get(ext)
+    if allowed is None:
+        return
+
+    kind = detect_kind(head)
+    if kind not in allowed:
+        raise InvalidFileContent(f"{ext} 파일이 아님 ({kind or '알 수 없는 형식'})")
+
+
+def check_complete(path, filename):
+    """
+    다 받은 파일 검사: 앞부분 형식을 다시 확인하고(이어받은 파일 포함),
+    ZIP이면 끝의 중앙 디렉터리를 읽어 잘리지 않았는지, OOXML 문서인지 확인합니다.
+
+    Args:
+        path: 받은 파일 경로 (임시 파일)
+        filename: 저장할 파일명 (확장자 확인용)
+
+    Raises:
+        InvalidFileContent: 형식이 맞지 않거나 ZIP 구조가 깨졌을 때
+    """
+    if not needs_check(filename):
+        return
+
+    with open(path, 'rb') as f:
+        head = f.read(HEADER_SIZE)
+    check_header(head, filename)
+    if detect_kind(head) != 'zip':
+        return
+
+    try:
+        # 중앙 디렉터리만 읽음 (압축 해제 없음)
+        with zipfile.ZipFile(path) as archive:
+            names = archive.namelist()
+    except (zipfile.BadZipFile, OSError) as e:
+        raise InvalidFileContent(f"ZIP 구조 손상 ({e})")
+
+    if '[Content_Types].xml' not in names:
+        raise InvalidFileContent("PowerPoint(OOXML) 문서가 아님")
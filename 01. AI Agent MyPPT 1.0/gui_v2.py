@@ -6,11 +6,16 @@ import sys
 import pythoncom
 import webbrowser
 import logging
-import re
 from main import generate_ppt
 from agent_logic import StandardCommandParser
 # Import search and download functions directly
-from song_search import search_songs, get_download_info, download_file
+from song_search import (search_songs, get_download_info, download_file, is_known_miss,
+                         known_miss_retry_in, sanitize_filename)
+from download_scheduler import PRIORITY_AGENT
+from hymn_catalog import resolve_hymn, get_catalog
+from lyric_index import resolve_hymn_number
+from hymnal_table import get_hymnal_table
+from hymn_query import parse_query
 
 # Set up logging to file
 logging.basicConfig(filename='error_log.md', level=logging.INFO, 
@@ -147,6 +152,9 @@ class App:
         self.current_agent_task = None # (list_type, query)
 
         self.create_widgets()
+
+        # 창을 닫으면 진행 중인 다운로드/미리 받기 중단 (받던 파일은 다음 실행에서 이어받기)
+        self.root.protocol("WM_DELETE_WINDOW", self.on_close)
         
         # [MOD] Automate Kill PPT on startup
         self.reset_powerpoint()
@@ -157,6 +165,11 @@ class App:
                                       bg="#e0e0e0", font=("Arial", 9))
         self.btn_open_work.place(relx=0.99, y=5, anchor="ne")
 
+    def on_close(self):
+        if self.downloader_app:
+            self.downloader_app.close()
+        self.root.destroy()
+
     def create_widgets(self):
         # Main Resizable 3-Column Layout using PanedWindow
         # Left(Search) | Center(Settings) | Right(Agent)
@@ -433,14 +446,17 @@ class App:
         # B. Song Search & Download Logic (Dual Mode)
         self.root.after(0, self.clear_all_lists)
 
+        # 텍스트 제목 → 번호 (내장 새찬송가 목록/로컬 첫 소절 색인으로 확실한 것만)
+        for key in ("hymns_before", "hymns_after"):
+            if data.get(key):
+                data[key] = self.resolve_text_hymns(data[key])
+
         all_queries = (data.get("hymns_before") or []) + (data.get("hymns_after") or [])
         
-        # Check if ALL queries are numeric (Pure Numbers or "123장")
+        # Check if ALL queries are numeric (Pure Numbers or "123장", "새찬송가 123장" - hymn_query)
         is_all_numeric = True
         for q in all_queries:
-            q = q.strip()
-            # Check digit or "123장" pattern
-            if not (q.isdigit() or (q.endswith("장") and q[:-1].strip().isdigit())):
+            if not parse_query(q).is_numbered:
                 is_all_numeric = False
                 break
         
@@ -454,6 +470,36 @@ class App:
             self.log("▶ 모드 감지: 텍스트 혼합 (순차 검수 처리)")
             self.process_mixed_mode(data)
 
+    def resolve_text_hymns(self, queries):
+        """
+        텍스트 찬송 제목을 로컬 색인으로 번호로 바꿉니다.
+        정확히 일치한 제목만 바꾸고, 유사 일치 후보는 로그에만 남기고 텍스트 그대로 둡니다. (혼합 모드 검수)
+        """
+        resolved = []
+        for q in queries:
+            q_stripped = q.strip()
+            if parse_query(q_stripped).is_numbered:
+                resolved.append(q)
+                continue
+
+            try:
+                number = resolve_hymn_number(q_stripped)
+            except Exception as e:
+                self.log(f"로컬 색인 조회 실패: {e}")
+                number = None
+
+            if number:
+                self.log(f"로컬 색인: '{q_stripped}' → {number}장")
+                resolved.append(f"{number}장")
+                continue
+
+            match = get_hymnal_table().lookup(q_stripped)
+            if match:
+                entry = get_hymnal_table().get(match[0])
+                self.log(f"로컬 색인 후보: '{q_stripped}' → {match[0]}장 {entry.title} (검수 필요)")
+            resolved.append(q)
+        return resolved
+
     def process_batch_mode(self, data):
         """기존의 일괄 처리 방식 (All-Pass)"""
         
@@ -463,47 +509,59 @@ class App:
                 self.log(f"찬양 처리 중(자동): '{song_query}'")
                 target_dir = self.ppt_dir_var.get()
                 
+                def download_hymn(dl_info):
+                    # 추정 파일명(제목)이면 응답 헤더의 실제 파일명으로 저장
+                    def header_path(header_filename):
+                        return os.path.join(target_dir, sanitize_filename(header_filename))
+                    save_path = os.path.join(target_dir, dl_info['filename'] or f"{song_query}.pptx")
+                    return download_file(dl_info['download_url'], save_path, priority=PRIORITY_AGENT,
+                                         name_from_header=header_path if dl_info['filename_guessed'] else None)
+
                 try:
-                    # 1. Search Query Optimization
-                    is_number = True # We know it's numeric in this mode
-                    
-                    if is_number:
-                        query = f"새찬송가 ppt {song_query}"
-                        if "장" not in song_query and song_query.isdigit():
-                             query = f"새찬송가 ppt {song_query}장"
-                        
-                    self.log(f"검색어(최적화): {query}")
-                    
-                    # 2. Search
-                    results = search_songs(query)
-                    if not results:
-                        self.log(f"검색 결과 0건: {song_query}")
+                    # 1. Catalog Lookup (번호 → 게시물 → 첨부파일 색인)
+                    query = parse_query(song_query)
+                    self.log(f"카탈로그/검색 조회: {query.number}장")
+
+                    # 2. Resolve (카탈로그에 없으면 검색 후 카탈로그에 기록)
+                    # 실패 캐시 확인은 검색 전에 (이번 검색에서 새로 기록된 실패와 구분)
+                    miss_wait = known_miss_retry_in(query.search_keyword)
+                    dl_info = resolve_hymn(query)
+                    if not dl_info:
+                        if miss_wait > 0:
+                            self.log(f"최근 검색 결과 없음 (캐시, {miss_wait / 60:.0f}분 후 재검색): {song_query}")
+                        else:
+                            self.log(f"검색 결과 0건: {song_query}")
                         continue
-                        
-                    # 2-1. 정밀 필터 (숫자 모드이므로 필수)
-                    pure_num = re.search(r'\d+', song_query).group()
-                    pattern = r'(?:^|\s)' + pure_num + r'장(?:\s|$|[^\d])'
-                    filtered_results = [r for r in results if re.search(pattern, r['title'])]
-                    if filtered_results:
-                        results = filtered_results
-                        
-                    # 3. Select Best Match
-                    best_match = results[0]
-                    self.log(f"검색 성공: {best_match['title']}")
-                    
-                    # 4. Get Link
-                    dl_info = get_download_info(best_match['url'])
-                    if not dl_info['download_url']:
-                        continue
-                        
-                    # 5. Download
-                    filename = dl_info['filename'] or f"{song_query}.pptx"
-                        
-                    save_path = os.path.join(target_dir, filename)
-                    
-                    if download_file(dl_info['download_url'], save_path):
+
+                    if dl_info['from_catalog']:
+                        self.log(f"카탈로그 적중: {dl_info['title']}")
+                    else:
+                        self.log(f"검색 성공: {dl_info['title']}")
+
+                    # 3. Download
+                    try:
+                        downloaded = download_hymn(dl_info)
+                    except Exception as e:
+                        if not dl_info['from_catalog']:
+                            raise
+                        # 카탈로그 링크가 만료된 경우: 항목 삭제 후 캐시 없이 다시 검색 (같은 죽은 링크 방지)
+                        self.log(f"카탈로그 링크 실패 -> 재검색: {e}")
+                        get_catalog().invalidate(query.number, dl_info['source'], hymnal=query.hymnal)
+                        dl_info = resolve_hymn(query, use_cache=False)
+                        if not dl_info:
+                            self.log(f"재검색 결과 0건: {song_query}")
+                            continue
+                        downloaded = download_hymn(dl_info)
+
+                    if downloaded:
+                         filename = os.path.basename(downloaded)
+                         # 받기에 성공한 링크는 확인 시각 갱신 (응답 헤더로 바뀐 파일명은 확인된 파일명으로 기록)
+                         planned = dl_info['filename'] or f"{song_query}.pptx"
+                         confirmed = (dl_info['filename'] and not dl_info['filename_guessed']) or filename != planned
+                         get_catalog().mark_verified(query.number, dl_info['source'],
+                                                     filename if confirmed else None, hymnal=query.hymnal)
                          self.log(f"다운로드 완료: {filename}")
-                         def add_to_ui():
+                         def add_to_ui(filename=filename):
                              if is_before: self.list_before.insert(tk.END, filename)
                              else: self.list_after.insert(tk.END, filename)
                          self.root.after(0, add_to_ui)
@@ -559,7 +617,7 @@ class App:
         self.log(f"👉 작업 시작 [{target_list_name}]: '{query}'")
 
         # Check Type: Numeric vs Text
-        is_numeric = query.isdigit() or (query.endswith("장") and query[:-1].strip().isdigit())
+        is_numeric = parse_query(query).is_numbered
         
         if is_numeric:
             # --- AUTO MODE (Numeric) ---
@@ -580,25 +638,31 @@ class App:
         """Single task execution for numeric inputs in mixed mode"""
         try:
             target_dir = self.ppt_dir_var.get()
-            search_q = f"새찬송가 ppt {song_query}"
-            if "장" not in song_query and song_query.isdigit():
-                 search_q = f"새찬송가 ppt {song_query}장"
+            query = parse_query(song_query)
+            search_q = query.search_keyword
             
+            # 최근에 결과가 없던 찬송가는 검색 없이 바로 수동 전환 (실패 캐시)
+            if is_known_miss(search_q):
+                self.log(f"최근 검색 결과 없음 (캐시): {song_query} -> 수동 전환")
+                self.waiting_for_user_selection = True
+                self.root.after(0, lambda: self.trigger_manual_verification(song_query, reason="fallback"))
+                return
+
             results = search_songs(search_q)
             if results:
                 # Filter exact match logic
-                pure_num = re.search(r'\d+', song_query).group()
-                pattern = r'(?:^|\s)' + pure_num + r'장(?:\s|$|[^\d])'
-                filtered = [r for r in results if re.search(pattern, r['title'])]
+                filtered = query.filter(results)
                 if filtered: results = filtered
                 
                 best = results[0]
                 dl_info = get_download_info(best['url'])
+                if dl_info.get('cached_miss'):
+                    self.log(f"최근 첨부파일 없던 게시물 (캐시): {best['title']}")
                 
                 if dl_info['download_url']:
                     fname = dl_info['filename'] or f"{song_query}.pptx"
                     save_path = os.path.join(target_dir, fname)
-                    if download_file(dl_info['download_url'], save_path):
+                    if download_file(dl_info['download_url'], save_path, priority=PRIORITY_AGENT):
                         self.log(f"자동 다운로드 성공: {fname}")
                         
                         # Add to List
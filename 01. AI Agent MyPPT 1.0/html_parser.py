@@ -0,0 +1,131 @@
+"""
+HTML 파싱 백엔드 모듈
+Tistory 검색 결과/게시물 페이지를 BeautifulSoup 트리로 만드는 방식을 교체할 수 있게 합니다.
+
+백엔드:
+  - 'full'    : html.parser로 전체 트리 생성 (기존 방식, lxml이 없을 때 기본값)
+  - 'strained': html.parser + 필터로 필요한 요소만 트리로 생성
+                검색 페이지: 링크(a), article, 검색 결과 항목(.searchList/.search-result-item/.post-item)
+                게시물 페이지: title, h1, article, a, img
+                (html.parser에서는 필터 비용 때문에 환경에 따라 full보다 느릴 수 있음)
+  - 'lxml'    : lxml 파서 + 같은 필터 (lxml 설치 시 기본값)
+
+필터에 걸린 요소는 하위 요소까지 그대로 보존되므로, song_search의 선택자와
+추출 결과는 전체 트리와 동일합니다. (bench_html_parser.py로 결과 동일 여부와 속도 확인)
+"""
+
+import re
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    import lxml  # noqa: F401
+    HAS_LXML = True
+except ImportError:
+    HAS_LXML = False
+
+BACKENDS = ('full', 'strained', 'lxml')
+DEFAULT_BACKEND = 'lxml' if HAS_LXML else 'full'
+
+# 검색 결과 페이지에서 남길 요소
+SEARCH_PAGE_TAGS = frozenset(['a', 'article'])
+SEARCH_PAGE_CLASSES = frozenset(['searchList', 'search-result-item', 'post-item'])
+
+# 게시물 페이지에서 남길 요소
+POST_PAGE_TAGS = frozenset(['title', 'h1', 'article', 'a', 'img'])
+
+_ARTICLE_TAG = re.compile(r'<article[\s>]', re.IGNORECASE)
+
+_backend = DEFAULT_BACKEND
+
+
+class ElementStrainer(SoupStrainer):
+    """
+    태그 이름 또는 class 중 하나라도 일치하면 해당 요소(하위 포함)를 남기는 필터.
+    (SoupStrainer는 이름과 속성 조건을 AND로만 결합하므로 OR 조건용으로 확장)
+    """
+
+    def __init__(self, tags, classes=()):
+        super().__init__()
+        self.tags = frozenset(tags)
+        self.classes = frozenset(classes)
+
+    def allow_tag_creation(self, nsprefix, name, attrs):
+        if name in self.tags:
+            return True
+        if self.classes and attrs:
+            class_value = attrs.get('class') or ''
+            class_names = class_value.split() if isinstance(class_value, str) else class_value
+            return any(c in self.classes for c in class_names)
+        return False
+
+    def allow_string_creation(self, string):
+        # 남긴 요소 바깥의 텍스트는 필요 없음
+        return False
+
+
+def _supports_strainer():
+    """현재 설치된 bs4가 생성 단계 필터(allow_tag_creation)를 지원하는지 여부 (4.13 이상)"""
+    return hasattr(SoupStrainer, 'allow_tag_creation')
+
+
+def set_backend(name):
+    """
+    파싱 백엔드를 변경합니다.
+
+    Args:
+        name: 'full', 'strained', 'lxml' 중 하나
+    """
+    global _backend
+    if name not in BACKENDS:
+        raise ValueError(f"알 수 없는 파싱 백엔드: {name}")
+    if name == 'lxml' and not HAS_LXML:
+        raise ValueError("lxml이 설치되어 있지 않습니다.")
+    _backend = name
+
+
+def get_backend():
+    """현재 파싱 백엔드 이름"""
+    return _backend
+
+
+def _parse(html, strainer, backend):
+    backend = backend or _backend
+    if backend == 'lxml' and HAS_LXML:
+        if strainer is None or not _supports_strainer():
+            return BeautifulSoup(html, 'lxml')
+        return BeautifulSoup(html, 'lxml', parse_only=strainer)
+    if backend == 'full' or strainer is None or not _supports_strainer():
+        return BeautifulSoup(html, 'html.parser')
+    return BeautifulSoup(html, 'html.parser', parse_only=strainer)
+
+
+def parse_search_page(html, backend=None):
+    """
+    검색 결과 페이지를 파싱합니다.
+
+    Args:
+        html: 페이지 HTML
+        backend: 사용할 백엔드 (생략 시 현재 설정)
+
+    Returns:
+        BeautifulSoup
+    """
+    return _parse(html, ElementStrainer(SEARCH_PAGE_TAGS, SEARCH_PAGE_CLASSES), backend)
+
+
+def parse_post_page(html, backend=None):
+    """
+    게시물 페이지를 파싱합니다.
+    본문(article)이 없는 페이지는 링크 주변 텍스트를 전체 트리에서 찾아야 하므로 전체 파싱합니다.
+
+    Args:
+        html: 페이지 HTML
+        backend: 사용할 백엔드 (생략 시 현재 설정)
+
+    Returns:
+        BeautifulSoup
+    """
+    if not _ARTICLE_TAG.search(html):
+        return _parse(html, None, 'full')
+    return _parse(html, ElementStrainer(POST_PAGE_TAGS), backend)
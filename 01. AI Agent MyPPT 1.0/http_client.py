@@ -0,0 +1,307 @@
+"""
+공용 HTTP 전송 모듈
+호스트별로 keep-alive 연결 풀을 가진 requests.Session을 공유하여
+검색/게시물/다운로드 요청마다 TCP+TLS 핸드셰이크가 반복되지 않도록 합니다.
+(tistory.com, t1.daumcdn.net, bskorea.or.kr 등)
+
+모든 요청에 공통 헤더(HEADERS), 재시도(백오프), 기본 제한 시간이 적용됩니다.
+세션은 여러 작업 스레드(gui_v2.App, SongDownloaderApp)에서 동시에 사용해도 안전합니다.
+
+get_cached()는 페이지 본문과 검증값(ETag/Last-Modified)을 디스크에 보관하고
+조건부 요청(If-None-Match/If-Modified-Since)으로 재검증합니다. 304 응답이면 본문을 다시 받지 않습니다.
+검증값이 없는 응답은 재검증할 수 없으므로 보관하지 않습니다. (fresh_for를 준 요청만 그 시간 동안 보관)
+"""
+
+import threading
+import time
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.structures import CaseInsensitiveDict
+from urllib3.util.retry import Retry
+
+from cache_store import PersistentCache
+
+# User-Agent 설정 (봇 차단 방지)
+HEADERS = {
+    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
+}
+
+DEFAULT_TIMEOUT = 30       # 기본 요청 제한 시간(초)
+POOL_MAXSIZE = 16          # 호스트당 유지할 최대 연결 수 (동시 작업 스레드 수 고려)
+RETRY_TOTAL = 3            # 연결 실패/일시적 서버 오류 시 재시도 횟수
+RETRY_BACKOFF = 0.5        # 재시도 간격: 0.5s, 1s, 2s ...
+RETRY_STATUS = (429, 500, 502, 503, 504)
+
+# 조건부 요청 페이지 캐시 설정
+PAGE_CACHE_TTL = 60 * 24 * 60 * 60   # 60일 (검증값이 있으면 그 안에서는 계속 재검증으로 재사용)
+PAGE_CACHE_MAX_ENTRIES = 3000
+PAGE_CACHE_MAX_BYTES = 50 * 1024 * 1024   # 본문 전체 크기 상한 (50MB)
+
+# 호스트(netloc) -> Session
+_sessions = {}
+_sessions_lock = threading.Lock()
+
+_page_cache = None
+_page_cache_lock = threading.Lock()
+_page_cache_enabled = True
+
+# 테스트/벤치마크용: 요청 URL 변환 함수 (replay_server로 보내기 등), 응답 기록 함수 목록
+_url_rewriter = None
+_response_hooks = []
+
+# 조건부 요청 통계: hit(요청 없이 사용) / revalidated(304) / miss(본문 새로 받음)
+_cache_stats = {'hit': 0, 'revalidated': 0, 'miss': 0}
+_cache_stats_lock = threading.Lock()
+
+
+def _create_session():
+    """공통 헤더, 재시도 정책, 연결 풀이 설정된 세션 생성"""
+    session = requests.Session()
+    session.headers.update(HEADERS)
+
+    retry = Retry(
+        total=RETRY_TOTAL,
+        backoff_factor=RETRY_BACKOFF,
+        status_forcelist=RETRY_STATUS,
+        allowed_methods=frozenset(['GET', 'HEAD']),
+        raise_on_status=False,
+    )
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=POOL_MAXSIZE, max_retries=retry)
+    session.mount('http://', adapter)
+    session.mount('https://', adapter)
+    return session
+
+
+def get_session(url):
+    """
+    URL의 호스트에 해당하는 공유 세션을 반환합니다 (없으면 생성).
+
+    Args:
+        url: 요청할 URL
+
+    Returns:
+        requests.Session
+    """
+    host = urlsplit(url).netloc.lower()
+    with _sessions_lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _create_session()
+            _sessions[host] = session
+        return session
+
+
+def set_url_rewriter(rewriter):
+    """
+    모든 요청 URL을 바꾸는 함수를 설정합니다. (None이면 해제)
+    예: 실제 사이트 대신 로컬 replay_server로 요청 보내기
+
+    Args:
+        rewriter: (url) -> url
+    """
+    global _url_rewriter
+    _url_rewriter = rewriter
+
+
+def use_replay_server(base_url):
+    """
+    모든 요청을 replay_server로 보냅니다.
+    https://getwater.tistory.com/search/x → {base_url}/https/getwater.tistory.com/search/x
+    """
+    base_url = base_url.rstrip('/')
+
+    def rewrite(url):
+        if url.startswith(base_url):
+            return url
+        scheme, _, rest = url.partition('://')
+        return f"{base_url}/{scheme}/{rest}"
+
+    set_url_rewriter(rewrite)
+
+
+def add_response_hook(hook):
+    """
+    응답을 받을 때마다 호출할 함수를 등록합니다. (stream=True 요청은 제외)
+    예: replay_server 녹화
+
+    Args:
+        hook: (원래 url, response) -> None
+    """
+    _response_hooks.append(hook)
+
+
+def remove_response_hook(hook):
+    if hook in _response_hooks:
+        _response_hooks.remove(hook)
+
+
+def request(method, url, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    공유 세션으로 HTTP 요청을 보냅니다. (requests.request와 같은 인자 사용)
+
+    Returns:
+        requests.Response
+    """
+    target_url = _url_rewriter(url) if _url_rewriter else url
+    response = get_session(target_url).request(method, target_url, timeout=timeout, **kwargs)
+
+    if _response_hooks and not kwargs.get('stream'):
+        for hook in list(_response_hooks):
+            hook(url, response)
+    return response
+
+
+def get(url, **kwargs):
+    """GET 요청 (requests.get 대체)"""
+    return request('GET', url, **kwargs)
+
+
+def head(url, **kwargs):
+    """HEAD 요청 (requests.head 대체)"""
+    return request('HEAD', url, **kwargs)
+
+
+def _get_page_cache():
+    """페이지 캐시를 처음 사용할 때 연다. 열 수 없으면 None (캐시 없이 동작)"""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            try:
+                _page_cache = PersistentCache('http_pages', ttl=PAGE_CACHE_TTL,
+                                              max_entries=PAGE_CACHE_MAX_ENTRIES,
+                                              max_bytes=PAGE_CACHE_MAX_BYTES)
+            except Exception as e:
+                print(f"[HTTP] 페이지 캐시를 열 수 없습니다: {e}")
+                return None
+        return _page_cache
+
+
+def set_page_cache_enabled(enabled):
+    """
+    get_cached의 페이지 캐시 사용 여부를 설정합니다.
+    끄면 캐시 조회/재검증/저장 없이 매번 본문을 새로 받습니다. (벤치마크용)
+
+    Args:
+        enabled: False면 캐시를 건너뜀
+    """
+    global _page_cache_enabled
+    _page_cache_enabled = bool(enabled)
+
+
+def _count(kind):
+    with _cache_stats_lock:
+        _cache_stats[kind] += 1
+
+
+def cache_stats():
+    """조건부 요청 통계 {'hit', 'revalidated', 'miss'}"""
+    with _cache_stats_lock:
+        return dict(_cache_stats)
+
+
+def _cached_response(url, entry, cache_status):
+    """캐시 항목으로 requests.Response를 만듭니다. (response.text / .json() 그대로 사용 가능)"""
+    response = requests.Response()
+    response.status_code = 200
+    response.url = url
+    response.headers = CaseInsensitiveDict(entry.get('headers') or {})
+    response.encoding = 'utf-8'
+    response._content = entry['body'].encode('utf-8')
+    response.cache_status = cache_status
+    return response
+
+
+def get_cached(url, params=None, fresh_for=0, encoding=None, timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    페이지를 조건부 요청으로 가져옵니다.
+
+    - 캐시된 지 fresh_for초 이내면 요청 없이 캐시 본문 반환 (hit)
+    - 그 외에는 저장된 ETag/Last-Modified로 조건부 요청 → 304면 캐시 본문 반환 (revalidated)
+    - 200이면 새 본문과 검증값을 저장 (miss)
+      검증값이 없는 응답은 재검증할 수 없으므로 fresh_for가 있을 때만 그 시간 동안 저장
+
+    Args:
+        url: 요청할 URL
+        params: 쿼리 파라미터
+        fresh_for: 재검증 없이 사용할 시간(초)
+        encoding: 본문 인코딩 지정 (예: 'utf-8', 생략 시 응답 헤더 기준)
+        timeout: 요청 제한 시간(초)
+
+    Returns:
+        requests.Response (response.cache_status: 'hit' / 'revalidated' / 'miss')
+    """
+    full_url = requests.Request('GET', url, params=params).prepare().url
+    cache = _get_page_cache() if _page_cache_enabled else None
+
+    entry = None
+    if cache is not None:
+        try:
+            entry = cache.get(full_url)
+        except Exception as e:
+            print(f"[HTTP] 페이지 캐시 조회 실패: {e}")
+
+    if entry and fresh_for and time.time() - entry['fetched_at'] < fresh_for:
+        _count('hit')
+        return _cached_response(full_url, entry, 'hit')
+
+    headers = dict(kwargs.pop('headers', None) or {})
+    if entry:
+        if entry.get('etag'):
+            headers['If-None-Match'] = entry['etag']
+        if entry.get('last_modified'):
+            headers['If-Modified-Since'] = entry['last_modified']
+
+    response = get(full_url, timeout=timeout, headers=headers, **kwargs)
+
+    if response.status_code == 304 and entry:
+        _count('revalidated')
+        entry['fetched_at'] = time.time()
+        if cache is not None:
+            try:
+                cache.set(full_url, entry)
+            except Exception as e:
+                print(f"[HTTP] 페이지 캐시 저장 실패: {e}")
+        return _cached_response(full_url, entry, 'revalidated')
+
+    _count('miss')
+    response.cache_status = 'miss'
+    if encoding:
+        response.encoding = encoding
+
+    if response.status_code == 200 and cache is not None:
+        etag = response.headers.get('ETag')
+        last_modified = response.headers.get('Last-Modified')
+        has_validator = bool(etag or last_modified)
+        try:
+            if has_validator or fresh_for:
+                cache.set(full_url, {
+                    'body': response.text,
+                    'etag': etag,
+                    'last_modified': last_modified,
+                    'headers': {'Content-Type': response.headers.get('Content-Type', '')},
+                    'fetched_at': time.time()
+                }, ttl=None if has_validator else fresh_for)
+            elif entry:
+                # 검증값이 없어진 페이지의 이전 본문은 더 이상 쓸 수 없음
+                cache.delete(full_url)
+        except Exception as e:
+            print(f"[HTTP] 페이지 캐시 저장 실패: {e}")
+
+    return response
+
+
+def clear_page_cache():
+    """저장된 페이지 캐시를 모두 삭제합니다."""
+    cache = _get_page_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def close_all():
+    """모든 세션과 연결 풀을 닫습니다 (프로그램 종료 시)."""
+    with _sessions_lock:
+        for session in _sessions.values():
+            session.close()
+        _sessions.clear()
@@ -0,0 +1,323 @@
+"""
+찬송가 카탈로그 모듈
+새찬송가 번호 → 게시물 URL → 첨부파일(다운로드) URL 매핑을 로컬 SQLite에 보관합니다.
+번호와 게시물/첨부파일의 관계는 거의 바뀌지 않으므로, 숫자 찬송가는 검색 없이
+색인 조회 한 번으로 바로 download_file 단계로 넘어갈 수 있습니다.
+
+카탈로그는 기존 search_getwater / search_cwy0675 / get_download_info로 채워집니다.
+  - 일괄 구축: python hymn_catalog.py 1-645
+  - 자동 보충: resolve_hymn()이 카탈로그에 없는 번호를 검색한 뒤 기록
+  - 재확인: 마지막 확인(verified_at) 후 CATALOG_REVALIDATE_AFTER가 지난 항목은 게시물을 다시 확인
+  - 파일명: 본문/응답 헤더로 확인된 파일명만 기록 (제목으로 만든 추정 파일명은 기록하지 않음)
+"""
+
+import os
+import sqlite3
+import sys
+import threading
+import time
+
+from cache_store import get_data_dir
+from hymn_query import DEFAULT_HYMNAL, HymnQuery, parse_query
+from song_search import search_songs, get_download_info, sanitize_filename
+from song_sources import get_source
+
+CATALOG_DB_NAME = "hymn_catalog.db"
+DEFAULT_SOURCES = ['getwater', 'cwy0675']
+CATALOG_REVALIDATE_AFTER = 30 * 24 * 60 * 60   # 이 기간이 지난 항목은 게시물 페이지로 다시 확인 (30일)
+
+_catalog = None
+_catalog_lock = threading.Lock()
+
+
+class HymnCatalog:
+    """
+    (찬송가 종류, 번호, 사이트) → 게시물/첨부파일 정보 색인.
+    기본 키 (hymnal, number, source)가 곧 조회용 색인입니다.
+    """
+
+    def __init__(self, db_path=None):
+        self.db_path = db_path or os.path.join(get_data_dir(), CATALOG_DB_NAME)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.db_path, timeout=10, check_same_thread=False)
+        with self._lock:
+            self._conn.execute(
+                "CREATE TABLE IF NOT EXISTS hymns ("
+                "hymnal TEXT NOT NULL, "
+                "number INTEGER NOT NULL, "
+                "source TEXT NOT NULL, "
+                "post_url TEXT NOT NULL, "
+                "download_url TEXT NOT NULL, "
+                "filename TEXT, "
+                "title TEXT, "
+                "verified_at REAL NOT NULL, "
+                "PRIMARY KEY (hymnal, number, source))"
+            )
+            self._conn.commit()
+
+    def lookup(self, number, sources=None, hymnal=DEFAULT_HYMNAL):
+        """
+        번호에 해당하는 항목을 찾습니다. 여러 사이트에 있으면 sources 순서를 따릅니다.
+
+        Returns:
+            dict: {'number', 'source', 'post_url', 'download_url', 'filename', 'title', 'verified_at'}
+                  또는 None
+        """
+        sources = sources or DEFAULT_SOURCES
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT number, source, post_url, download_url, filename, title, verified_at "
+                "FROM hymns WHERE hymnal = ? AND number = ?",
+                (hymnal, int(number))
+            ).fetchall()
+
+        entries = {}
+        for row in rows:
+            entry = dict(zip(('number', 'source', 'post_url', 'download_url',
+                              'filename', 'title', 'verified_at'), row))
+            entries[entry['source']] = entry
+
+        for source in sources:
+            if source in entries:
+                return entries[source]
+        return None
+
+    def record(self, number, source, post_url, download_url, filename=None, title=None,
+               hymnal=DEFAULT_HYMNAL):
+        """항목을 저장(또는 갱신)하고 확인 시각을 현재로 기록합니다."""
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO hymns "
+                "(hymnal, number, source, post_url, download_url, filename, title, verified_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (hymnal, int(number), source, post_url, download_url, filename, title, time.time())
+            )
+            self._conn.commit()
+
+    def mark_verified(self, number, source, filename=None, hymnal=DEFAULT_HYMNAL):
+        """
+        다운로드에 성공한 항목의 확인 시각을 갱신합니다.
+
+        Args:
+            filename: 응답 헤더로 확인된 실제 파일명 (있으면 함께 기록)
+        """
+        with self._lock:
+            if filename:
+                self._conn.execute(
+                    "UPDATE hymns SET verified_at = ?, filename = ? "
+                    "WHERE hymnal = ? AND number = ? AND source = ?",
+                    (time.time(), filename, hymnal, int(number), source)
+                )
+            else:
+                self._conn.execute(
+                    "UPDATE hymns SET verified_at = ? WHERE hymnal = ? AND number = ? AND source = ?",
+                    (time.time(), hymnal, int(number), source)
+                )
+            self._conn.commit()
+
+    def invalidate(self, number, source=None, hymnal=DEFAULT_HYMNAL):
+        """다운로드 실패 등으로 더 이상 유효하지 않은 항목을 삭제합니다."""
+        with self._lock:
+            if source:
+                self._conn.execute(
+                    "DELETE FROM hymns WHERE hymnal = ? AND number = ? AND source = ?",
+                    (hymnal, int(number), source)
+                )
+            else:
+                self._conn.execute(
+                    "DELETE FROM hymns WHERE hymnal = ? AND number = ?", (hymnal, int(number))
+                )
+            self._conn.commit()
+
+    def titles(self, hymnal=DEFAULT_HYMNAL):
+        """
+        기록된 게시물 제목 목록 (lyric_index 색인 구축용)
+
+        Returns:
+            list: [(번호, 제목), ...]
+        """
+        with self._lock:
+            return self._conn.execute(
+                "SELECT number, title FROM hymns WHERE hymnal = ? AND title IS NOT NULL "
+                "ORDER BY number",
+                (hymnal,)
+            ).fetchall()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM hymns").fetchone()[0]
+
+
+def get_catalog():
+    """공용 카탈로그 인스턴스 (처음 호출 시 생성)"""
+    global _catalog
+    with _catalog_lock:
+        if _catalog is None:
+            _catalog = HymnCatalog()
+        return _catalog
+
+
+def _confirmed_filename(info):
+    """get_download_info 결과에서 확인된 파일명만 (제목으로 만든 추정 파일명이면 None)"""
+    return None if info.get('filename_guessed') else info['filename']
+
+
+def _entry_result(entry):
+    # 확인된 파일명이 없으면 제목으로 만든 추정 파일명 (받을 때 응답 헤더로 확인)
+    filename = entry['filename']
+    if not filename and entry['title']:
+        filename = sanitize_filename(entry['title']) + ".ppt"
+    return {
+        'title': entry['title'],
+        'post_url': entry['post_url'],
+        'download_url': entry['download_url'],
+        'filename': filename,
+        'filename_guessed': not entry['filename'],
+        'source': entry['source'],
+        'from_catalog': True
+    }
+
+
+def _revalidate_entry(catalog, entry, hymnal):
+    """
+    오래된 항목의 게시물 페이지를 다시 확인합니다. (캐시 없이)
+
+    Returns:
+        dict: 갱신된 항목 또는 None (첨부파일이 없어졌으면 항목 삭제)
+    """
+    info = get_download_info(entry['post_url'], use_cache=False)
+    if not info['download_url']:
+        catalog.invalidate(entry['number'], entry['source'], hymnal=hymnal)
+        return None
+
+    catalog.record(entry['number'], entry['source'], entry['post_url'], info['download_url'],
+                   _confirmed_filename(info) or entry['filename'], entry['title'], hymnal=hymnal)
+    return catalog.lookup(entry['number'], sources=[entry['source']], hymnal=hymnal)
+
+
+def crawl_hymn(number, source, catalog=None):
+    """
+    한 사이트에서 번호를 검색하고 다운로드 정보를 가져와 카탈로그에 기록합니다.
+
+    Returns:
+        dict: 기록된 항목 또는 None (정확한 번호의 게시물/첨부파일이 없을 때)
+    """
+    catalog = catalog or get_catalog()
+
+    query = HymnQuery.for_number(number)
+    results = query.filter(get_source(source).search(query.search_keyword))
+    if not results:
+        return None
+
+    best = results[0]
+    info = get_download_info(best['url'])
+    if not info['download_url']:
+        return None
+
+    catalog.record(number, source, best['url'], info['download_url'], _confirmed_filename(info),
+                   best['title'])
+    return catalog.lookup(number, sources=[source])
+
+
+def build_catalog(numbers, sources=None, progress_callback=None):
+    """
+    여러 번호를 크롤링하여 카탈로그를 구축합니다.
+
+    Args:
+        numbers: 번호 리스트 (예: range(1, 646))
+        sources: 크롤링할 사이트 리스트 (기본값: ['getwater', 'cwy0675'])
+        progress_callback: 진행 콜백 함수 (done, total, number)
+
+    Returns:
+        int: 기록된 항목 수
+    """
+    sources = sources or DEFAULT_SOURCES
+    catalog = get_catalog()
+    numbers = list(numbers)
+    recorded = 0
+
+    for i, number in enumerate(numbers):
+        for source in sources:
+            try:
+                if crawl_hymn(number, source, catalog):
+                    recorded += 1
+            except Exception as e:
+                print(f"[카탈로그] {number}장 ({source}) 실패: {e}")
+
+        if progress_callback:
+            progress_callback(i + 1, len(numbers), number)
+
+    return recorded
+
+
+def resolve_hymn(number, sources=None, use_cache=True):
+    """
+    번호 찬송가의 다운로드 정보를 반환합니다.
+    카탈로그에 있으면 색인 조회만 하고, 없으면 통합 검색 후 결과를 카탈로그에 기록합니다.
+
+    Args:
+        number: 번호 또는 번호 검색어 (예: 28, "28장", "통일찬송가 28장" - hymn_query로 정규화)
+        sources: 검색할 사이트 리스트
+        use_cache: False면 카탈로그/검색 캐시/다운로드 정보 캐시를 모두 건너뛰고 다시 검색
+                   (카탈로그 링크로 받기에 실패한 뒤 재시도할 때 - 같은 죽은 링크로 돌아가지 않도록)
+
+    Returns:
+        dict: {'title', 'post_url', 'download_url', 'filename', 'filename_guessed', 'source', 'from_catalog'}
+              또는 None (번호 검색어가 아니거나 검색 결과/다운로드 링크 없음)
+    """
+    query = number if isinstance(number, HymnQuery) else parse_query(str(number))
+    if not query.is_numbered:
+        return None
+    number = query.number
+
+    catalog = get_catalog()
+    entry = catalog.lookup(number, sources=sources, hymnal=query.hymnal) if use_cache else None
+    if entry and time.time() - entry['verified_at'] > CATALOG_REVALIDATE_AFTER:
+        try:
+            entry = _revalidate_entry(catalog, entry, query.hymnal)
+        except Exception as e:
+            # 재확인 실패 (일시적 네트워크 문제 등): 기존 항목 사용 - 받기에 실패하면 재검색됨
+            print(f"[카탈로그] {number}장 재확인 실패: {e}")
+    if entry:
+        return _entry_result(entry)
+
+    results = search_songs(query.search_keyword, sources=sources, use_cache=use_cache)
+    if not results:
+        return None
+
+    # 정밀 필터 (정확한 번호만) - 없으면 기존처럼 최상위 결과 사용
+    filtered_results = query.filter(results)
+    best = (filtered_results or results)[0]
+
+    info = get_download_info(best['url'], use_cache=use_cache)
+    if not info['download_url']:
+        return None
+
+    # 정확히 번호가 일치한 게시물만 카탈로그에 기록
+    if filtered_results:
+        catalog.record(number, best['source'], best['url'], info['download_url'],
+                       _confirmed_filename(info), best['title'], hymnal=query.hymnal)
+
+    return {
+        'title': best['title'],
+        'post_url': best['url'],
+        'download_url': info['download_url'],
+        'filename': info['filename'],
+        'filename_guessed': info['filename_guessed'],
+        'source': best['source'],
+        'from_catalog': False
+    }
+
+
+if __name__ == "__main__":
+    # 사용법: python hymn_catalog.py 1-645 [getwater,cwy0675]
+    range_text = sys.argv[1] if len(sys.argv) > 1 else "1-645"
+    start, _, end = range_text.partition('-')
+    target_numbers = range(int(start), int(end or start) + 1)
+    target_sources = sys.argv[2].split(',') if len(sys.argv) > 2 else None
+
+    def print_progress(done, total, number):
+        print(f"[{done}/{total}] {number}장 완료")
+
+    count = build_catalog(target_numbers, target_sources, progress_callback=print_progress)
+    print(f"카탈로그 구축 완료: {count}개 항목 기록 (전체 {len(get_catalog())}개)")
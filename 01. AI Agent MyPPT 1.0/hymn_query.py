@@ -0,0 +1,141 @@
+"""
+찬송가 검색어 정규화 모듈
+같은 찬송가가 여러 형태의 문자열로 검색됩니다.
+  - 에이전트 일괄 처리: "28장", "28"
+  - 다운로더 일괄 검색: "새찬송가 ppt 28장", "통일찬송가 ppt 28장"
+  - 혼합 모드/개별 검색: 사용자가 입력한 그대로 ("새찬송가 28장", "찬송하라 여호와의 종들아")
+
+parse_query()로 모두 (찬송가 종류, 자료 형식, 번호 또는 정규화된 제목) 하나의 키로 바꾸고,
+검색/캐시/카탈로그 조회는 이 키와 표준 검색어(search_keyword)를 사용합니다.
+정확한 'N장' 판정 정규식은 번호별로 한 번만 컴파일해 재사용합니다.
+"""
+
+import re
+from functools import lru_cache
+
+HYMNAL_NEW = "새찬송가"
+HYMNAL_UNIFIED = "통일찬송가"
+DEFAULT_HYMNAL = HYMNAL_NEW
+
+KIND_PPT = "ppt"
+KIND_SHEET = "악보"
+DEFAULT_KIND = KIND_PPT
+
+_HYMNAL_WORDS = re.compile(r'통일\s*찬송가|새\s*찬송가|찬송가')
+_KIND_WORDS = re.compile(r'(?<![a-z])pptx?(?![a-z])|악보', re.IGNORECASE)
+_NUMBER_ONLY = re.compile(r'^(\d{1,4})\s*장?$')
+_NUMBER_IN_TEXT = re.compile(r'(\d+)\s*장')
+
+
+@lru_cache(maxsize=1024)
+def number_pattern(number):
+    """제목에서 정확히 'N장'만 찾는 정규식 (예: 28장 검색 시 128장, 228장 제외) - 번호별로 한 번만 컴파일"""
+    return re.compile(r'(?:^|\s)' + str(int(number)) + r'장(?:\s|$|[^\d])')
+
+
+def find_number(text):
+    """
+    문자열에서 'N장' 번호를 찾습니다.
+
+    Returns:
+        int 또는 None
+    """
+    match = _NUMBER_IN_TEXT.search(text or '')
+    return int(match.group(1)) if match else None
+
+
+class HymnQuery:
+    """정규화된 찬송가 검색어 (번호 검색 또는 제목/가사 검색)"""
+
+    __slots__ = ('hymnal', 'kind', 'number', 'title')
+
+    def __init__(self, hymnal=DEFAULT_HYMNAL, kind=DEFAULT_KIND, number=None, title=None):
+        self.hymnal = hymnal
+        self.kind = kind
+        self.number = int(number) if number is not None else None
+        self.title = title
+
+    @classmethod
+    def for_number(cls, number, hymnal=DEFAULT_HYMNAL, kind=DEFAULT_KIND):
+        return cls(hymnal, kind, number=number)
+
+    @property
+    def is_numbered(self):
+        return self.number is not None
+
+    @property
+    def key(self):
+        """캐시/카탈로그용 표준 키: (찬송가 종류, 자료 형식, 번호 또는 소문자 제목)"""
+        if self.is_numbered:
+            return (self.hymnal, self.kind, self.number)
+        return (self.hymnal, self.kind, (self.title or '').lower())
+
+    @property
+    def key_text(self):
+        """key를 한 줄 문자열로 (캐시 키 저장용)"""
+        return "|".join(str(part) for part in self.key)
+
+    @property
+    def search_keyword(self):
+        """사이트 검색에 보낼 표준 검색어"""
+        if self.is_numbered:
+            return f"{self.hymnal} {self.kind} {self.number}장"
+        return self.title or ''
+
+    def matches(self, title):
+        """게시물 제목이 이 검색어의 정확한 번호인지 (제목 검색이면 항상 True)"""
+        if not self.is_numbered:
+            return True
+        return bool(number_pattern(self.number).search(title))
+
+    def filter(self, results):
+        """검색 결과 중 정확한 번호만 남깁니다. (제목 검색이면 그대로)"""
+        if not self.is_numbered:
+            return list(results)
+        pattern = number_pattern(self.number)
+        return [r for r in results if pattern.search(r['title'])]
+
+    def __eq__(self, other):
+        return isinstance(other, HymnQuery) and self.key == other.key
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __repr__(self):
+        return f"HymnQuery({self.key_text!r})"
+
+
+@lru_cache(maxsize=2048)
+def parse_query(text, hymnal=None, kind=None):
+    """
+    검색 문자열을 HymnQuery로 정규화합니다.
+    문자열 안의 찬송가 종류("통일찬송가")/자료 형식("악보")이 인자보다 우선합니다.
+
+    Args:
+        text: 검색 문자열 (예: "28", "28장", "새찬송가 ppt 28장", "찬송하라 여호와의 종들아")
+        hymnal: 문자열에 종류가 없을 때 사용할 찬송가 종류 (기본값: 새찬송가)
+        kind: 문자열에 형식이 없을 때 사용할 자료 형식 (기본값: ppt)
+
+    Returns:
+        HymnQuery
+    """
+    text = re.sub(r'\s+', ' ', text or '').strip()
+
+    hymnal_match = _HYMNAL_WORDS.search(text)
+    if hymnal_match and hymnal_match.group().startswith('통일'):
+        hymnal = HYMNAL_UNIFIED
+    hymnal = hymnal or DEFAULT_HYMNAL
+
+    kind_match = _KIND_WORDS.search(text)
+    if kind_match:
+        kind = KIND_SHEET if kind_match.group() == KIND_SHEET else KIND_PPT
+    kind = kind or DEFAULT_KIND
+
+    # 종류/형식 표기를 빼고 번호만 남으면 번호 검색
+    rest = _KIND_WORDS.sub(' ', _HYMNAL_WORDS.sub(' ', text)).strip()
+    number_match = _NUMBER_ONLY.match(rest)
+    if number_match:
+        return HymnQuery(hymnal, kind, number=int(number_match.group(1)))
+
+    # 제목/가사 검색은 입력한 문자열 그대로 (cwy0675 자연어 검색)
+    return HymnQuery(hymnal, kind, title=text)
@@ -0,0 +1,140 @@
+"""
+내장 새찬송가 목록 모듈
+'내 평생 소원 이것뿐', '저 높은 곳을 향하여' 같은 텍스트 찬송 제목을 네트워크 없이 번호로 바꿉니다.
+(카탈로그/첫 소절 색인은 이미 받아 본 곡만 알기 때문에 처음 쓰는 제목은 사이트 검색이 필요했음)
+
+자료: 프로그램과 함께 배포되는 hymnal_new.tsv
+  번호<TAB>제목<TAB>별칭(;로 구분)<TAB>첫 소절(비어 있으면 제목과 같음)
+
+조회:
+  1. 정확히 일치 (제목/별칭/첫 소절, 공백·대소문자 무시) → 번호로 바로 변환 (resolve)
+  2. 유사 일치 (lyric_index와 같은 n-gram 점수) → 후보로만 반환 (lookup)
+     목록에 없는 곡과 섞일 수 있으므로 자동 변환하지 않고 사용자 검수를 거칩니다.
+"""
+
+import os
+import sys
+import threading
+
+from lyric_index import LyricIndex, clean_title
+from similarity import normalize
+
+HYMNAL_FILE = "hymnal_new.tsv"
+
+MATCH_EXACT = 'exact'
+MATCH_FUZZY = 'fuzzy'
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def _bundled_path():
+    """배포 폴더(PyInstaller 실행 시 _MEIPASS)의 목록 파일 경로"""
+    base_dir = getattr(sys, '_MEIPASS', os.path.dirname(os.path.abspath(__file__)))
+    return os.path.join(base_dir, HYMNAL_FILE)
+
+
+class HymnEntry:
+    """찬송가 한 곡"""
+
+    __slots__ = ('number', 'title', 'aliases', 'first_line')
+
+    def __init__(self, number, title, aliases=(), first_line=None):
+        self.number = int(number)
+        self.title = title
+        self.aliases = tuple(aliases)
+        self.first_line = first_line or title
+
+    def texts(self):
+        """조회에 쓰는 모든 이름 (제목, 별칭, 첫 소절)"""
+        return (self.title, self.first_line) + self.aliases
+
+
+class HymnalTable:
+    """번호 ↔ 제목 조회 (정확 일치, 유사 일치 후보)"""
+
+    def __init__(self, entries=()):
+        self.entries = {}       # 번호 -> HymnEntry
+        self._exact = {}        # 정규화된 이름 -> {번호, ...}
+        self._fuzzy = LyricIndex()
+        for entry in entries:
+            self.add(entry)
+
+    def add(self, entry):
+        self.entries[entry.number] = entry
+        for text in entry.texts():
+            key = normalize(text)
+            if not key:
+                continue
+            self._exact.setdefault(key, set()).add(entry.number)
+            self._fuzzy.add(entry.number, text)
+
+    def __len__(self):
+        return len(self.entries)
+
+    def get(self, number):
+        """번호로 곡 정보 (없으면 None)"""
+        return self.entries.get(int(number))
+
+    def lookup(self, query):
+        """
+        제목/별칭/첫 소절로 번호를 찾습니다.
+        MATCH_FUZZY 결과는 후보일 뿐이므로 바로 사용하지 말고 사용자 검수를 거쳐야 합니다.
+
+        Args:
+            query: 텍스트 찬송 제목 (예: "내 평생 소원 이것뿐", "새찬송가 450장 내 평생 소원 이것뿐")
+
+        Returns:
+            tuple: (번호, 일치 방식 MATCH_EXACT/MATCH_FUZZY) 또는 None (없거나 여러 곡에 해당)
+        """
+        key = normalize(clean_title(query or ''))
+        if not key:
+            return None
+
+        numbers = self._exact.get(key)
+        if numbers:
+            return (next(iter(numbers)), MATCH_EXACT) if len(numbers) == 1 else None
+
+        number = self._fuzzy.resolve_to_number(key)
+        if number is not None:
+            return number, MATCH_FUZZY
+        return None
+
+    def resolve(self, query):
+        """정확히 일치한 번호 또는 None (유사 일치 후보는 제외)"""
+        match = self.lookup(query)
+        return match[0] if match and match[1] == MATCH_EXACT else None
+
+
+def load_table(path=None):
+    """
+    TSV 파일에서 목록을 읽습니다. (# 주석 줄, 잘못된 줄은 건너뜀)
+
+    Returns:
+        HymnalTable: 파일이 없으면 빈 목록
+    """
+    path = path or _bundled_path()
+    table = HymnalTable()
+    if not os.path.exists(path):
+        return table
+
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            if line.startswith('#'):
+                continue
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) < 2 or not parts[0].strip().isdigit() or not parts[1].strip():
+                continue
+            parts += [''] * (4 - len(parts))
+            aliases = [alias.strip() for alias in parts[2].split(';') if alias.strip()]
+            table.add(HymnEntry(parts[0].strip(), parts[1].strip(), aliases, parts[3].strip()))
+    return table
+
+
+def get_hymnal_table():
+    """공용 목록 (처음 호출 시 읽음)"""
+    global _table
+    with _table_lock:
+        if _table is None:
+            _table = load_table()
+        return _table
@@ -0,0 +1,216 @@
+"""
+찬송가 첫 소절(제목) 색인 모듈
+'찬송하라 여호와의 종들아' 같은 텍스트 검색어를 사이트 검색 없이 찬송가 번호 후보로 변환합니다.
+
+한글 음절 2-gram과 자모 3-gram으로 역색인(gram → 번호)을 만들고,
+검색어 gram이 얼마나(희귀한 gram일수록 가중치 높게) 겹치는지로 점수를 매깁니다.
+번호로 확정(resolve_to_number)할 때는 반대 방향(검색어가 제목의 얼마만큼을 덮는지)과
+검색어 길이도 봅니다. ('은혜', '주 하나님'처럼 짧거나 흔한 말은 여러 제목에 들어 있으므로 확정하지 않음)
+
+색인 자료:
+  - 찬송가 카탈로그(hymn_catalog)에 기록된 게시물 제목 (예: "새찬송가 28장 복의 근원 강림하사 PPT")
+  - 데이터 폴더의 hymn_first_lines.tsv (선택): 번호<TAB>제목<TAB>첫 소절
+"""
+
+import math
+import os
+import re
+import threading
+
+from cache_store import get_data_dir
+from similarity import decompose_jamo, ngrams, normalize
+
+FIRST_LINES_FILE = "hymn_first_lines.tsv"
+
+SYLLABLE_NGRAM_SIZE = 2
+JAMO_NGRAM_SIZE = 3
+
+# resolve_to_number 기준: 최고 점수가 이 값 이상이고 2위보다 충분히 높을 때만 확정
+CONFIDENT_SCORE = 0.75
+CONFIDENT_MARGIN = 0.15
+# 그리고 검색어가 제목 gram의 이 비율 이상을 덮고, 공백 제외 이 글자 수 이상일 때만
+CONFIDENT_COVERAGE = 0.5
+MIN_QUERY_LENGTH = 4
+
+# 게시물 제목에서 곡명이 아닌 부분 (찬송가 종류, 번호, 자료 형식 표기 등)
+_TITLE_NOISE = re.compile(
+    r'새찬송가|통일찬송가|찬송가|\d+\s*장|ppt[x]?|악보|가사|배경|무배경|와이드|wide|16:9|4:3|'
+    r'[\[\](){}<>「」『』【】\-_:|/.,~!]',
+    re.IGNORECASE
+)
+_HYMN_NUMBER = re.compile(r'(\d+)\s*장')
+
+_index = None
+_index_source_size = None
+_index_lock = threading.Lock()
+
+
+def clean_title(title):
+    """게시물 제목에서 곡명(첫 소절)만 남깁니다."""
+    return re.sub(r'\s+', ' ', _TITLE_NOISE.sub(' ', title)).strip()
+
+
+def _grams(text):
+    """색인/검색용 gram 집합 (음절 2-gram + 자모 3-gram)"""
+    text = normalize(text)
+    grams = {('s', g) for g in ngrams(text, SYLLABLE_NGRAM_SIZE)}
+    grams |= {('j', g) for g in ngrams(decompose_jamo(text), JAMO_NGRAM_SIZE)}
+    return grams
+
+
+class LyricIndex:
+    """찬송가 제목/첫 소절 역색인"""
+
+    def __init__(self):
+        self.postings = {}     # gram -> {번호, ...}
+        self.texts = {}        # 번호 -> {색인된 텍스트, ...}
+        self.text_grams = {}   # 번호 -> [텍스트별 gram 집합, ...] (제목 쪽 비율 계산용)
+
+    def add(self, number, text):
+        """번호에 제목/첫 소절 텍스트를 추가합니다."""
+        number = int(number)
+        text = text.strip()
+        if not text or text in self.texts.get(number, ()):
+            return
+        self.texts.setdefault(number, set()).add(text)
+        grams = _grams(text)
+        if grams:
+            self.text_grams.setdefault(number, []).append(frozenset(grams))
+        for gram in grams:
+            self.postings.setdefault(gram, set()).add(number)
+
+    def __len__(self):
+        return len(self.texts)
+
+    def search(self, query, limit=5):
+        """
+        검색어와 비슷한 찬송가 번호 후보를 찾습니다.
+
+        Args:
+            query: 제목 또는 첫 소절 (예: "찬송하라 여호와의 종들아")
+            limit: 최대 후보 수
+
+        Returns:
+            list: [(번호, 점수), ...] 점수 내림차순 (점수: 0~1, 1 = 검색어 gram 전부 일치)
+        """
+        query_grams = _grams(query)
+        if not query_grams or not self.texts:
+            return []
+
+        total_docs = len(self.texts)
+        scores = {}
+        total_weight = 0.0
+
+        for gram in query_grams:
+            numbers = self.postings.get(gram, ())
+            # 희귀한 gram일수록 가중치가 큼 (idf)
+            weight = math.log(1 + total_docs / (1 + len(numbers)))
+            total_weight += weight
+            for number in numbers:
+                scores[number] = scores.get(number, 0.0) + weight
+
+        ranked = sorted(((n, s / total_weight) for n, s in scores.items()),
+                        key=lambda item: (-item[1], item[0]))
+        return ranked[:limit]
+
+    def coverage(self, number, query):
+        """
+        검색어가 번호의 색인 텍스트를 얼마나 덮는지 (0~1, 텍스트가 여러 개면 가장 높은 값)
+        예: '은혜' → '아 하나님의 은혜로'는 낮음, '나 같은 죄인 살리신' → '나 같은 죄인 살리신'은 1
+        """
+        query_grams = _grams(query)
+        best = 0.0
+        for grams in self.text_grams.get(int(number), ()):
+            best = max(best, len(grams & query_grams) / len(grams))
+        return best
+
+    def resolve_to_number(self, query):
+        """
+        검색어가 한 곡을 확실히 가리키면 번호를 반환합니다. (아니면 None)
+        검증 없이 바로 쓰이므로 검색어 쪽 점수, 2위와의 차이, 제목 쪽 비율, 검색어 길이를 모두 봅니다.
+        """
+        if len(normalize(query)) < MIN_QUERY_LENGTH:
+            return None
+
+        candidates = self.search(query, limit=2)
+        if not candidates:
+            return None
+
+        best_number, best_score = candidates[0]
+        second_score = candidates[1][1] if len(candidates) > 1 else 0.0
+        if best_score < CONFIDENT_SCORE or best_score - second_score < CONFIDENT_MARGIN:
+            return None
+        if self.coverage(best_number, query) < CONFIDENT_COVERAGE:
+            return None
+        return best_number
+
+
+def load_first_lines(index, path=None):
+    """
+    TSV 파일(번호<TAB>제목<TAB>첫 소절)을 색인에 추가합니다.
+
+    Returns:
+        int: 추가한 줄 수
+    """
+    path = path or os.path.join(get_data_dir(), FIRST_LINES_FILE)
+    if not os.path.exists(path):
+        return 0
+
+    count = 0
+    with open(path, encoding='utf-8') as f:
+        for line in f:
+            parts = line.rstrip('\n').split('\t')
+            if len(parts) < 2 or not parts[0].strip().isdigit():
+                continue
+            for text in parts[1:]:
+                index.add(parts[0].strip(), text)
+            count += 1
+    return count
+
+
+def build_index(catalog=None):
+    """카탈로그 제목과 첫 소절 파일로 색인을 만듭니다."""
+    index = LyricIndex()
+
+    if catalog is not None:
+        for number, title in catalog.titles():
+            # 게시물 제목의 번호와 카탈로그 번호가 같은 경우만 사용
+            match = _HYMN_NUMBER.search(title or '')
+            if match and int(match.group(1)) == number:
+                index.add(number, clean_title(title))
+
+    load_first_lines(index)
+    return index
+
+
+def get_lyric_index():
+    """
+    공용 색인 (처음 호출 시 생성, 카탈로그가 커지면 다시 생성)
+    """
+    global _index, _index_source_size
+    from hymn_catalog import get_catalog
+
+    catalog = get_catalog()
+    with _index_lock:
+        catalog_size = len(catalog)
+        if _index is None or catalog_size != _index_source_size:
+            _index = build_index(catalog)
+            _index_source_size = catalog_size
+        return _index
+
+
+def resolve_hymn_number(query):
+    """
+    텍스트 찬송 제목을 로컬 자료로 번호로 변환합니다.
+    내장 새찬송가 목록(hymnal_table)에서 정확히 일치하는 제목/별칭을 먼저 보고,
+    없으면 카탈로그/첫 소절 색인을 봅니다. (목록의 유사 일치 후보는 변환하지 않음)
+
+    Returns:
+        int: 확실한 번호, 또는 None (후보가 없거나 애매함)
+    """
+    from hymnal_table import get_hymnal_table
+
+    number = get_hymnal_table().resolve(query)
+    if number is not None:
+        return number
+    return get_lyric_index().resolve_to_number(query)
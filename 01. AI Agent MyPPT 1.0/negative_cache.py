@@ -0,0 +1,87 @@
+"""
+검색 실패(결과 없음) 캐시 모듈
+결과가 없던 (검색어, 사이트)와 첨부파일이 없던 게시물을 기록해 두고,
+재시도 간격 동안은 같은 검색/게시물 분석을 다시 하지 않습니다.
+
+재시도 간격은 실패할 때마다 두 배로 늘어납니다. (1시간 → 2시간 → 4시간 ... 최대 7일)
+새 게시물이 올라와 다시 찾게 되면 기록이 지워지고 간격도 처음부터 시작합니다.
+"""
+
+import threading
+import time
+
+from cache_store import PersistentCache
+
+NEGATIVE_BASE_INTERVAL = 60 * 60            # 첫 재시도 간격 (1시간)
+NEGATIVE_MAX_INTERVAL = 7 * 24 * 60 * 60    # 최대 재시도 간격 (7일)
+NEGATIVE_RECORD_TTL = 30 * 24 * 60 * 60     # 실패 횟수 기록 보관 기간 (간격 계산용)
+NEGATIVE_MAX_ENTRIES = 5000
+
+_negative_cache = None
+_negative_cache_lock = threading.Lock()
+
+
+class NegativeCache:
+    """(종류, 키, 사이트)별 실패 기록과 다음 재시도 시각"""
+
+    def __init__(self, base_interval=NEGATIVE_BASE_INTERVAL, max_interval=NEGATIVE_MAX_INTERVAL):
+        self.base_interval = base_interval
+        self.max_interval = max_interval
+        self._cache = PersistentCache('negative_results', ttl=NEGATIVE_RECORD_TTL,
+                                      max_entries=NEGATIVE_MAX_ENTRIES)
+
+    @staticmethod
+    def _key(kind, key, source):
+        return f"{kind}:{source or ''}:{key}"
+
+    def retry_in(self, kind, key, source=None):
+        """
+        최근 실패한 항목이면 다시 시도할 수 있을 때까지 남은 시간(초), 아니면 0
+
+        Args:
+            kind: 'search' (검색어) / 'post' (게시물 URL)
+            key: 검색어 또는 게시물 URL
+            source: 사이트 이름 (검색어일 때)
+        """
+        entry = self._cache.get(self._key(kind, key, source))
+        if not entry:
+            return 0
+        return max(0, entry['retry_at'] - time.time())
+
+    def is_known_miss(self, kind, key, source=None):
+        """재시도 간격이 지나지 않은 실패 항목인지"""
+        return self.retry_in(kind, key, source) > 0
+
+    def record_miss(self, kind, key, source=None):
+        """
+        실패를 기록합니다. 연속 실패 횟수만큼 재시도 간격이 두 배씩 늘어납니다.
+
+        Returns:
+            float: 이번 재시도 간격(초)
+        """
+        cache_key = self._key(kind, key, source)
+        entry = self._cache.get(cache_key) or {'misses': 0}
+        misses = entry['misses'] + 1
+        interval = min(self.base_interval * (2 ** (misses - 1)), self.max_interval)
+        self._cache.set(cache_key, {'misses': misses, 'retry_at': time.time() + interval})
+        return interval
+
+    def record_hit(self, kind, key, source=None):
+        """다시 찾았으면 실패 기록을 지웁니다."""
+        self._cache.delete(self._key(kind, key, source))
+
+    def clear(self):
+        self._cache.clear()
+
+
+def get_negative_cache():
+    """공용 실패 캐시 인스턴스 (처음 호출 시 생성, 열 수 없으면 None - 캐시 없이 동작)"""
+    global _negative_cache
+    with _negative_cache_lock:
+        if _negative_cache is None:
+            try:
+                _negative_cache = NegativeCache()
+            except Exception as e:
+                print(f"[캐시] 실패 캐시를 열 수 없습니다: {e}")
+                return None
+        return _negative_cache
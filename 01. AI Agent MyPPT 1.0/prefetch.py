@@ -0,0 +1,198 @@
+"""
+검색 결과 미리 받기(prefetch) 모듈
+검색이 끝나면 사용자가 고르기 전에 사이트별 상위 결과의 다운로드 정보를 백그라운드에서 미리 조회하고,
+선택하면 1순위 결과의 첨부파일도 미리 받아 둡니다.
+
+  - 다운로드 정보: get_download_info 결과가 캐시되므로 선택 후 조회가 즉시 끝남
+  - 첨부파일: 데이터 폴더의 prefetch 폴더로 받아 보관소(blob_store)에 등록 →
+    선택 후 download_file은 변경 확인(304) 요청 한 번으로 보관본을 하드링크
+  - 첨부파일은 용량 예산(byte_budget) 안에서만 받고, 사용자가 다른 곡을 고르면 취소
+    예산에는 아직 쓰이지 않은 미리 받은 파일과 받다 만 임시 파일(.tmp)만 계산
+    (곡을 고르거나 보관소에서 제거되면 예산이 돌아옴, 오래된 임시 파일은 삭제)
+  - 대역폭 우선순위는 background: 사용자가 고른 곡을 받는 동안은 멈춤 (download_scheduler)
+
+사용:
+    prefetcher = Prefetcher()
+    prefetcher.prefetch(results)     # 검색 완료 후
+    prefetcher.focus(result['url'])  # 곡 선택 시 (다른 미리 받기 취소, 선택한 곡은 끝날 때까지 대기)
+"""
+
+import hashlib
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FuturesTimeoutError
+
+from blob_store import get_blob_store
+from cache_store import get_data_dir
+from download_scheduler import PRIORITY_BACKGROUND
+from song_search import get_download_info, download_file, DownloadCancelled, DownloadTooLarge
+
+PREFETCH_DIR_NAME = "prefetch"
+PREFETCH_TOP_K = 2                         # 사이트별 다운로드 정보를 미리 조회할 결과 수
+PREFETCH_BYTE_BUDGET = 100 * 1024 * 1024   # 첨부파일 미리 받기 총 용량 (100MB)
+PREFETCH_WORKERS = 2
+FOCUS_WAIT = 60                            # 선택한 곡의 미리 받기가 진행 중이면 기다릴 최대 시간(초)
+PARTIAL_MAX_AGE = 24 * 60 * 60             # 이보다 오래된 받다 만 임시 파일은 삭제 (1일)
+PARTIAL_SUFFIXES = ('.tmp', '.tmp.json')
+
+
+class Prefetcher:
+    """검색 결과 상위 항목의 다운로드 정보/첨부파일 미리 받기"""
+
+    def __init__(self, top_k=PREFETCH_TOP_K, byte_budget=PREFETCH_BYTE_BUDGET,
+                 download_first=True, max_workers=PREFETCH_WORKERS):
+        self.top_k = top_k
+        self.byte_budget = byte_budget
+        self.download_first = download_first
+
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._lock = threading.Lock()
+        self._jobs = {}        # 게시물 URL -> (future, cancel_event)
+        self._prefetched = {}  # 게시물 URL -> (첨부파일 URL, 크기) - 미리 받았지만 아직 고르지 않은 파일
+        self._dir = os.path.join(get_data_dir(), PREFETCH_DIR_NAME)
+        self.remove_stale_partials()
+
+    def _partial_files(self):
+        try:
+            names = os.listdir(self._dir)
+        except OSError:
+            return []
+        return [os.path.join(self._dir, name) for name in names if name.endswith(PARTIAL_SUFFIXES)]
+
+    def remove_stale_partials(self, max_age=PARTIAL_MAX_AGE):
+        """
+        받다 만 임시 파일 중 오래된 것을 삭제합니다. (이어받기 기회가 지난 파일)
+
+        Returns:
+            int: 삭제한 파일 수
+        """
+        removed = 0
+        now = time.time()
+        for path in self._partial_files():
+            try:
+                if now - os.path.getmtime(path) > max_age:
+                    os.remove(path)
+                    removed += 1
+            except OSError:
+                pass
+        return removed
+
+    @property
+    def bytes_used(self):
+        """예산 사용량: 아직 쓰이지 않은 미리 받은 파일 + 받다 만 임시 파일"""
+        store = get_blob_store()
+        with self._lock:
+            # 보관소에서 제거된(용량 초과 등) 파일은 예산에서 뺌
+            for post_url, (download_url, _) in list(self._prefetched.items()):
+                if not store.has_url(download_url):
+                    del self._prefetched[post_url]
+            used = sum(size for _, size in self._prefetched.values())
+
+        for path in self._partial_files():
+            if path.endswith('.tmp'):
+                try:
+                    used += os.path.getsize(path)
+                except OSError:
+                    pass
+        return used
+
+    def _remaining_budget(self):
+        return max(0, self.byte_budget - self.bytes_used)
+
+    def _prefetch_one(self, post_url, with_file, cancel_event):
+        """다운로드 정보 조회 (+ 첨부파일 받기). 작업 스레드에서 실행"""
+        if cancel_event.is_set():
+            return None
+
+        info = get_download_info(post_url)
+        if not with_file or not info['download_url'] or cancel_event.is_set():
+            return info
+
+        remaining = self._remaining_budget()
+        if remaining <= 0:
+            return info
+
+        # 보관소 등록용 임시 경로 (URL별 고정 이름 → 중단되면 다음에 이어받기)
+        # 첨부파일 확장자를 붙여서 download_file의 형식 검사(.ppt/.pptx)가 적용되도록 함
+        name = hashlib.sha256(info['download_url'].encode('utf-8')).hexdigest()[:32]
+        ext = os.path.splitext(info['filename'] or '')[1].lower()
+        temp_path = os.path.join(self._dir, name + ext)
+        try:
+            download_file(info['download_url'], temp_path, cancel_event=cancel_event, max_bytes=remaining,
+                          priority=PRIORITY_BACKGROUND)
+            size = os.path.getsize(temp_path)
+            with self._lock:
+                self._prefetched[post_url] = (info['download_url'], size)
+        except (DownloadCancelled, DownloadTooLarge):
+            pass
+        finally:
+            # 보관소에 하드링크(또는 복사)로 등록되었으므로 임시 이름은 지움
+            if os.path.exists(temp_path):
+                try:
+                    os.remove(temp_path)
+                except OSError:
+                    pass
+        return info
+
+    def prefetch(self, results):
+        """
+        검색 결과의 사이트별 상위 top_k개를 미리 조회합니다. (전체 1순위는 첨부파일도 받음)
+        이전 검색의 미리 받기는 취소됩니다.
+
+        Args:
+            results: 점수순 검색 결과 리스트 (SearchResult 또는 dict)
+        """
+        self.cancel_all()
+
+        per_source = {}
+        targets = []
+        for result in results:
+            source = result.get('source', 'unknown')
+            if per_source.get(source, 0) >= self.top_k:
+                continue
+            per_source[source] = per_source.get(source, 0) + 1
+            targets.append(result['url'])
+
+        with self._lock:
+            for i, post_url in enumerate(targets):
+                if post_url in self._jobs:
+                    continue
+                cancel_event = threading.Event()
+                with_file = self.download_first and i == 0
+                future = self._executor.submit(self._prefetch_one, post_url, with_file, cancel_event)
+                self._jobs[post_url] = (future, cancel_event)
+
+    def focus(self, post_url, timeout=FOCUS_WAIT):
+        """
+        사용자가 곡을 골랐을 때 호출합니다.
+        다른 곡의 미리 받기는 취소하고, 고른 곡의 미리 받기가 진행 중이면 끝날 때까지 기다립니다.
+        """
+        with self._lock:
+            target = self._jobs.get(post_url)
+            for url, (future, cancel_event) in self._jobs.items():
+                if url != post_url:
+                    future.cancel()
+                    cancel_event.set()
+            self._jobs = {post_url: target} if target else {}
+
+        if target:
+            try:
+                target[0].result(timeout=timeout)
+            except FuturesTimeoutError:
+                pass
+            except Exception as e:
+                # 미리 받기 실패는 무시 (선택 후 정상 경로로 다시 받음)
+                print(f"[미리 받기] 실패: {e}")
+
+        # 고른 곡의 미리 받은 파일은 이제 쓰이므로 예산에서 뺌
+        with self._lock:
+            self._prefetched.pop(post_url, None)
+
+    def cancel_all(self):
+        """진행 중인 미리 받기를 모두 취소합니다."""
+        with self._lock:
+            for future, cancel_event in self._jobs.values():
+                future.cancel()
+                cancel_event.set()
+            self._jobs = {}
@@ -0,0 +1,261 @@
+"""
+녹화 응답 재생(replay) 서버
+getwater/cwy0675 검색·게시물 페이지, 첨부파일(daumcdn 등), bskorea 성경 페이지 응답을 녹화해 두고
+로컬 HTTP 서버로 다시 제공합니다. 실제 사이트 없이 같은 조건으로 반복 측정할 수 있습니다.
+
+  - 지연/흔들림: 응답마다 latency ± jitter초 대기
+  - 오류 주입: error_rate 확률로 503 응답 또는 연결 끊기
+  - Range(206), If-None-Match(304) 지원 → 이어받기/조건부 요청 경로도 재현
+
+요청은 http_client.use_replay_server(서버 주소)로 이 서버에 보내집니다.
+(https://getwater.tistory.com/search/x → http://127.0.0.1:포트/https/getwater.tistory.com/search/x)
+
+사용법:
+  python replay_server.py record --keywords "새찬송가 ppt 28장" "찬송하라 여호와의 종들아" --verses "요 3:16"
+  python replay_server.py serve --port 8765 --latency 0.05 --jitter 0.02 --error-rate 0.01
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import random
+import sys
+import tempfile
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+from requests.utils import requote_uri
+
+import http_client
+from cache_store import DATA_DIR_ENV
+
+DEFAULT_FIXTURE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures", "replay")
+INDEX_NAME = "index.json"
+
+# 녹화할 응답 헤더
+RECORDED_HEADERS = ('Content-Type', 'Content-Disposition', 'ETag', 'Last-Modified')
+
+
+class ReplayStore:
+    """녹화된 응답 저장소 (URL → 상태 코드, 헤더, 본문 파일)"""
+
+    def __init__(self, fixture_dir=DEFAULT_FIXTURE_DIR):
+        self.fixture_dir = fixture_dir
+        self._lock = threading.Lock()
+        self.entries = {}
+        self.keywords = []
+        self.verses = []
+
+        index_path = os.path.join(fixture_dir, INDEX_NAME)
+        if os.path.exists(index_path):
+            with open(index_path, encoding='utf-8') as f:
+                index = json.load(f)
+            self.entries = index.get('entries', {})
+            self.keywords = index.get('keywords', [])
+            self.verses = index.get('verses', [])
+
+    def save(self):
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        with open(os.path.join(self.fixture_dir, INDEX_NAME), 'w', encoding='utf-8') as f:
+            json.dump({'entries': self.entries, 'keywords': self.keywords, 'verses': self.verses},
+                      f, ensure_ascii=False, indent=2)
+
+    def record(self, url, response):
+        """응답 하나를 녹화합니다. (304 등 본문 없는 응답은 제외)"""
+        if response.status_code != 200:
+            return
+        # 한글/공백이 든 첨부파일 URL도 요청 경로(퍼센트 인코딩)와 같은 키가 되도록 정규화
+        url = requote_uri(url)
+        filename = hashlib.sha1(url.encode('utf-8')).hexdigest()
+        os.makedirs(self.fixture_dir, exist_ok=True)
+        with open(os.path.join(self.fixture_dir, filename), 'wb') as f:
+            f.write(response.content)
+
+        headers = {k: response.headers[k] for k in RECORDED_HEADERS if k in response.headers}
+        with self._lock:
+            self.entries[url] = {'file': filename, 'status': 200, 'headers': headers}
+
+    def lookup(self, url):
+        """
+        Returns:
+            (entry dict, 본문 bytes) 또는 None
+        """
+        entry = self.entries.get(requote_uri(url))
+        if entry is None:
+            return None
+        with open(os.path.join(self.fixture_dir, entry['file']), 'rb') as f:
+            return entry, f.read()
+
+
+class ReplayHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    # ReplayServer가 설정
+    store = None
+    latency = 0.0
+    jitter = 0.0
+    error_rate = 0.0
+
+    def log_message(self, format, *args):
+        pass
+
+    def _original_url(self):
+        # /https/host/path?query → https://host/path?query
+        scheme, _, rest = self.path.lstrip('/').partition('/')
+        return f"{scheme}://{rest}"
+
+    def _send(self, status, headers, body=b''):
+        self.send_response(status)
+        for key, value in headers.items():
+            self.send_header(key, value)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        if body and self.command != 'HEAD':
+            self.wfile.write(body)
+
+    def do_GET(self):
+        delay = self.latency + random.uniform(-self.jitter, self.jitter)
+        if delay > 0:
+            time.sleep(delay)
+
+        # 오류 주입: 절반은 503, 절반은 연결 끊기
+        if self.error_rate and random.random() < self.error_rate:
+            if random.random() < 0.5:
+                self._send(503, {})
+            else:
+                self.close_connection = True
+                self.connection.shutdown(2)
+            return
+
+        found = self.store.lookup(self._original_url())
+        if found is None:
+            self._send(404, {'Content-Type': 'text/plain'}, b'not recorded')
+            return
+
+        entry, body = found
+        headers = dict(entry['headers'])
+        etag = headers.get('ETag')
+
+        if etag and self.headers.get('If-None-Match') == etag:
+            self._send(304, {'ETag': etag})
+            return
+
+        range_header = self.headers.get('Range')
+        if range_header and range_header.startswith('bytes=') and \
+                (not self.headers.get('If-Range') or self.headers.get('If-Range') == etag):
+            start = int(range_header[6:].split('-')[0] or 0)
+            if start >= len(body):
+                self._send(416, {'Content-Range': f"bytes */{len(body)}"})
+                return
+            headers['Content-Range'] = f"bytes {start}-{len(body) - 1}/{len(body)}"
+            self._send(206, headers, body[start:])
+            return
+
+        self._send(200, headers, body)
+
+    do_HEAD = do_GET
+
+
+class _QuietHTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def handle_error(self, request, client_address):
+        # 다운로드 취소/형식 오류로 클라이언트가 연결을 먼저 끊는 것은 정상
+        if isinstance(sys.exc_info()[1], ConnectionError):
+            return
+        super().handle_error(request, client_address)
+
+
+class ReplayServer:
+    """백그라운드 스레드에서 도는 재생 서버"""
+
+    def __init__(self, store, port=0, latency=0.0, jitter=0.0, error_rate=0.0):
+        handler = type('ConfiguredReplayHandler', (ReplayHandler,), {
+            'store': store, 'latency': latency, 'jitter': jitter, 'error_rate': error_rate
+        })
+        self.httpd = _QuietHTTPServer(('127.0.0.1', port), handler)
+        self.base_url = f"http://127.0.0.1:{self.httpd.server_port}"
+        self._thread = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self.httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self.httpd.shutdown()
+        self.httpd.server_close()
+
+
+def record_fixtures(keywords, verses, fixture_dir=DEFAULT_FIXTURE_DIR, posts_per_source=1):
+    """
+    실제 사이트에 요청해서 검색 → 게시물 → 첨부파일, 성경 구절 응답을 녹화합니다.
+    (조건부 요청 캐시가 304만 받아오지 않도록 빈 임시 데이터 폴더에서 실행)
+    """
+    os.environ[DATA_DIR_ENV] = tempfile.mkdtemp(prefix="myppt_record_")
+
+    from bible_search import search_and_get_verse
+    from song_search import search_songs, get_download_info
+
+    store = ReplayStore(fixture_dir)
+    http_client.add_response_hook(store.record)
+    try:
+        for keyword in keywords:
+            print(f"[녹화] {keyword}")
+            results = search_songs(keyword, use_cache=False)
+            per_source = {}
+            for result in results:
+                if per_source.get(result['source'], 0) >= posts_per_source:
+                    continue
+                per_source[result['source']] = per_source.get(result['source'], 0) + 1
+
+                info = get_download_info(result['url'], use_cache=False)
+                if info['download_url']:
+                    # 첨부파일은 stream 없이 받아야 녹화됨
+                    http_client.get(info['download_url'], timeout=60)
+            if keyword not in store.keywords:
+                store.keywords.append(keyword)
+
+        for verse in verses:
+            print(f"[녹화] {verse}")
+            search_and_get_verse(verse)
+            if verse not in store.verses:
+                store.verses.append(verse)
+    finally:
+        http_client.remove_response_hook(store.record)
+        store.save()
+
+    print(f"녹화 완료: 응답 {len(store.entries)}개 ({fixture_dir})")
+    return store
+
+
+if __name__ == "__main__":
+    arg_parser = argparse.ArgumentParser(description="녹화 응답 재생 서버")
+    sub = arg_parser.add_subparsers(dest='command', required=True)
+
+    record_parser = sub.add_parser('record', help="실제 사이트 응답 녹화")
+    record_parser.add_argument('--keywords', nargs='*', default=[], help="찬송가 검색어")
+    record_parser.add_argument('--verses', nargs='*', default=[], help="성경 구절 (예: '요 3:16')")
+    record_parser.add_argument('--dir', default=DEFAULT_FIXTURE_DIR, help="녹화 폴더")
+
+    serve_parser = sub.add_parser('serve', help="녹화된 응답 제공")
+    serve_parser.add_argument('--dir', default=DEFAULT_FIXTURE_DIR, help="녹화 폴더")
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--latency', type=float, default=0.0, help="응답 지연(초)")
+    serve_parser.add_argument('--jitter', type=float, default=0.0, help="지연 흔들림(초)")
+    serve_parser.add_argument('--error-rate', type=float, default=0.0, help="오류 주입 확률 (0~1)")
+
+    args = arg_parser.parse_args()
+
+    if args.command == 'record':
+        record_fixtures(args.keywords, args.verses, args.dir)
+    else:
+        server = ReplayServer(ReplayStore(args.dir), args.port, args.latency, args.jitter, args.error_rate)
+        print(f"재생 서버 시작: {server.base_url} (응답 {len(server.httpd.RequestHandlerClass.store.entries)}개)")
+        print(f"앱에서 사용: http_client.use_replay_server('{server.base_url}')")
+        try:
+            server.httpd.serve_forever()
+        except KeyboardInterrupt:
+            server.stop()
@@ -0,0 +1,142 @@
+"""
+검색 결과 모델
+검색 결과 한 건(SearchResult)과 URL 기준으로 중복을 제거하는 결과 목록(ResultSet)을 정의합니다.
+
+SearchResult는 기존 dict 결과와 같은 방식(result['title'], result.get('source'))으로 접근할 수 있고,
+제목에서 미리 뽑아 둔 찬송가 번호와 자료 형식 표기(배경/무배경/와이드/악보)를 함께 가집니다.
+"""
+
+import re
+
+_HYMN_NUMBER = re.compile(r'(?:^|\s|\D)(\d{1,3})\s*장')
+
+
+def parse_hymn_number(title):
+    """제목에서 찬송가 번호(N장)를 찾습니다. 없으면 None"""
+    match = _HYMN_NUMBER.search(title or '')
+    return int(match.group(1)) if match else None
+
+
+class SearchResult:
+    """검색 결과 한 건"""
+
+    FIELDS = ('title', 'url', 'source', 'thumbnail', 'score')
+
+    __slots__ = FIELDS + ('hymn_number', 'has_background', 'no_background', 'is_wide', 'is_sheet')
+
+    def __init__(self, title, url, source, thumbnail=None, score=None):
+        self.title = title
+        self.url = url
+        self.source = source
+        self.thumbnail = thumbnail
+        self.score = score
+
+        # 제목 구조 정보 (정렬/필터링 시 다시 검사하지 않도록 생성 시 한 번만 계산)
+        compact_title = title.replace(" ", "").lower()
+        self.hymn_number = parse_hymn_number(title)
+        self.no_background = '배경없는' in compact_title or '무배경' in compact_title
+        self.has_background = '배경' in compact_title and not self.no_background
+        self.is_wide = 'wide' in compact_title or '와이드' in compact_title
+        self.is_sheet = '악보' in compact_title
+
+    # --- 기존 dict 결과와 호환되는 접근 ---
+
+    def __getitem__(self, key):
+        if key not in self.__slots__:
+            raise KeyError(key)
+        return getattr(self, key)
+
+    def __setitem__(self, key, value):
+        if key not in self.FIELDS:
+            raise KeyError(key)
+        setattr(self, key, value)
+
+    def __contains__(self, key):
+        return key in self.FIELDS
+
+    def get(self, key, default=None):
+        value = getattr(self, key, None) if key in self.__slots__ else None
+        return default if value is None else value
+
+    def to_dict(self):
+        """캐시 저장용 dict"""
+        return {field: getattr(self, field) for field in self.FIELDS}
+
+    @classmethod
+    def from_dict(cls, data):
+        """to_dict() 결과(또는 기존 dict 결과)에서 복원"""
+        if isinstance(data, cls):
+            return data
+        return cls(data['title'], data['url'], data.get('source', 'unknown'),
+                   data.get('thumbnail'), data.get('score'))
+
+    def __eq__(self, other):
+        if isinstance(other, SearchResult):
+            return self.to_dict() == other.to_dict()
+        if isinstance(other, dict):
+            return self.to_dict() == other
+        return NotImplemented
+
+    def __repr__(self):
+        return f"SearchResult({self.source}, {self.title!r}, {self.url})"
+
+
+class ResultSet:
+    """
+    URL 기준으로 중복을 제거하는 순서 있는 검색 결과 목록.
+    추가/중복 확인은 URL 색인으로 한 번에 처리하고, 인덱스 접근(listbox 선택 번호)도 지원합니다.
+    """
+
+    def __init__(self, results=()):
+        self._items = []
+        self._urls = set()
+        self.extend(results)
+
+    def add(self, result):
+        """
+        결과를 추가합니다. 같은 URL이 이미 있으면 추가하지 않습니다.
+
+        Returns:
+            bool: 추가되었으면 True
+        """
+        result = SearchResult.from_dict(result)
+        if result.url in self._urls:
+            return False
+        self._urls.add(result.url)
+        self._items.append(result)
+        return True
+
+    def extend(self, results):
+        """
+        여러 결과를 추가합니다.
+
+        Returns:
+            int: 새로 추가된 개수
+        """
+        return sum(1 for result in results if self.add(result))
+
+    def clear(self):
+        self._items = []
+        self._urls = set()
+
+    def contains_url(self, url):
+        return url in self._urls
+
+    def __contains__(self, result):
+        url = result if isinstance(result, str) else result['url']
+        return url in self._urls
+
+    def __len__(self):
+        return len(self._items)
+
+    def __iter__(self):
+        return iter(self._items)
+
+    def __getitem__(self, index):
+        return self._items[index]
+
+    def __bool__(self):
+        return bool(self._items)
+
+    def to_list(self):
+        return list(self._items)
@@ -0,0 +1,129 @@
+"""
+한글 유사도 모듈
+검색어와 게시물 제목의 일치 여부를 문자 n-gram 방식으로 판정합니다.
+검색어 쪽 n-gram 집합(서명)을 한 번만 만들어 두고, 제목마다 제목 길이에 비례하는 시간으로 비교합니다.
+(기존: 제목마다 difflib.SequenceMatcher 생성 + find_longest_match)
+
+판정 규칙:
+  1. 검색어가 제목에 그대로 포함되면 일치
+  2. 검색어가 3글자 이상이고, 검색어 길이의 50% 이상이 연속으로 제목과 일치하면 일치
+     (기존 difflib 기준과 동일: "길이 k = ⌈검색어 길이 × 0.5⌉인 검색어 조각 중
+      하나라도 제목에 있으면"과 같은 조건이므로 조각 집합 조회로 판정)
+  3. 검색어가 4글자 이상이고, 자모 3-gram의 80% 이상이 제목에 있으면 일치
+     (중간 글자의 받침/자음 오타 허용. 예: '찬송하라 여오와의 종들아' → '여호와의')
+"""
+
+import math
+import re
+from functools import lru_cache
+
+# 규칙 2: 연속 일치 비율 (기존 기준)
+LONGEST_MATCH_RATIO = 0.5
+LONGEST_MATCH_MIN_LENGTH = 3
+
+# 규칙 3: 자모 n-gram 포함 비율
+JAMO_NGRAM_SIZE = 3
+JAMO_MATCH_RATIO = 0.8
+JAMO_MATCH_MIN_LENGTH = 4
+
+_HANGUL_BASE = 0xAC00
+_HANGUL_LAST = 0xD7A3
+_WHITESPACE = re.compile(r'\s+')
+
+
+def normalize(text):
+    """비교용 정규화: 공백 제거 + 소문자"""
+    return _WHITESPACE.sub('', text).lower()
+
+
+def decompose_jamo(text):
+    """
+    한글 음절을 초성/중성/종성 자모로 분해합니다. (한글 외 문자는 그대로)
+    예: '찬송' → '찬송'
+    """
+    chars = []
+    for ch in text:
+        code = ord(ch)
+        if _HANGUL_BASE <= code <= _HANGUL_LAST:
+            index = code - _HANGUL_BASE
+            chars.append(chr(0x1100 + index // 588))
+            chars.append(chr(0x1161 + (index % 588) // 28))
+            if index % 28:
+                chars.append(chr(0x11A7 + index % 28))
+        else:
+            chars.append(ch)
+    return ''.join(chars)
+
+
+def ngrams(text, n):
+    """길이 n인 모든 부분 문자열 집합"""
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class QuerySignature:
+    """
+    검색어 하나에 대한 미리 계산된 비교 정보.
+    같은 검색어로 여러 제목을 비교할 때 재사용합니다.
+    """
+
+    __slots__ = ('text', 'chunk_size', 'chunks', 'jamo_grams')
+
+    def __init__(self, query):
+        self.text = normalize(query)
+
+        # 규칙 2: 검색어 길이의 50%(올림) 길이 조각들
+        self.chunk_size = 0
+        self.chunks = frozenset()
+        if len(self.text) >= LONGEST_MATCH_MIN_LENGTH:
+            self.chunk_size = math.ceil(len(self.text) * LONGEST_MATCH_RATIO)
+            self.chunks = frozenset(ngrams(self.text, self.chunk_size))
+
+        # 규칙 3: 자모 3-gram
+        self.jamo_grams = frozenset()
+        if len(self.text) >= JAMO_MATCH_MIN_LENGTH:
+            self.jamo_grams = frozenset(ngrams(decompose_jamo(self.text), JAMO_NGRAM_SIZE))
+
+    def matches(self, title):
+        """제목이 검색어와 일치(또는 유사)하면 True"""
+        normalized_title = normalize(title)
+
+        # 1. 정확한 포함
+        if self.text in normalized_title:
+            return True
+
+        # 2. 연속 일치 50% 이상
+        if self.chunks:
+            size = self.chunk_size
+            for i in range(len(normalized_title) - size + 1):
+                if normalized_title[i:i + size] in self.chunks:
+                    return True
+
+        # 3. 자모 n-gram 포함 비율
+        if self.jamo_grams:
+            title_grams = ngrams(decompose_jamo(normalized_title), JAMO_NGRAM_SIZE)
+            found = len(self.jamo_grams & title_grams)
+            if found >= len(self.jamo_grams) * JAMO_MATCH_RATIO:
+                return True
+
+        return False
+
+
+@lru_cache(maxsize=256)
+def query_signature(query):
+    """검색어 서명 (같은 검색어는 재계산하지 않음)"""
+    return QuerySignature(query)
+
+
+def match_titles(query, titles):
+    """
+    여러 제목을 한 번에 판정합니다.
+
+    Args:
+        query: 검색어
+        titles: 제목 리스트
+
+    Returns:
+        list: 제목별 일치 여부 (bool)
+    """
+    signature = query_signature(query)
+    return [signature.matches(title) for title in titles]
@@ -15,7 +15,13 @@ import webbrowser
 
 # 부모 폴더(루트)의 song_search.py를 사용하도록 경로 추가
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
-from song_search import search_songs, get_download_info, download_file, sanitize_filename
+from song_search import (search_songs, search_songs_many, get_download_info, download_file,
+                         sanitize_filename, is_known_miss, DownloadManager)
+from search_result import ResultSet
+from song_search_async import async_search_songs, get_runner
+from download_scheduler import PRIORITY_INTERACTIVE
+from hymn_query import number_pattern, parse_query
+from prefetch import Prefetcher
 
 
 
@@ -30,8 +36,11 @@ class SongDownloaderApp:
             self.root.title("찬송가 다운로더 v2.0")
             self.root.geometry("750x850")
 
-        # 검색 결과 저장
-        self.search_results = []
+        # 검색 결과 저장 (URL 기준 중복 제거)
+        self.search_results = ResultSet()
+        self._search_base = ResultSet()   # 누적 모드: 이번 검색 시작 전 결과 (부분 결과를 이 뒤에 붙임)
+        self._search_generation = 0       # 이전 검색의 늦은 부분 결과를 무시하기 위한 번호
+        self._search_future = None        # 진행 중인 검색 (새 검색을 시작하면 취소)
         
         # 선택된 다운로드 대기열 (최대 7곡)
         self.selected_queue = []
@@ -49,13 +58,23 @@ class SongDownloaderApp:
         # 검색 결과 누적 옵션 (기본: OFF - 사용자 피드백 '딱! 2개만' 반영)
         self.cumulative_search = tk.BooleanVar(value=False)
 
+        # 검색 결과 미리 받기 옵션 (기본: OFF) - 상위 결과의 다운로드 정보/1순위 파일을 백그라운드로 준비
+        self.prefetch_enabled = tk.BooleanVar(value=False)
+        self.prefetcher = None
+
         # 일괄 다운로드 진행 상태
         self.is_batch_downloading = False
         self.batch_cancel_flag = False
+        # 진행 중인 동시 다운로드 (일괄/대기열/전송이 함께 돌 수 있음 → 중단 버튼/창 닫기 시 모두 cancel)
+        self.download_managers = set()
+        self._managers_lock = threading.Lock()
 
         # UI 생성
         self.create_widgets()
 
+        if self.is_standalone:
+            self.root.protocol("WM_DELETE_WINDOW", self._on_close)
+
     def create_widgets(self):
         # 상단과 하단을 잇는 스크롤 가능한 캔버스 설정
         # parent가 있으면 parent를 사용, 없으면 root 사용
@@ -124,6 +143,10 @@ class SongDownloaderApp:
                                    bg="#90EE90", font=("Arial", 10, "bold"), width=15)
         self.batch_btn.pack(side="left", padx=5)
 
+        self.cancel_btn = tk.Button(btn_action_frame, text="⏹ 다운로드 중단", command=self.cancel_downloads,
+                                    state="disabled", width=15)
+        self.cancel_btn.pack(side="left", padx=5)
+
         # === 검색 영역 ===
         search_frame = tk.LabelFrame(main_frame, text="개별 검색", padx=10, pady=10)
         search_frame.pack(fill="x", pady=(0, 10))
@@ -158,6 +181,8 @@ class SongDownloaderApp:
                       fg="#0066cc", font=("Arial", 9, "bold")).pack(side="left", padx=(0, 10))
         self.btn_clear_results = tk.Button(option_frame, text="결과 초기화", command=self.clear_results, bg="#ffcccc")
         self.btn_clear_results.pack(side="left")
+        tk.Checkbutton(option_frame, text="상위 결과 미리 받기", variable=self.prefetch_enabled,
+                      fg="#555").pack(side="left", padx=(10, 0))
 
         # === 검색 결과 영역 ===
         result_frame = tk.LabelFrame(main_frame, text="검색 결과 (클릭/드래그로 다중 선택 가능)", padx=10, pady=10)
@@ -327,7 +352,7 @@ class SongDownloaderApp:
         # 사용자가 혼동하지 않도록 기존 결과 유지 여부는 옵션을 따름)
         if not self.cumulative_search.get():
             self.result_listbox.delete(0, tk.END)
-            self.search_results = []
+            self.search_results = ResultSet()
         
         threading.Thread(target=self._batch_search_thread, args=(numbers, song_type), daemon=True).start()
 
@@ -345,54 +370,49 @@ class SongDownloaderApp:
             self.root.after(0, lambda: self.batch_search_btn.config(state="normal"))
             return
 
-        for i, num in enumerate(numbers):
-            try:
-                self.root.after(0, lambda n=num, idx=i+1, t=total:
-                    self.status_label.config(text=f"[{idx}/{t}] {n}장 검색 중..."))
-                
-                keyword = f"{song_type} {num}장"
-                results = search_songs(keyword, sources=sources)
+        # 번호별 검색을 동시에 실행 (같은 번호는 한 번만 검색)
+        queries = [parse_query(f"{song_type} {num}장") for num in numbers]
+        keywords = [query.search_keyword for query in queries]
+        # 최근에 결과가 없던 번호는 검색 요청 없이 건너뜀 (실패 캐시) - 완료 메시지에 표시
+        known_miss_count = sum(1 for keyword in set(keywords) if is_known_miss(keyword, sources))
+
+        def on_progress(done, count, keyword):
+            self.root.after(0, lambda: self.status_label.config(text=f"[{done}/{count}] {keyword} 검색 완료"))
+
+        results_by_keyword = search_songs_many(keywords, sources=sources, progress_callback=on_progress)
+
+        # 결과는 입력 순서대로 추가
+        for num, query, keyword in zip(numbers, queries, keywords):
+            results = results_by_keyword[keyword]
+            if results:
+                # 정확한 매칭만 필터링 (예: "28장" 검색 시 "128장", "228장" 등 제외)
+                filtered_results = query.filter(results)
                 
-                if results:
-                    # 정확한 매칭만 필터링 (예: "28장" 검색 시 "128장", "228장" 등 제외)
-                    # 패턴: 공백 또는 시작 + 숫자 + "장"
-                    pattern = r'(?:^|\s)' + str(num) + r'장(?:\s|$|[^\d])'
-                    filtered_results = [r for r in results if re.search(pattern, r['title'])]
+                if filtered_results:
+                    found_count += 1
+                    # 각 소스당 최상위 1개씩만 선택하여 노이즈 최소화
+                    best_results = []
+                    for source in sources:
+                        source_results = [r for r in filtered_results if r['source'] == source]
+                        if source_results:
+                            best_results.append(source_results[0])
                     
-                    if filtered_results:
-                        found_count += 1
-                        # 각 소스당 최상위 1개씩만 선택하여 노이즈 최소화
-                        best_results = []
-                        for source in sources:
-                            source_results = [r for r in filtered_results if r['source'] == source]
-                            if source_results:
-                                best_results.append(source_results[0])
-                        
-                        self.search_results.extend(best_results)
-            except:
-                pass
+                    self.search_results.extend(best_results)
         
         # UI 업데이트
-        self.root.after(0, lambda: self._on_batch_search_complete(found_count, total))
+        self.root.after(0, lambda: self._on_batch_search_complete(found_count, total, known_miss_count))
 
-    def _on_batch_search_complete(self, found, total):
+    def _on_batch_search_complete(self, found, total, known_miss_count=0):
         self.batch_search_btn.config(state="normal")
         self.batch_btn.config(state="normal")
         self.search_btn.config(state="normal")
         
-        # 중복 제거
-        if self.cumulative_search.get():
-             # 중복 제거 (URL 기준)
-            seen_urls = set()
-            unique_results = []
-            for r in self.search_results:
-                if r['url'] not in seen_urls:
-                    seen_urls.add(r['url'])
-                    unique_results.append(r)
-            self.search_results = unique_results
-        
+        # 중복 제거는 ResultSet에 추가할 때 URL 기준으로 이미 처리됨
         self._redisplay_results()
-        self.status_label.config(text=f"일괄 검색 완료: {found}/{total}곡 찾음 (총 {len(self.search_results)}개 결과)")
+        status = f"일괄 검색 완료: {found}/{total}곡 찾음 (총 {len(self.search_results)}개 결과)"
+        if known_miss_count:
+            status += f" - 최근 결과 없던 {known_miss_count}곡 건너뜀"
+        self.status_label.config(text=status)
         # messagebox.showinfo("완료", f"일괄 검색이 완료되었습니다.\n{found}/{total}곡을 찾았습니다.")
 
     def batch_download(self):
@@ -429,6 +449,7 @@ class SongDownloaderApp:
         self.batch_cancel_flag = False
         self.batch_btn.config(state="disabled", text="다운로드 중...")
         self.search_btn.config(state="disabled")
+        self.cancel_btn.config(state="normal")
 
         threading.Thread(target=self._batch_download_thread, args=(numbers, song_type), daemon=True).start()
 
@@ -451,70 +472,52 @@ class SongDownloaderApp:
             self.root.after(0, lambda: self._on_batch_complete(total, 0, ["검색 사이트 미선택"], []))
             return
 
-        for i, num in enumerate(numbers):
-            if self.batch_cancel_flag:
-                break
-
-            try:
-                # 상태 업데이트
-                self.root.after(0, lambda n=num, idx=i+1, t=total:
-                    self.status_label.config(text=f"[{idx}/{t}] {n}장 검색 중..."))
-
-                # 검색어 생성
-                keyword = f"{song_type} {num}장"
-
-                # 선택된 소스에서만 검색
+        def make_resolver(num):
+            def resolve():
+                # 선택된 소스에서만 검색 → 첫 번째 결과의 다운로드 정보
+                keyword = parse_query(f"{song_type} {num}장").search_keyword
+                # 최근에 이미 결과가 없던 번호는 검색 요청 없이 바로 실패 (실패 캐시)
+                known_miss = is_known_miss(keyword, sources)
                 results = search_songs(keyword, sources=sources)
-
                 if not results:
-                    failed_list.append(f"{num}장 (검색 결과 없음)")
-                    continue
-
-                # 첫 번째 결과 다운로드 정보 가져오기
-                self.root.after(0, lambda n=num, idx=i+1, t=total:
-                    self.status_label.config(text=f"[{idx}/{t}] {n}장 다운로드 준비 중..."))
-
-                info = get_download_info(results[0]['url'])
-
-                if not info['download_url']:
-                    failed_list.append(f"{num}장 (다운로드 링크 없음)")
-                    continue
-
-                # 파일명 생성
-                filename = info['filename'] or f"{num}장.ppt"
-                filename = sanitize_filename(filename)
-
-                # 번호 추가
-                current_num = int(self.file_number_var.get()) + i
-                new_filename = f"{current_num}. {filename}"
-
-                # 저장 경로
-                save_dir = self.save_dir_var.get()
-                save_path = os.path.join(save_dir, new_filename)
-
-                # 중복 파일 건너뛰기
-                if os.path.exists(save_path):
-                    self.root.after(0, lambda n=num:
-                        self.status_label.config(text=f"{n}장 이미 존재 (건너뜀)"))
-                    continue
-
-                # 다운로드
-                self.root.after(0, lambda n=num, idx=i+1, t=total:
-                    self.status_label.config(text=f"[{idx}/{t}] {n}장 다운로드 중..."))
-
-                def update_progress(percent):
-                    overall_progress = ((i + percent/100) / total) * 100
-                    self.root.after(0, lambda p=overall_progress: self.progress.configure(value=p))
-
-                download_file(info['download_url'], save_path, progress_callback=update_progress)
-
+                    raise Exception("검색 결과 없음 (최근 확인됨)" if known_miss else "검색 결과 없음")
+                return get_download_info(results[0]['url'])
+            return resolve
+
+        # 파일 번호는 입력 순서대로 미리 배정 (동시에 끝나도 번호가 섞이지 않음)
+        base_num = self._current_file_number()
+        save_dir = self.save_dir_var.get()
+        jobs = [{
+            'resolve': make_resolver(num),
+            'fallback_filename': f"{num}장.ppt",
+            'save_dir': save_dir,
+            'prefix': f"{base_num + i}. ",
+            'number': num
+        } for i, num in enumerate(numbers)]
+
+        def on_status(index, state):
+            text = "검색 중..." if state == 'resolving' else "다운로드 중..."
+            self.root.after(0, lambda n=numbers[index], idx=index+1, t=total:
+                self.status_label.config(text=f"[{idx}/{t}] {n}장 {text}"))
+
+        def on_complete(result):
+            nonlocal success_count
+            num = result['job']['number']
+            if result['status'] == 'done':
                 success_count += 1
-                downloaded_files.append(new_filename)
+                downloaded_files.append(result['filename'])
+                self.root.after(0, lambda n=num: self.status_label.config(text=f"{n}장 완료!"))
+            elif result['status'] == 'exists':
                 self.root.after(0, lambda n=num:
-                    self.status_label.config(text=f"{n}장 완료!"))
+                    self.status_label.config(text=f"{n}장 이미 존재 (건너뜀)"))
+            elif result['status'] == 'failed':
+                failed_list.append(f"{num}장 ({result['error'][:30]})")
+
+        def on_progress(percent):
+            self.root.after(0, lambda p=percent: self.progress.configure(value=p))
 
-            except Exception as e:
-                failed_list.append(f"{num}장 ({str(e)[:30]})")
+        self._run_downloads(DownloadManager(), jobs, on_complete=on_complete, on_progress=on_progress,
+                            on_status=on_status)
 
         # 완료
         self.root.after(0, lambda: self._on_batch_complete(total, success_count, failed_list, downloaded_files))
@@ -524,6 +527,7 @@ class SongDownloaderApp:
         self.is_batch_downloading = False
         self.batch_btn.config(state="normal", text="일괄 다운로드")
         self.search_btn.config(state="normal")
+        self._refresh_cancel_btn()
         self.progress['value'] = 100
 
         # 번호 업데이트
@@ -611,12 +615,25 @@ class SongDownloaderApp:
         # 누적 모드가 아니면 결과 초기화 (Option A의 기본 동작: 검색 결과는 교체됨)
         if not self.cumulative_search.get():
             self.result_listbox.delete(0, tk.END)
-            self.search_results = []
+            self.search_results = ResultSet()
+        self._search_base = ResultSet(self.search_results)
+        self._search_generation += 1
         
         self.progress['value'] = 0
 
-        # 스레드로 검색
-        threading.Thread(target=self._search_thread, args=(keyword,), daemon=True).start()
+        # 선택된 검색 소스 (tkinter 변수는 GUI 스레드에서만 읽음)
+        sources = []
+        if self.source_getwater.get():
+            sources.append('getwater')
+        if self.source_cwy0675.get():
+            sources.append('cwy0675')
+
+        # 이전 검색이 아직 진행 중이면 취소 (남은 사이트 검색이 작업 풀을 차지하지 않도록)
+        if self._search_future is not None:
+            self._search_future.cancel()
+
+        # 공용 이벤트 루프에서 검색 (검색마다 스레드를 만들지 않음)
+        self._search_future = get_runner().submit(self._search_task(keyword, sources, self._search_generation))
 
     def add_to_queue(self):
         """선택한 곡을 대기열에 추가 (여러 곡 선택 가능)"""
@@ -718,14 +735,62 @@ class SongDownloaderApp:
         self.is_batch_downloading = True
         self.batch_cancel_flag = False
         self.download_all_btn.config(state="disabled", text="다운로드 중...")
+        self.cancel_btn.config(state="normal")
         
         threading.Thread(target=self._download_queue_thread, daemon=True).start()
 
+    def _current_file_number(self):
+        """파일 번호 입력값 (숫자가 아니면 1)"""
+        try:
+            return int(self.file_number_var.get())
+        except ValueError:
+            return 1
+
+    def _run_downloads(self, manager, jobs, **callbacks):
+        """DownloadManager 실행 (작업 스레드에서 호출) - 실행 중에는 cancel_downloads 대상에 포함"""
+        with self._managers_lock:
+            self.download_managers.add(manager)
+        try:
+            return manager.run(jobs, **callbacks)
+        finally:
+            with self._managers_lock:
+                self.download_managers.discard(manager)
+
+    def _refresh_cancel_btn(self):
+        """다른 다운로드가 아직 진행 중이면 중단 버튼 유지"""
+        with self._managers_lock:
+            active = bool(self.download_managers)
+        self.cancel_btn.config(state="normal" if active else "disabled")
+
+    def cancel_downloads(self):
+        """진행 중인 일괄/대기열/전송 다운로드를 모두 중단 (받던 파일은 다음에 이어받기 가능)"""
+        self.batch_cancel_flag = True
+        with self._managers_lock:
+            managers = list(self.download_managers)
+        for manager in managers:
+            manager.cancel()
+        if managers:
+            self.status_label.config(text="다운로드 중단 중... (받던 파일은 다음에 이어받기)")
+        self.cancel_btn.config(state="disabled")
+
+    def close(self):
+        """창을 닫기 전 정리: 진행 중인 검색, 다운로드와 미리 받기 중단"""
+        if self._search_future is not None:
+            self._search_future.cancel()
+        self.cancel_downloads()
+        if self.prefetcher:
+            self.prefetcher.cancel_all()
+
+    def _on_close(self):
+        self.close()
+        self.root.destroy()
+
     def download_selected_items(self, items, callback=None):
         """외부에서 호출: 선택된 항목 리스트를 다운로드하고 callback(filename)을 호출"""
         if not items: return
         
         # 다운로드 로직 재사용을 위해 스레드 시작
+        self.cancel_btn.config(state="normal")
         threading.Thread(target=self._download_items_thread, args=(items, callback), daemon=True).start()
 
     def _download_items_thread(self, items, callback):
@@ -733,41 +798,41 @@ class SongDownloaderApp:
         total = len(items)
         success_count = 0
         
-        for i, result in enumerate(items):
-            try:
-                self.root.after(0, lambda r=result, idx=i+1, t=total:
+        # 파일 번호는 목록 순서대로 미리 배정 (전송 모드도 번호 사용)
+        base_num = self._current_file_number()
+        save_dir = self.save_dir_var.get()
+        jobs = [{
+            'post_url': result['url'],
+            'fallback_filename': f"{result['title']}.ppt",
+            'save_dir': save_dir,
+            'prefix': f"{base_num + i}. ",
+            'title': result['title']
+        } for i, result in enumerate(items)]
+
+        def on_status(index, state):
+            if state == 'resolving':
+                self.root.after(0, lambda r=items[index], idx=index+1, t=total:
                     self.status_label.config(text=f"전송 중... [{idx}/{t}] '{r['title']}'"))
 
-                info = get_download_info(result['url'])
-                if not info['download_url']: continue
-
-                filename = info['filename'] or f"{result['title']}.ppt"
-                filename = sanitize_filename(filename)
-                
-                # 파일 번호 사용 안 함 (전송 모드에서는 번호 없이 또는 기존 번호 유지?)
-                # 사용자 요구: 그냥 다운받아서 리스트에 넣기를 원함.
-                # 번호가 필요하면 file_number_var 사용.
-                current_num = int(self.file_number_var.get())
-                new_filename = f"{current_num}. {filename}"
-                
-                save_dir = self.save_dir_var.get()
-                save_path = os.path.join(save_dir, new_filename)
-
+        def on_complete(result):
+            nonlocal success_count
+            if result['status'] in ('done', 'exists'):
                 # 이미 있으면 그냥 사용
-                if not os.path.exists(save_path):
-                    download_file(info['download_url'], save_path)
-                
-                # 성공 처리
                 success_count += 1
-                self.root.after(0, lambda n=current_num: self.file_number_var.set(str(n + 1)))
-                
+                self.root.after(0, lambda n=base_num + result['index']: self.file_number_var.set(str(n + 1)))
                 if callback:
-                    self.root.after(0, lambda f=new_filename: callback(f))
-                    
-            except Exception as e:
-                print(f"Error downloading {result['title']}: {e}")
+                    self.root.after(0, lambda f=result['filename']: callback(f))
+            elif result['status'] == 'failed':
+                print(f"Error downloading {result['job']['title']}: {result['error']}")
+
+        # 수동 확인 후 사용자가 기다리는 곡 → 일괄 다운로드보다 우선
+        self._run_downloads(DownloadManager(priority=PRIORITY_INTERACTIVE), jobs,
+                            on_complete=on_complete, on_status=on_status)
 
-        self.root.after(0, lambda: self.status_label.config(text=f"전송 완료: {success_count}곡"))
+        def on_finished():
+            self.status_label.config(text=f"전송 완료: {success_count}곡")
+            self._refresh_cancel_btn()
+        self.root.after(0, on_finished)
 
     def _download_queue_thread(self):
         """대기열 다운로드 스레드"""
@@ -777,54 +842,37 @@ class SongDownloaderApp:
         failed_list = []
         downloaded_files = []
 
-        for i, result in enumerate(queue_to_download):
-            if self.batch_cancel_flag:
-                break
-
-            try:
-                self.root.after(0, lambda r=result, idx=i+1, t=total:
-                    self.status_label.config(text=f"[{idx}/{t}] '{r['title']}' 정보 가져오는 중..."))
-
-                info = get_download_info(result['url'])
-                if not info['download_url']:
-                    failed_list.append(f"{result['title']} (링크 없음)")
-                    continue
-
-                # 파일명 생성
-                filename = info['filename'] or f"{result['title']}.ppt"
-                filename = sanitize_filename(filename)
-
-                # 파일 번호 (현재 설정된 번호부터 자동 증가)
-                current_num = int(self.file_number_var.get())
-                new_filename = f"{current_num}. {filename}"
-
-                # 저장 경로
-                save_dir = self.save_dir_var.get()
-                save_path = os.path.join(save_dir, new_filename)
-
-                # 중복 체크
-                if os.path.exists(save_path):
-                    success_count += 1
-                    downloaded_files.append(new_filename)
-                    self.root.after(0, lambda n=current_num: self.file_number_var.set(str(n + 1)))
-                    continue
-
-                self.root.after(0, lambda r=result, idx=i+1, t=total:
-                    self.status_label.config(text=f"[{idx}/{t}] '{r['title']}' 다운로드 중..."))
-
-                def update_progress(percent):
-                    overall_progress = ((i + percent/100) / total) * 100
-                    self.root.after(0, lambda p=overall_progress: self.progress.configure(value=p))
-
-                download_file(info['download_url'], save_path, progress_callback=update_progress)
-                
+        # 파일 번호 (현재 설정된 번호부터 대기열 순서대로 미리 배정)
+        base_num = self._current_file_number()
+        save_dir = self.save_dir_var.get()
+        jobs = [{
+            'post_url': result['url'],
+            'fallback_filename': f"{result['title']}.ppt",
+            'save_dir': save_dir,
+            'prefix': f"{base_num + i}. ",
+            'title': result['title']
+        } for i, result in enumerate(queue_to_download)]
+
+        def on_status(index, state):
+            text = "정보 가져오는 중..." if state == 'resolving' else "다운로드 중..."
+            self.root.after(0, lambda r=queue_to_download[index], idx=index+1, t=total:
+                self.status_label.config(text=f"[{idx}/{t}] '{r['title']}' {text}"))
+
+        def on_complete(result):
+            nonlocal success_count
+            if result['status'] in ('done', 'exists'):
                 success_count += 1
-                downloaded_files.append(new_filename)
-                # 실시간 번호 증가
-                self.root.after(0, lambda n=current_num: self.file_number_var.set(str(n + 1)))
+                downloaded_files.append(result['filename'])
+                # 실시간 번호 증가 (완료 콜백이 대기열 순서대로 오므로 번호가 되돌아가지 않음)
+                self.root.after(0, lambda n=base_num + result['index']: self.file_number_var.set(str(n + 1)))
+            elif result['status'] == 'failed':
+                failed_list.append(f"{result['job']['title']} ({result['error'][:20]})")
 
-            except Exception as e:
-                failed_list.append(f"{result['title']} ({str(e)[:20]})")
+        def on_progress(percent):
+            self.root.after(0, lambda p=percent: self.progress.configure(value=p))
+
+        self._run_downloads(DownloadManager(), jobs, on_complete=on_complete, on_progress=on_progress,
+                            on_status=on_status)
 
         self.root.after(0, lambda: self._on_download_queue_complete(total, success_count, failed_list, downloaded_files))
 
@@ -832,6 +880,7 @@ class SongDownloaderApp:
         """대기열 다운로드 완료 콜백"""
         self.is_batch_downloading = False
         self.download_all_btn.config(state="normal", text="모두 다운로드")
+        self._refresh_cancel_btn()
         self.progress['value'] = 100
         
         # Call the external callback
@@ -853,30 +902,82 @@ class SongDownloaderApp:
     def clear_results(self):
         """검색 결과 초기화"""
         self.result_listbox.delete(0, tk.END)
-        self.search_results = []
+        self.search_results = ResultSet()
         self.progress['value'] = 0
         self.status_label.config(text="검색 결과가 초기화되었습니다.")
 
-    def _search_thread(self, keyword):
-        """검색 스레드"""
+    async def _search_task(self, keyword, sources, generation):
+        """
+        검색 작업 (공용 이벤트 루프에서 실행) - 사이트별 결과가 도착하는 대로 목록에 표시
+        tkinter 위젯/변수는 여기서 읽지 않음 (sources는 do_search에서 읽어 전달)
+        """
         try:
-            # 선택된 검색 소스 확인
-            sources = []
-            if self.source_getwater.get():
-                sources.append('getwater')
-            if self.source_cwy0675.get():
-                sources.append('cwy0675')
-            
             if not sources:
                 raise Exception("검색 사이트를 최소 1개 이상 선택해주세요.")
             
-            results = search_songs(keyword, sources=sources)
-            self.root.after(0, lambda: self._on_search_complete(results))
+            def on_partial(source, partial):
+                self.root.after(0, lambda: self._on_search_partial(generation, source, partial))
+
+            results = await async_search_songs(keyword, sources=sources, on_partial=on_partial)
+            self.root.after(0, lambda: self._on_search_complete(results, generation))
         except Exception as e:
             self.root.after(0, lambda: self._on_search_error(str(e)))
 
-    def _on_search_complete(self, results):
+    def _filter_by_number(self, results):
+        """정밀 필터 (검색어에 숫자가 포함된 경우 해당 숫자 장수만)"""
+        keyword = self.search_entry.get().strip()
+        query = parse_query(keyword)
+        if query.is_numbered:
+            return query.filter(results)
+        # 제목과 번호가 섞인 검색어 (예: "28장 복의 근원 강림하사")
+        num_match = re.search(r'\d+', keyword)
+        if not num_match:
+            return results
+        pattern = number_pattern(num_match.group())
+        return [r for r in results if pattern.search(r['title'])]
+
+    def _show_search_results(self, results):
+        """
+        이번 검색 결과를 목록에 반영합니다. (누적 모드면 검색 전 결과 뒤에 붙임)
+
+        Returns:
+            int: 이번 검색으로 추가된 결과 수
+        """
+        # 목록을 바꾸기 전에 사용자가 선택해 둔 항목 기억 (순서가 바뀌어도 계속 선택)
+        # 첫 번째 항목만 선택된 상태는 자동 선택이므로 새 1순위로 옮겨감
+        selection = self.result_listbox.curselection()
+        if tuple(selection) == (0,):
+            selection = ()
+        selected_urls = {self.search_results[i]['url'] for i in selection if i < len(self.search_results)}
+
+        if self.cumulative_search.get():
+            # 누적 모드: 기존 결과에 추가 (URL 기준 중복 제외)
+            self.search_results = ResultSet(self._search_base)
+            new_count = self.search_results.extend(results)
+        else:
+            # 누적 모드 아닐 때: 교체
+            self.search_results = ResultSet(results)
+            new_count = len(self.search_results)
+
+        self._redisplay_results(selected_urls)
+        return new_count
+
+    def _on_search_partial(self, generation, source, results):
+        """사이트 하나의 결과 도착 콜백 (다른 사이트는 아직 검색 중)"""
+        if generation != self._search_generation:
+            return
+
+        results = self._filter_by_number(results)
+        if not results:
+            return
+
+        self._show_search_results(results)
+        self.status_label.config(text=f"[{source}] 결과 도착: {len(self.search_results)}개 (다른 사이트 검색 중...)")
+
+    def _on_search_complete(self, results, generation=None):
         """검색 완료 콜백"""
+        if generation is not None and generation != self._search_generation:
+            return
         self.search_btn.config(state="normal")
         
         if not results:
@@ -884,52 +985,36 @@ class SongDownloaderApp:
             return
         
         # 정밀 필터 적용 (검색어에 숫자가 포함된 경우)
-        keyword = self.search_entry.get().strip()
-        num_match = re.search(r'\d+', keyword)
-        if num_match:
-            num = num_match.group()
-            pattern = r'(?:^|\s)' + num + r'장(?:\s|$|[^\d])'
-            # 숫자가 포함된 검색어라면 해당 숫자 장수만 필터링
-            results = [r for r in results if re.search(pattern, r['title'])]
-            if results:
-                self.status_label.config(text=f"정밀 필터 적용됨 ({len(results)}건)")
-        
-        # 누적 모드: 기존 결과에 추가
-        if self.cumulative_search.get():
-            self.search_results.extend(results)
-            # 중복 제거 (URL 기준)
-            seen_urls = set()
-            unique_results = []
-            for r in self.search_results:
-                if r['url'] not in seen_urls:
-                    seen_urls.add(r['url'])
-                    unique_results.append(r)
-            self.search_results = unique_results
-        else:
-            # 누적 모드 아닐 때: 교체
-            self.search_results = results
+        results = self._filter_by_number(results)
         
         # 결과 표시
-        self._redisplay_results()
+        new_count = self._show_search_results(results)
+
+        # 미리 받기 (선택 → 다운로드가 바로 끝나도록)
+        if self.prefetch_enabled.get() and results:
+            if self.prefetcher is None:
+                self.prefetcher = Prefetcher()
+            self.prefetcher.prefetch(results)
         
         # 누적 모드 상태 표시
         total_count = len(self.search_results)
-        new_count = len(results)
         if self.cumulative_search.get():
             self.status_label.config(text=f"검색 완료: +{new_count}개 추가 (총 {total_count}곡)")
         else:
             self.status_label.config(text=f"검색 완료: {total_count}개 결과")
     
-    def _redisplay_results(self):
-        """검색 결과 재표시"""
+    def _redisplay_results(self, selected_urls=()):
+        """검색 결과 재표시 (selected_urls의 항목은 다시 선택, 없으면 첫 번째 항목 선택)"""
         self.result_listbox.delete(0, tk.END)
         for i, result in enumerate(self.search_results):
             source = result.get('source', 'unknown')
             title = result['title']
             self.result_listbox.insert(tk.END, f"{i+1}. [{source}] {title}")
+            if result['url'] in selected_urls:
+                self.result_listbox.selection_set(i)
         
-        # 첫 번째 항목 선택
-        if self.search_results:
+        # 선택한 항목이 없으면 첫 번째 항목 선택
+        if self.search_results and not self.result_listbox.curselection():
             self.result_listbox.selection_set(0)
 
     def _on_search_error(self, error):
@@ -965,6 +1050,10 @@ class SongDownloaderApp:
     def _download_thread(self, result):
         """개별 다운로드 스레드"""
         try:
+            # 다른 곡의 미리 받기는 취소, 이 곡을 미리 받는 중이면 완료까지 대기
+            if self.prefetcher:
+                self.prefetcher.focus(result['url'])
+
             # 다운로드 정보 가져오기
             self.root.after(0, lambda: self.status_label.config(text="다운로드 정보 확인 중..."))
             info = get_download_info(result['url'])
@@ -1010,7 +1099,8 @@ class SongDownloaderApp:
             def update_progress(percent):
                 self.root.after(0, lambda p=percent: self.progress.configure(value=p))
 
-            download_file(info['download_url'], save_path, progress_callback=update_progress)
+            download_file(info['download_url'], save_path, progress_callback=update_progress,
+                          priority=PRIORITY_INTERACTIVE)
 
             # 완료
             self.root.after(0, lambda: self._on_download_complete(new_filename, save_path))
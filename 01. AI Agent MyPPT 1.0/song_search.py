@@ -4,16 +4,25 @@ getwater.tistory.com 및 cwy0675.tistory.com에서 찬송가 PPT 파일을 검
 """
 
 import requests
-from bs4 import BeautifulSoup
 import os
 import re
-import difflib
-from urllib.parse import quote, urljoin
-
-# User-Agent 설정 (봇 차단 방지)
-HEADERS = {
-    'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36'
-}
+import json
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed, TimeoutError as FuturesTimeoutError
+from urllib.parse import unquote, urlsplit
+
+import http_client
+from blob_store import get_blob_store
+from cache_store import PersistentCache
+from download_scheduler import PRIORITY_INTERACTIVE, PRIORITY_AGENT, get_scheduler
+from file_signature import HEADER_SIZE, InvalidFileContent, check_header, check_complete, pick_check_name
+from html_parser import parse_post_page
+from hymn_query import KIND_SHEET, parse_query, number_pattern
+from negative_cache import get_negative_cache
+from search_result import SearchResult
+from similarity import query_signature
+from song_sources import SourceAdapter, SearchCancelled, register_source, get_source
 
 # getwater.tistory.com (기존)
 BASE_URL = "https://getwater.tistory.com"
@@ -23,12 +32,53 @@ SEARCH_URL = "https://getwater.tistory.com/search/{keyword}"
 CWY_BASE_URL = "https://cwy0675.tistory.com"
 CWY_SEARCH_URL = "https://cwy0675.tistory.com/search/{keyword}"
 
+# 검색 결과 캐시 설정 (매주 같은 찬송가를 반복 검색하므로 디스크에 보관)
+SEARCH_CACHE_TTL = 7 * 24 * 60 * 60  # 7일
+SEARCH_CACHE_MAX_ENTRIES = 500
+
+_search_cache = None
+
+# 다운로드 정보 캐시 설정 (게시물 URL → 첨부파일 링크/파일명은 거의 바뀌지 않음)
+DOWNLOAD_INFO_CACHE_TTL = 30 * 24 * 60 * 60  # 30일
+DOWNLOAD_INFO_FRESH = 12 * 60 * 60           # 12시간 이내 확인한 게시물은 재검증 요청도 생략
+DOWNLOAD_INFO_CACHE_MAX_ENTRIES = 2000
+
+_download_info_cache = None
+
+# 다중 사이트 동시 검색 설정
+SOURCE_TIMEOUT = 20   # 사이트별 검색 전체 시간 예산(초) - 여러 페이지 요청과 요청 제한 대기 포함
+SEARCH_DEADLINE = 25  # 통합 검색 전체 제한 시간(초) - 초과 시 먼저 도착한 결과만 반환하고 남은 사이트 검색 중단
+                      # (사이트별 예산보다 길게: 예산 안에 끝나는 사이트 결과는 버리지 않도록)
+
+# 사이트별 검색을 동시에 실행하는 공용 스레드 풀 (GUI 작업 스레드들이 함께 사용)
+_search_executor = ThreadPoolExecutor(max_workers=8, thread_name_prefix="song_search")
+
+# 일괄 검색 (search_songs_many) 동시 검색어 수
+# 사이트별 요청 제한(song_sources.TokenBucket)이 있으므로 이보다 크게 해도 사이트 부담은 늘지 않음
+BATCH_SEARCH_WORKERS = 4
+
+# 파일 다운로드 설정
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+DOWNLOAD_RETRIES = 3          # 연결 끊김 시 이어받기 재시도 횟수
+DOWNLOAD_RETRY_BACKOFF = 1.0  # 재시도 대기: 1s, 2s, 3s
+DOWNLOAD_WORKERS = 4          # 동시 다운로드 수
+DOWNLOAD_PER_HOST = 3         # 호스트별 동시 요청 수 (블로그/첨부파일 서버 부담 제한)
 
 
 # Filtering Constants
 FILTER_OUT = ['배경없는', '무배경', '흰색', '악보', 'wide', '와이드', 'nwc']
 PRIORITY_IN = ['배경']
 
+
+def excluded_words(keyword):
+    """
+    제외 표기(FILTER_OUT) 중 이 검색어에서 실제로 제외할 것
+    검색어가 직접 요청한 형식("새찬송가 악보 28장"의 '악보', "... 와이드"의 '와이드')은 제외하지 않습니다.
+    """
+    keyword_norm = (keyword or '').replace(" ", "").lower()
+    return [bad_word for bad_word in FILTER_OUT if bad_word not in keyword_norm]
+
+
 def calculate_score(title, keyword):
     """
     제목의 적합도를 점수로 계산 (낮을수록 좋음: 0 = 최상)
@@ -44,18 +94,46 @@ def calculate_score(title, keyword):
         score += 100 # Not exact match
         
     # Penalties (Filter Out)
-    for bad_word in FILTER_OUT:
-        if bad_word in title.replace(" ", "").lower():
+    for bad_word in excluded_words(keyword):
+        if bad_word in title_norm:
             score += 500 # Push to bottom
             
     # Bonuses (Priority)
     # If "배경" is explicitly mentioned, it's good (unless it says "배경없는")
-    if "배경" in title and "배경없는" not in title and "무배경" not in title:
+    if has_background_bonus(title):
         score -= 50
         
     return score
 
 
+def has_background_bonus(title):
+    """배경 있는 PPT로 표기된 제목인지 ("배경없는", "무배경" 제외)"""
+    return "배경" in title and "배경없는" not in title and "무배경" not in title
+
+
+def is_confident_match(title, keyword):
+    """
+    다음 검색 페이지를 더 볼 필요가 없는 결과인지
+      - 번호 검색 (예: "새찬송가 ppt 28장"): 정확히 'N장' (128장, 228장 제외) + 요청한 형식
+        (ppt: 배경 있는 PPT, 악보: 제목에 '악보')
+      - 그 외 (가사/제목 검색): 제목에 검색어가 그대로 포함
+    제외 표기(FILTER_OUT)가 있는 제목은 확실한 결과로 보지 않습니다. (검색어가 요청한 표기는 제외 안 함)
+    """
+    title_norm = title.replace(" ", "").lower()
+    if any(bad_word in title_norm for bad_word in excluded_words(keyword)):
+        return False
+
+    query = parse_query(keyword)
+    if query.is_numbered:
+        if not number_pattern(query.number).search(title):
+            return False
+        if query.kind == KIND_SHEET:
+            return KIND_SHEET in title_norm
+        return has_background_bonus(title)
+
+    return keyword.replace(" ", "").lower() in title_norm
+
+
 def sanitize_filename(filename):
     """
     파일명에서 Windows에서 금지된 특수문자 제거
@@ -72,403 +150,1037 @@ def sanitize_filename(filename):
     return filename.strip()
 
 
-def search_getwater(keyword):
-    """
-    getwater.tistory.com에서 찬송가를 검색합니다.
+class GetwaterSource(SourceAdapter):
+    """getwater.tistory.com (기존)"""
 
-    Args:
-        keyword: 검색어 (예: "새찬송가 ppt 28장")
+    name = 'getwater'
+    base_url = BASE_URL
+    search_url = SEARCH_URL
 
-    Returns:
-        list: 검색 결과 리스트 [{'title': ..., 'url': ..., 'source': 'getwater'}, ...]
+    def score(self, title, keyword):
+        return calculate_score(title, keyword)
+
+    def is_confident(self, result, keyword):
+        return is_confident_match(result.title, keyword)
+
+
+class Cwy0675Source(SourceAdapter):
+    """
+    cwy0675.tistory.com (신규)
+    자연어 검색(가사 첫 소절)을 지원하므로 검색어와 일치/유사한 제목만 채택합니다.
     """
-    results = []
 
-    try:
-        # URL 인코딩
-        encoded_keyword = quote(keyword)
-        search_url = SEARCH_URL.format(keyword=encoded_keyword)
+    name = 'cwy0675'
+    base_url = CWY_BASE_URL
+    search_url = CWY_SEARCH_URL
+    fallback_selector = 'a[href*="entry"]'
 
-        response = requests.get(search_url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
+    def is_post_link(self, href):
+        return '/entry/' in href or bool(re.search(r'/\d+$', href))
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    def accept(self, title, keyword):
+        # 번호 검색은 정확한 'N장'이 있으면 채택 ("28장" 검색 → "새찬송가 28장 복의 근원 강림하사")
+        query = parse_query(keyword)
+        if query.is_numbered and query.matches(title):
+            return True
+        # 검색어 일치 여부 확인 (포함 / 50% 연속 일치 / 자모 유사도 - similarity 모듈)
+        return query_signature(keyword).matches(title)
 
-        # 검색 결과 파싱 (Tistory 검색 결과 구조)
-        # 검색 결과는 보통 article 또는 .post-item 클래스에 있음
-        articles = soup.select('.searchList li, .search-result-item, article, .post-item')
+    def score(self, title, keyword):
+        # 관련도(score) 순으로 정렬 (0에 가까울수록 제목 시작 부분에 위치)
+        return calculate_score(title, keyword)
 
-        if not articles:
-            # 대체 선택자 시도
-            articles = soup.select('a[href*="/"]')
+    def is_confident(self, result, keyword):
+        return is_confident_match(result.title, keyword)
 
-        for article in articles:
-            try:
-                # 링크 찾기
-                link = article if article.name == 'a' else article.find('a')
-                if not link or not link.get('href'):
-                    continue
 
-                href = link.get('href')
+register_source(GetwaterSource())
+register_source(Cwy0675Source())
 
-                # 숫자로 끝나는 게시물 링크만 추출 (예: /2645)
-                if not re.search(r'/\d+$', href):
-                    continue
 
-                # 전체 URL 생성
-                full_url = urljoin(BASE_URL, href)
-
-                # 제목 추출
-                title = link.get_text(strip=True)
-                if not title:
-                    title_elem = article.find(['h2', 'h3', '.title', '.tit'])
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-
-                if title and len(title) > 3:  # 너무 짧은 제목 제외
-                    # [필터링] '통일찬송가', '배경없는', '무배경' 제외 (사용자 요청)
-                    if any(bad_word in title for bad_word in ["통일찬송가", "배경없는", "무배경"]):
-                        continue
-                        
-                    # 중복 체크
-                    if not any(r['url'] == full_url for r in results):
-                        results.append({
-                            'title': title,
-                            'url': full_url,
-                            'source': 'getwater',
-                            'thumbnail': None
-                        })
-            except Exception as e:
-                continue
+def parse_getwater_results(html, keyword):
+    """
+    getwater 검색 결과 페이지 HTML에서 게시물 목록을 추출합니다. (네트워크 요청 없음)
 
-    except requests.RequestException as e:
-        print(f"[getwater] 검색 오류: {e}")
-        # 오류 발생해도 빈 결과 반환 (다른 소스 검색 계속)
+    Args:
+        html: 검색 결과 페이지 HTML
+        keyword: 검색어 (점수 계산용)
 
-    # Sort by Score for getwater too if needed
-    for r in results:
-        r['score'] = calculate_score(r['title'], keyword)
-    results.sort(key=lambda x: x['score'])
-    
-    return results
+    Returns:
+        list: 점수순으로 정렬된 검색 결과 리스트
+    """
+    return get_source('getwater').extract(html, keyword)
+
+
+def search_getwater(keyword, raise_errors=False, timeout=SOURCE_TIMEOUT):
+    """
+    getwater.tistory.com에서 찬송가를 검색합니다.
 
+    Args:
+        keyword: 검색어 (예: "새찬송가 ppt 28장")
+        raise_errors: True면 네트워크 오류를 삼키지 않고 그대로 발생시킴
+        timeout: 검색 전체 제한 시간(초) - 여러 페이지 요청 포함
 
-def search_cwy0675(keyword):
+    Returns:
+        list: 검색 결과 리스트 [{'title': ..., 'url': ..., 'source': 'getwater'}, ...]
+    """
+    return get_source('getwater').search(keyword, raise_errors=raise_errors, timeout=timeout)
+
+
+def parse_cwy0675_results(html, keyword):
+    """
+    cwy0675 검색 결과 페이지 HTML에서 검색어와 일치/유사한 게시물을 추출합니다. (네트워크 요청 없음)
+
+    Args:
+        html: 검색 결과 페이지 HTML
+        keyword: 검색어 (일치 판정 및 점수 계산용)
+
+    Returns:
+        list: 점수순으로 정렬된 검색 결과 리스트
+    """
+    return get_source('cwy0675').extract(html, keyword)
+
+
+def search_cwy0675(keyword, raise_errors=False, timeout=SOURCE_TIMEOUT):
     """
     cwy0675.tistory.com에서 찬송가를 검색합니다.
     자연어 검색(가사 첫 소절)을 지원합니다.
 
     Args:
         keyword: 검색어 (예: "찬송하라 여호와의 종들아")
+        raise_errors: True면 네트워크 오류를 삼키지 않고 그대로 발생시킴
+        timeout: 검색 전체 제한 시간(초) - 여러 페이지 요청 포함
 
     Returns:
         list: 검색 결과 리스트 [{'title': ..., 'url': ..., 'source': 'cwy0675'}, ...]
     """
-    results = []
+    return get_source('cwy0675').search(keyword, raise_errors=raise_errors, timeout=timeout)
 
-    # 검색어 정규화 (소문자화, 공백 제거)
-    normalized_keyword = re.sub(r'\s+', '', keyword).lower()
-    
+def _get_search_cache():
+    """검색 결과 캐시를 처음 사용할 때 연다. 열 수 없으면 None (캐시 없이 동작)"""
+    global _search_cache
+    if _search_cache is None:
+        try:
+            _search_cache = PersistentCache('search_results', ttl=SEARCH_CACHE_TTL,
+                                            max_entries=SEARCH_CACHE_MAX_ENTRIES)
+        except Exception as e:
+            print(f"[캐시] 검색 캐시를 열 수 없습니다: {e}")
+            return None
+    return _search_cache
+
+
+def _normalize_keyword(keyword):
+    """표준 검색어 키 (hymn_query) - "28장", "새찬송가 ppt 28장"이 같은 키"""
+    return parse_query(keyword).key_text
+
+
+def _search_cache_key(keyword, sources):
+    """(표준 검색어 키, 검색 사이트) 캐시 키"""
+    return json.dumps([_normalize_keyword(keyword), sorted(sources)], ensure_ascii=False)
+
+
+def _known_miss_wait(kind, key, source=None):
+    """실패 캐시에 있는 항목이면 재시도까지 남은 시간(초), 아니면 0 (캐시 오류 시에도 0)"""
+    negative = get_negative_cache()
+    if negative is None:
+        return 0
     try:
-        # URL 인코딩
-        encoded_keyword = quote(keyword)
-        search_url = CWY_SEARCH_URL.format(keyword=encoded_keyword)
+        return negative.retry_in(kind, key, source)
+    except Exception as e:
+        print(f"[캐시] 실패 캐시 조회 실패: {e}")
+        return 0
 
-        response = requests.get(search_url, headers=HEADERS, timeout=30)
-        response.raise_for_status()
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+def _record_lookup(kind, key, source=None, found=True):
+    """검색/게시물 분석 결과를 실패 캐시에 반영 (없으면 재시도 간격 증가, 있으면 기록 삭제)"""
+    negative = get_negative_cache()
+    if negative is None:
+        return
+    try:
+        if found:
+            negative.record_hit(kind, key, source)
+        else:
+            negative.record_miss(kind, key, source)
+    except Exception as e:
+        print(f"[캐시] 실패 캐시 저장 실패: {e}")
 
-        # cwy0675 검색 결과 파싱
-        articles = soup.select('.searchList li, .search-result-item, article, .post-item')
 
-        if not articles:
-            articles = soup.select('a[href*="entry"]')
+def known_miss_retry_in(keyword, sources=None):
+    """
+    모든 사이트에서 최근 결과가 없었던 검색어면 다시 검색할 때까지 남은 시간(초), 아니면 0
+    (한 사이트라도 재시도 간격이 지났으면 0 - 다음 검색에서 그 사이트는 실제로 요청함)
+    """
+    sources = sources or ['getwater', 'cwy0675']
+    normalized_keyword = _normalize_keyword(keyword)
+    return min(_known_miss_wait('search', normalized_keyword, source) for source in sources)
 
-        for article in articles:
-            try:
-                # 링크 찾기
-                link = article if article.name == 'a' else article.find('a')
-                if not link or not link.get('href'):
-                    continue
 
-                href = link.get('href')
-                if '/entry/' not in href and not re.search(r'/\d+$', href):
-                    continue
+def is_known_miss(keyword, sources=None):
+    """
+    모든 사이트에서 최근 결과가 없었던 검색어인지 (일괄/에이전트 모드에서 '결과 없음(캐시)' 표시용)
+    """
+    return known_miss_retry_in(keyword, sources) > 0
 
-                full_url = urljoin(CWY_BASE_URL, href)
-
-                # 제목 추출
-                title = link.get_text(strip=True)
-                if not title:
-                    title_elem = article.find(['h2', 'h3', '.title', '.tit'])
-                    if title_elem:
-                        title = title_elem.get_text(strip=True)
-
-                if title and len(title) > 3:
-                # 제목 정규화 및 필터링
-                    normalized_title = re.sub(r'\s+', '', title).lower()
-                    
-                    # 검색어 일치 여부 확인 (유사도 검사 추가)
-                    is_match = False
-                    
-                    # 1. 정확한 포함 확인
-                    if normalized_keyword in normalized_title:
-                        is_match = True
-                    # 2. 포함되지 않았다면 유사도 검사 (오타/조사 차이 허용)
-                    else:
-                        matcher = difflib.SequenceMatcher(None, normalized_keyword, normalized_title)
-                        # 가장 긴 연속 매칭 구간 찾기
-                        match = matcher.find_longest_match(0, len(normalized_keyword), 0, len(normalized_title))
-                        
-                        # 검색어의 50% 이상이 연속해서 일치하면 통과 (기준 완화: 승리하(셨네) -> 승리하(였네))
-                        # 3글자 이상인 경우에만 적용
-                        if len(normalized_keyword) >= 3 and match.size >= len(normalized_keyword) * 0.5:
-                            is_match = True
-                    
-                    # 검색어가 제목에 포함되어 있거나 유사하면 결과에 추가
-                    if is_match:
-                        # [필터링] '통일찬송가', '배경없는', '무배경' 제외 (사용자 요청)
-                        if any(bad_word in title for bad_word in ["통일찬송가", "배경없는", "무배경"]):
-                            continue
-
-                        # 중복 체크
-                        if not any(r['url'] == full_url for r in results):
-                            # 관련도 점수 계산
-                            final_score = calculate_score(title, keyword)
-                            
-                            results.append({
-                                'title': title,
-                                'url': full_url,
-                                'source': 'cwy0675',
-                                'thumbnail': None,
-                                'score': final_score
-                            })
-            except Exception as e:
+
+def clear_search_cache():
+    """저장된 검색 결과 캐시를 모두 삭제합니다."""
+    cache = _get_search_cache()
+    if cache is not None:
+        cache.clear()
+
+
+def rank_key(result, source_order):
+    """
+    통합 결과 정렬 키: 점수 → 요청한 사이트 순서.
+    사이트 응답이 어떤 순서로 도착해도 최종 순서가 같고, 새 결과가 합쳐져도
+    이미 있던 결과끼리의 순서는 바뀌지 않습니다. (같은 키는 사이트의 원래 순서 유지)
+    """
+    return (result.get('score', 999), source_order.get(result.get('source'), 0))
+
+
+def iter_search_songs(keyword, sources=None, use_cache=True,
+                      source_timeout=SOURCE_TIMEOUT, deadline=SEARCH_DEADLINE, cancel_event=None):
+    """
+    여러 사이트에서 통합 검색하며, 사이트별 결과를 도착하는 대로 내보냅니다. (generator)
+    전체 결과는 search_songs와 같고, 모든 사이트가 정상 응답하면 끝까지 읽었을 때 캐시에 저장됩니다.
+    cancel_event가 설정되면 시작 전인 사이트 검색은 취소하고, 진행 중인 검색은 다음 페이지 전에 멈춘 뒤
+    더 내보내지 않고 끝납니다. (취소된 검색은 캐시에 저장하지 않음)
+    전체 제한 시간(deadline)을 넘기거나 호출한 쪽이 중간에 읽기를 멈춰도 남은 사이트 검색을 같은 방식으로
+    멈춥니다. (버려진 검색이 공용 작업 풀을 계속 차지하지 않도록)
+
+    Args:
+        search_songs와 동일
+
+    Yields:
+        (source, results): 사이트 이름과 그 사이트의 점수순 결과 [SearchResult, ...]
+                           캐시에 있으면 ('cache', 통합 결과) 한 번만 내보냄
+    """
+    if sources is None:
+        sources = ['getwater', 'cwy0675']
+
+    # 사이트에는 입력한 검색어 그대로 보내고, 캐시/실패 캐시 키만 표준 형태(hymn_query)로 통일
+    cache = _get_search_cache()
+    cache_key = _search_cache_key(keyword, sources)
+
+    if use_cache and cache is not None:
+        try:
+            cached = cache.get(cache_key)
+            if cached is not None:
+                yield 'cache', [SearchResult.from_dict(r) for r in cached]
+                return
+        except Exception as e:
+            print(f"[캐시] 조회 실패: {e}")
+
+    source_order = {source: i for i, source in enumerate(sources)}
+    query = parse_query(keyword)
+    normalized_keyword = query.key_text
+
+    results = []
+    has_error = False
+
+    # 남은 사이트 검색을 멈추는 신호 (호출한 쪽이 넘긴 것이 없으면 이 검색 전용으로 만듦)
+    if cancel_event is None:
+        cancel_event = threading.Event()
+
+    futures = {}
+    for source in sources:
+        adapter = get_source(source)
+        if adapter is None:
+            continue
+        # 최근 결과가 없었던 (검색어, 사이트)는 재시도 간격이 지날 때까지 검색하지 않음
+        if use_cache:
+            wait = _known_miss_wait('search', normalized_keyword, source)
+            if wait > 0:
+                print(f"[{source}] 최근 결과 없음 - 건너뜀 ({wait / 60:.0f}분 후 재검색)")
                 continue
+        # 연속 실패로 차단된 사이트는 요청 없이 바로 SourceUnavailable (부분 결과이므로 캐시하지 않음)
+        future = _search_executor.submit(adapter.search, keyword, raise_errors=True,
+                                         timeout=source_timeout, cancel_event=cancel_event)
+        futures[future] = source
 
-        # 관련도(score) 순으로 정렬 (0에 가까울수록 제목 시작 부분에 위치)
-        results.sort(key=lambda x: x['score'])
+    try:
+        for future in as_completed(futures, timeout=deadline):
+            if cancel_event is not None and cancel_event.is_set():
+                has_error = True
+                for pending in futures:
+                    pending.cancel()
+                print(f"[검색] 취소됨: {keyword}")
+                break
+
+            source = futures[future]
+            try:
+                batch = future.result()
+            except SearchCancelled:
+                has_error = True
+                continue
+            except Exception as e:
+                has_error = True
+                print(f"[{source}] 검색 실패: {e}")
+                continue
 
-    except requests.RequestException as e:
-        print(f"[cwy0675] 검색 오류: {e}")
+            # 정상 응답한 사이트만 실패 캐시에 반영 (네트워크 오류는 결과 없음이 아님)
+            # 번호 검색은 정확한 'N장' 결과가 있어야 찾은 것으로 봄 (128장/228장 같은 이웃 번호만 나오면 실패)
+            _record_lookup('search', normalized_keyword, source, found=bool(query.filter(batch)))
+            results.extend(batch)
+            yield source, batch
+    except FuturesTimeoutError:
+        has_error = True
+        pending = [source for future, source in futures.items() if not future.done()]
+        print(f"[검색] 제한 시간 초과 ({deadline}초) - 응답 없는 사이트 제외: {', '.join(pending)}")
+    finally:
+        # 제한 시간 초과/취소/중간에 읽기를 멈춘 경우: 시작 전 검색은 취소, 진행 중 검색은 다음 페이지 전에 중단
+        if not all(future.done() for future in futures):
+            cancel_event.set()
+            for future in futures:
+                future.cancel()
+
+    # 모든 사이트가 정상 응답한 결과만 캐시 (일시적 오류/빈 결과가 7일간 남지 않도록)
+    if cache is not None and results and not has_error:
+        results.sort(key=lambda x: rank_key(x, source_order))
+        try:
+            cache.set(cache_key, [r.to_dict() for r in results])
+        except Exception as e:
+            print(f"[캐시] 저장 실패: {e}")
 
-    return results
 
-def search_songs(keyword, sources=None):
+def search_songs(keyword, sources=None, use_cache=True,
+                 source_timeout=SOURCE_TIMEOUT, deadline=SEARCH_DEADLINE, on_partial=None, cancel_event=None):
     """
     여러 사이트에서 통합 검색합니다.
+    사이트별 검색은 동시에 실행되며, 도착하는 대로 합쳐서 점수순으로 정렬합니다.
 
     Args:
         keyword: 검색어 (자연어 또는 번호 검색 지원)
         sources: 검색할 사이트 리스트 (기본값: ['getwater', 'cwy0675'])
                  예: ['getwater'], ['cwy0675'], ['getwater', 'cwy0675']
+        use_cache: False면 캐시를 건너뛰고 사이트를 다시 검색 (결과는 캐시에 갱신됨)
+        source_timeout: 사이트별 검색 시간 예산(초) - 여러 페이지 요청과 요청 제한 대기를 합친 시간
+        deadline: 전체 제한 시간(초). 초과하면 늦은 사이트를 기다리지 않고 부분 결과 반환
+                  (남은 사이트 검색은 다음 페이지 전에 멈춤)
+        on_partial: 사이트 결과가 도착할 때마다 호출할 함수 (source, 지금까지의 통합 결과)
+                    검색 스레드에서 호출되므로 GUI에서는 root.after로 넘겨야 함
+        cancel_event: threading.Event - 설정되면 남은 사이트 검색을 멈추고 그때까지의 결과 반환
 
     Returns:
-        list: 통합 검색 결과 리스트 [{'title': ..., 'url': ..., 'source': ...}, ...]
+        list: 통합 검색 결과 리스트 [SearchResult, ...]
+              (기존 dict처럼 result['title'], result['url'], result['source']로 접근 가능)
     """
     if sources is None:
         sources = ['getwater', 'cwy0675']
 
+    # 같은 점수일 때는 요청한 사이트 순서를 유지 (기존 순차 검색과 동일한 순서)
+    source_order = {source: i for i, source in enumerate(sources)}
+
     results = []
+    for source, batch in iter_search_songs(keyword, sources, use_cache, source_timeout, deadline, cancel_event):
+        # 도착할 때마다 병합 후 재정렬
+        results.extend(batch)
+        results.sort(key=lambda x: rank_key(x, source_order))
+        if on_partial:
+            on_partial(source, list(results))
+
+    return results
 
-    # getwater.tistory.com 검색
-    if 'getwater' in sources:
+
+def search_songs_many(keywords, sources=None, use_cache=True,
+                      max_workers=BATCH_SEARCH_WORKERS, progress_callback=None):
+    """
+    여러 검색어를 동시에 통합 검색합니다. (예: 28-60장 일괄 검색)
+    같은 찬송가를 가리키는 검색어("28", "28장", "새찬송가 ppt 28장")는 한 번만 검색하고,
+    동시에 max_workers개까지만 검색합니다.
+
+    Args:
+        keywords: 검색어 리스트
+        sources: 검색할 사이트 리스트 (search_songs와 동일)
+        use_cache: False면 캐시를 건너뛰고 사이트를 다시 검색
+        max_workers: 동시에 검색할 검색어 수
+        progress_callback: 검색어 하나가 끝날 때마다 호출 (done, total, keyword) - 작업 스레드에서 호출됨
+
+    Returns:
+        dict: {검색어: [SearchResult, ...]} - 입력 순서 (검색 실패한 검색어는 빈 리스트)
+    """
+    keywords = list(keywords)
+    # 표준 검색어 키 기준으로 중복 제거 (hymn_query) - 키마다 처음 입력된 검색어로 검색
+    unique_keywords = {}
+    for keyword in keywords:
+        unique_keywords.setdefault(_normalize_keyword(keyword), keyword)
+    results = {}
+
+    def search_one(keyword):
         try:
-            getwater_results = search_getwater(keyword)
-            results.extend(getwater_results)
+            return search_songs(keyword, sources=sources, use_cache=use_cache)
         except Exception as e:
-            print(f"[getwater] 검색 실패: {e}")
+            print(f"[일괄 검색] '{keyword}' 실패: {e}")
+            return []
+
+    # search_songs가 사이트별 검색에 _search_executor를 쓰므로 검색어 단위는 별도 작업 풀에서 실행
+    with ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="song_search_many") as executor:
+        futures = {executor.submit(search_one, keyword): key for key, keyword in unique_keywords.items()}
+        for done, future in enumerate(as_completed(futures), 1):
+            key = futures[future]
+            results[key] = future.result()
+            if progress_callback:
+                progress_callback(done, len(unique_keywords), unique_keywords[key])
+
+    return {keyword: results[_normalize_keyword(keyword)] for keyword in keywords}
+
+
+
+def parse_download_info(html):
+    """
+    게시물 페이지 HTML에서 다운로드 링크와 파일명을 추출합니다. (네트워크 요청 없음)
+
+    Args:
+        html: 게시물 페이지 HTML
+
+    Returns:
+        dict: {'download_url': ..., 'filename': ..., 'title': ...}
+              (filename은 본문에서 찾지 못하면 None)
+    """
+    soup = parse_post_page(html)
+
+    # 게시물 제목
+    title = ""
+    title_elem = soup.find(['h1', '.title', '.tit', 'title'])
+    if title_elem:
+        title = title_elem.get_text(strip=True)
+
+    # 다운로드 링크 찾기
+    download_url = None
+    filename = None
 
-    # cwy0675.tistory.com 검색
-    if 'cwy0675' in sources:
+    # 본문 영역 찾기 (Tistory 공통 클래스들)
+    content_area = soup.find(['article', '.entry-content', '.post-content', '.tt_article_useless_p_margin', '#content', '#article'])
+    
+    # 본문 영역에서만 링크 찾기 (관련글 등 제외)
+    search_target = content_area if content_area else soup
+    all_links = search_target.find_all('a', href=True)
+    
+    # 1차 시도: PPT 확장자가 포함된 링크 우선 찾기
+    for link in all_links:
+        href = link.get('href', '')
+        link_text = link.get_text().lower()
+        
+        is_download_link = 't1.daumcdn.net' in href or 'tistory.com/attachment' in href
+        
+        if is_download_link:
+            # PPT 파일인지 확인
+            if '.ppt' in href.lower() or '.pptx' in href.lower() or '.ppt' in link_text or '.pptx' in link_text:
+                download_url = href
+                
+                # 파일명 추출 시도
+                parent = link.parent
+                if parent:
+                    parent_text = parent.get_text()
+                    match = re.search(r'([^\n]+\.(ppt|pptx))', parent_text, re.IGNORECASE)
+                    if match:
+                        filename = match.group(1).strip()
+                break
+    
+    # 2차 시도: PPT 전용 링크를 못 찾았을 경우 가장 첫 번째 다운로드 링크 사용
+    if not download_url:
+        for link in all_links:
+            href = link.get('href', '')
+            if 't1.daumcdn.net' in href or 'tistory.com/attachment' in href:
+                download_url = href
+                break
+
+
+    # 패턴 2: 이미지 다운로드 링크 (original 파라미터)
+    if not download_url:
+        images = soup.find_all('img', src=True)
+        for img in images:
+            src = img.get('src', '')
+            if 't1.daumcdn.net' in src or 'tistory.com' in src:
+                # original 버전 URL로 변환
+                if '?' not in src:
+                    download_url = src + '?original'
+                else:
+                    download_url = src
+                break
+
+    # 패턴 3: 본문에서 파일명 패턴 찾기
+    if not filename:
+        content = soup.find(['article', '.entry-content', '.post-content', '#content'])
+        if content:
+            text = content.get_text()
+            # PPT 파일명 패턴 찾기
+            match = re.search(r'(\d+장[^.]+\.(ppt|pptx))', text, re.IGNORECASE)
+            if match:
+                filename = match.group(1)
+
+    return {
+        'download_url': download_url,
+        'filename': filename,
+        'title': title
+    }
+
+
+def _get_download_info_cache():
+    """다운로드 정보 캐시를 처음 사용할 때 연다. 열 수 없으면 None (캐시 없이 동작)"""
+    global _download_info_cache
+    if _download_info_cache is None:
         try:
-            cwy_results = search_cwy0675(keyword)
-            results.extend(cwy_results)
+            _download_info_cache = PersistentCache('download_info', ttl=DOWNLOAD_INFO_CACHE_TTL,
+                                                   max_entries=DOWNLOAD_INFO_CACHE_MAX_ENTRIES)
         except Exception as e:
-            print(f"[cwy0675] 검색 실패: {e}")
+            print(f"[캐시] 다운로드 정보 캐시를 열 수 없습니다: {e}")
+            return None
+    return _download_info_cache
 
-    # 통합 후 한 번 더 정렬 (옵션)
-    results.sort(key=lambda x: x.get('score', 999))
 
-    return results
+def filename_from_headers(headers):
+    """
+    Content-Disposition 헤더에서 파일명을 추출합니다.
+    filename="abc.ppt" 또는 filename*=UTF-8''%ED%8C%8C%EC%9D%BC.ppt 형식 지원
 
+    Returns:
+        str: 파일명 또는 None
+    """
+    content_disposition = headers.get('Content-Disposition', '')
+    if 'filename' not in content_disposition:
+        return None
+
+    fname_match = re.search(r"filename\*=(?:UTF-8|utf-8)''([^;]+)", content_disposition)
+    if fname_match:
+        return unquote(fname_match.group(1)).strip()
+
+    fname_match = re.search(r'filename="([^"]+)"', content_disposition) or \
+        re.search(r'filename=([^;]+)', content_disposition)
+    if fname_match:
+        return fname_match.group(1).strip().strip('"').strip("'")
+    return None
+
+
+def _url_filename(url):
+    """URL 경로의 마지막 부분 (퍼센트 인코딩 해제) - 첨부파일 URL은 보통 원래 파일명으로 끝남"""
+    return unquote(os.path.basename(urlsplit(url).path))
+
+
+def _remembered_header_filename(download_url):
+    """이전 다운로드에서 응답 헤더로 확인한 파일명 (없거나 캐시 오류면 None)"""
+    cache = _get_download_info_cache()
+    if cache is None:
+        return None
+    try:
+        return cache.get(f"file:{download_url}")
+    except Exception as e:
+        print(f"[캐시] 조회 실패: {e}")
+        return None
 
 
-def get_download_info(post_url):
+def remember_header_filename(download_url, filename):
+    """download_file이 응답 헤더에서 찾은 파일명을 기록 (다음 get_download_info에서 사용)"""
+    cache = _get_download_info_cache()
+    if cache is not None and filename:
+        try:
+            cache.set(f"file:{download_url}", filename)
+        except Exception as e:
+            print(f"[캐시] 저장 실패: {e}")
+
+
+def get_download_info(post_url, use_cache=True):
     """
     게시물 페이지에서 다운로드 링크와 파일명을 추출합니다.
+    게시물 페이지는 조건부 요청(http_client.get_cached)으로 가져오고, 추출 결과는 게시물 URL별로 캐시됩니다.
+      - 최근(DOWNLOAD_INFO_FRESH 이내)에 확인한 게시물: 요청 없이 캐시된 결과 사용
+      - 그 외: 재검증 요청 → 304(변경 없음)면 캐시된 결과, 바뀌었으면(재업로드 등) 다시 추출
+
+    본문에 파일명이 없으면 제목으로 파일명을 만들고 'filename_guessed'를 True로 표시합니다.
+    (실제 파일명은 download_file이 첨부파일을 받을 때 응답 헤더에서 확인 - 별도 HEAD 요청 없음)
 
     Args:
         post_url: 게시물 URL
+        use_cache: False면 캐시를 건너뛰고 게시물 페이지를 다시 받아 추출
 
     Returns:
-        dict: {'download_url': ..., 'filename': ..., 'title': ...}
+        dict: {'download_url': ..., 'filename': ..., 'title': ..., 'filename_guessed': bool,
+               'cached_miss': bool}
+              최근 첨부파일이 없던 게시물이면 요청 없이 download_url None, cached_miss True
     """
+    cache = _get_download_info_cache()
+    cache_key = f"post:{post_url}"
+
+    # 최근 첨부파일이 없던 게시물은 재시도 간격이 지날 때까지 다시 분석하지 않음
+    if use_cache and _known_miss_wait('post', post_url) > 0:
+        return {'download_url': None, 'filename': None, 'title': '',
+                'filename_guessed': False, 'cached_miss': True}
+
     try:
-        response = requests.get(post_url, headers=HEADERS, timeout=30)
+        if use_cache:
+            response = http_client.get_cached(post_url, fresh_for=DOWNLOAD_INFO_FRESH, timeout=30)
+        else:
+            response = http_client.get(post_url, timeout=30)
         response.raise_for_status()
+    except requests.RequestException as e:
+        raise Exception(f"페이지 로드 실패: {e}")
 
-        soup = BeautifulSoup(response.text, 'html.parser')
+    # 페이지가 바뀌지 않았으면 이전 추출 결과 재사용 (파싱 생략)
+    info = None
+    if use_cache and cache is not None and getattr(response, 'cache_status', None) in ('hit', 'revalidated'):
+        try:
+            info = cache.get(cache_key)
+        except Exception as e:
+            print(f"[캐시] 조회 실패: {e}")
 
-        # 게시물 제목
-        title = ""
-        title_elem = soup.find(['h1', '.title', '.tit', 'title'])
-        if title_elem:
-            title = title_elem.get_text(strip=True)
+    if info is None:
+        info = parse_download_info(response.text)
 
-        # 다운로드 링크 찾기
-        download_url = None
-        filename = None
+        # 다운로드 링크가 있는 결과만 캐시 (일시적인 페이지 구조 문제가 남지 않도록)
+        if cache is not None and info['download_url']:
+            try:
+                cache.set(cache_key, info)
+            except Exception as e:
+                print(f"[캐시] 저장 실패: {e}")
 
-        # 본문 영역 찾기 (Tistory 공통 클래스들)
-        content_area = soup.find(['article', '.entry-content', '.post-content', '.tt_article_useless_p_margin', '#content', '#article'])
-        
-        # 본문 영역에서만 링크 찾기 (관련글 등 제외)
-        search_target = content_area if content_area else soup
-        all_links = search_target.find_all('a', href=True)
-        
-        # 1차 시도: PPT 확장자가 포함된 링크 우선 찾기
-        for link in all_links:
-            href = link.get('href', '')
-            link_text = link.get_text().lower()
-            
-            is_download_link = 't1.daumcdn.net' in href or 'tistory.com/attachment' in href
-            
-            if is_download_link:
-                # PPT 파일인지 확인
-                if '.ppt' in href.lower() or '.pptx' in href.lower() or '.ppt' in link_text or '.pptx' in link_text:
-                    download_url = href
-                    
-                    # 파일명 추출 시도
-                    parent = link.parent
-                    if parent:
-                        parent_text = parent.get_text()
-                        match = re.search(r'([^\n]+\.(ppt|pptx))', parent_text, re.IGNORECASE)
-                        if match:
-                            filename = match.group(1).strip()
-                    break
-        
-        # 2차 시도: PPT 전용 링크를 못 찾았을 경우 가장 첫 번째 다운로드 링크 사용
-        if not download_url:
-            for link in all_links:
-                href = link.get('href', '')
-                if 't1.daumcdn.net' in href or 'tistory.com/attachment' in href:
-                    download_url = href
-                    break
-
-
-        # 패턴 2: 이미지 다운로드 링크 (original 파라미터)
-        if not download_url:
-            images = soup.find_all('img', src=True)
-            for img in images:
-                src = img.get('src', '')
-                if 't1.daumcdn.net' in src or 'tistory.com' in src:
-                    # original 버전 URL로 변환
-                    if '?' not in src:
-                        download_url = src + '?original'
-                    else:
-                        download_url = src
-                    break
-
-        # 패턴 3: 본문에서 파일명 패턴 찾기
-        if not filename:
-            content = soup.find(['article', '.entry-content', '.post-content', '#content'])
-            if content:
-                text = content.get_text()
-                # PPT 파일명 패턴 찾기
-                match = re.search(r'(\d+장[^.]+\.(ppt|pptx))', text, re.IGNORECASE)
-                if match:
-                    filename = match.group(1)
-
-        # 패턴 4: 서버 헤더에서 파일명 확인 (HEAD 요청)
-        if not filename and download_url:
+        # 링크가 없는 게시물은 실패 캐시에 기록 (재시도 간격이 점점 늘어남)
+        _record_lookup('post', post_url, found=bool(info['download_url']))
+
+    download_url = info['download_url']
+    filename = info['filename']
+    title = info['title']
+    filename_guessed = False
+
+    # 본문에 파일명이 없으면: 이전 다운로드에서 응답 헤더로 확인한 파일명
+    if not filename and download_url:
+        filename = _remembered_header_filename(download_url)
+
+    # 파일명이 없으면 제목에서 생성
+    if not filename and title:
+        filename = sanitize_filename(title) + ".ppt"
+        filename_guessed = True
+    
+    # 파일명에서 불필요한 공백 및 인코딩 잔재 제거
+    if filename:
+        filename = filename.strip('"').strip("'")
+
+    return {
+        'download_url': download_url,
+        'filename': filename,
+        'title': title,
+        'filename_guessed': filename_guessed,
+        'cached_miss': False
+    }
+
+
+class DownloadCancelled(Exception):
+    """cancel_event로 다운로드가 취소됨 (받던 임시 파일은 다음 실행에서 이어받기 위해 남겨 둠)"""
+
+
+class DownloadTooLarge(Exception):
+    """max_bytes보다 큰 파일이라 받지 않음"""
+
+
+def _load_partial_meta(meta_path, download_url):
+    """이어받기 정보(.tmp.json)를 읽습니다. 다른 URL이거나 검증값(ETag/Last-Modified)이 없으면 None"""
+    try:
+        with open(meta_path, encoding='utf-8') as f:
+            meta = json.load(f)
+    except (OSError, ValueError):
+        return None
+    if meta.get('url') != download_url or not (meta.get('etag') or meta.get('last_modified')):
+        return None
+    return meta
+
+
+def _save_partial_meta(meta_path, download_url, response, total_size):
+    """응답 헤더의 검증값을 이어받기 정보로 저장합니다."""
+    meta = {
+        'url': download_url,
+        'etag': response.headers.get('ETag'),
+        'last_modified': response.headers.get('Last-Modified'),
+        'total_size': total_size
+    }
+    with open(meta_path, 'w', encoding='utf-8') as f:
+        json.dump(meta, f)
+    return meta
+
+
+def _remove_partial(temp_path, meta_path):
+    for path in (temp_path, meta_path):
+        if os.path.exists(path):
             try:
-                head_resp = requests.head(download_url, headers=HEADERS, timeout=5, allow_redirects=True)
-                content_disposition = head_resp.headers.get('Content-Disposition', '')
-                if 'filename' in content_disposition:
-                    # filename="abc.ppt" 또는 filename*=UTF-8''%ED%8C%8C%EC%9D%BC.ppt 추출
-                    fname_match = re.search(r"filename\*=UTF-8''(.+)", content_disposition)
-                    if fname_match:
-                        filename = urllib.parse.unquote(fname_match.group(1))
-                    else:
-                        fname_match = re.search(r'filename="(.+)"', content_disposition)
-                        if fname_match:
-                            filename = fname_match.group(1)
-            except:
+                os.remove(path)
+            except OSError:
                 pass
 
-        # 파일명이 없으면 제목에서 생성
-        if not filename and title:
-            filename = sanitize_filename(title) + ".ppt"
-        
-        # 파일명에서 불필요한 공백 및 인코딩 잔재 제거
-        if filename:
-            filename = filename.strip('"').strip("'")
-
-        return {
-            'download_url': download_url,
-            'filename': filename,
-            'title': title
-        }
 
-    except requests.RequestException as e:
-        raise Exception(f"페이지 로드 실패: {e}")
+def _get_blob_store():
+    """파일 보관소를 연다. 열 수 없으면 None (보관소 없이 동작)"""
+    try:
+        return get_blob_store()
+    except Exception as e:
+        print(f"[보관소] 파일 보관소를 열 수 없습니다: {e}")
+        return None
 
 
-def download_file(download_url, save_path, progress_callback=None):
+def download_file(download_url, save_path, progress_callback=None, cancel_event=None,
+                  max_retries=DOWNLOAD_RETRIES, use_store=True, name_from_header=None, max_bytes=None,
+                  priority=PRIORITY_INTERACTIVE):
     """
     파일을 다운로드합니다.
+    연결이 끊기면 받은 부분(.tmp)을 유지하고 Range 요청으로 이어받습니다.
+    (서버가 준 ETag/Last-Modified를 If-Range로 보내서 파일이 바뀌었으면 처음부터 다시 받음)
+    받은 파일은 검증값(ETag/Last-Modified)과 함께 보관소(blob_store)에 등록됩니다.
+    같은 URL을 다시 받을 때는 조건부 요청을 보내 바뀌지 않았으면(304) 본문 없이 보관본을 하드링크하고,
+    바뀌었으면(200) 그 응답으로 새로 받습니다. (검증값이 없던 보관본은 항상 새로 받음, 연결 실패 시 보관본 사용)
 
     Args:
         download_url: 다운로드 URL
         save_path: 저장 경로 (전체 파일 경로)
         progress_callback: 진행률 콜백 함수 (percent)
+        cancel_event: threading.Event - 설정되면 중단 (임시 파일은 이어받기용으로 남음)
+        max_retries: 연결 끊김 시 이어받기 재시도 횟수
+        use_store: False면 보관소를 사용하지 않고 항상 새로 받음
+        name_from_header: 응답 헤더(Content-Disposition)에 파일명이 있을 때 저장 경로를 정하는 함수
+                          (header_filename) -> save_path. 없으면 save_path 그대로 사용
+        max_bytes: 이보다 큰 파일이면 받지 않고 DownloadTooLarge 발생 (미리 받기 용량 제한용)
+        priority: 대역폭 우선순위 (download_scheduler: 'interactive' / 'agent' / 'background')
+                  동시에 받을 때 사용자가 기다리는 곡이 먼저 끝나도록 낮은 우선순위는 속도를 양보
 
     Returns:
-        bool: 성공 여부
+        str: 실제 저장된 파일 경로 (성공 여부 확인용으로 참/거짓 판정 가능)
     """
     temp_path = save_path + '.tmp'
+    meta_path = temp_path + '.json'
+
+    # 저장 폴더 생성
+    save_dir = os.path.dirname(save_path)
+    if save_dir and not os.path.exists(save_dir):
+        os.makedirs(save_dir, exist_ok=True)
+
+    # 받은 적 있는 파일이면 조건부 요청으로 바뀌었는지 확인 후 보관본을 연결
+    store = _get_blob_store() if use_store else None
+    pending_response = None
+    validators = store.validators(download_url) if store is not None else None
+    if validators:
+        headers = {}
+        if validators['etag']:
+            headers['If-None-Match'] = validators['etag']
+        if validators['last_modified']:
+            headers['If-Modified-Since'] = validators['last_modified']
+        try:
+            pending_response = http_client.get(download_url, timeout=60, stream=True, headers=headers)
+        except requests.RequestException as e:
+            # 연결할 수 없으면 지난번에 받은 보관본 사용 (오프라인에서도 PPT 생성 가능)
+            print(f"[보관소] 변경 확인 실패, 보관본 사용: {e}")
+
+        if pending_response is None or pending_response.status_code == 304:
+            header_filename = None
+            if pending_response is not None:
+                header_filename = filename_from_headers(pending_response.headers)
+                pending_response.close()
+                pending_response = None
+            header_filename = header_filename or _remembered_header_filename(download_url)
+            stored_path = name_from_header(header_filename) if name_from_header and header_filename else save_path
+            # 보관본도 형식을 검사 (이전 버전이 확장자 없는 이름으로 받은 파일 등) - 잘못된 보관본은 지우고 새로 받음
+            store_check_name = pick_check_name(os.path.basename(stored_path), header_filename,
+                                               _url_filename(download_url))
+            try:
+                if store.materialize(download_url, stored_path,
+                                     validate=lambda path: check_complete(path, store_check_name or '')):
+                    if progress_callback:
+                        progress_callback(100)
+                    return stored_path
+            except Exception as e:
+                print(f"[보관소] 보관본 연결 실패, 새로 받습니다: {e}")
 
-    try:
-        response = requests.get(download_url, headers=HEADERS, timeout=60, stream=True)
-        response.raise_for_status()
-
-        # 파일 크기
-        total_size = int(response.headers.get('content-length', 0))
-        downloaded = 0
+    # 이전 실행에서 남은 임시 파일 (검증값이 없으면 이어받을 수 없으므로 버림)
+    meta = _load_partial_meta(meta_path, download_url)
+    if meta is None:
+        _remove_partial(temp_path, meta_path)
 
-        # 저장 폴더 생성
-        save_dir = os.path.dirname(save_path)
-        if not os.path.exists(save_dir):
-            os.makedirs(save_dir, exist_ok=True)
+    final_path = save_path
+    header_filename = None
+    attempt = 0
+    while True:
+        try:
+            downloaded = os.path.getsize(temp_path) if meta and os.path.exists(temp_path) else 0
+
+            headers = {}
+            if downloaded:
+                headers['Range'] = f"bytes={downloaded}-"
+                headers['If-Range'] = meta.get('etag') or meta.get('last_modified')
+
+            if pending_response is not None:
+                # 보관본 확인 요청에 새 파일(200)이 왔으면 그 응답으로 받음 (Range 없는 전체 응답)
+                response, pending_response = pending_response, None
+            else:
+                response = http_client.get(download_url, timeout=60, stream=True, headers=headers)
+
+            if response.status_code == 416 and downloaded:
+                response.close()
+                if downloaded != meta.get('total_size'):
+                    # 받은 부분이 서버 파일과 맞지 않음 → 처음부터 다시
+                    _remove_partial(temp_path, meta_path)
+                    meta = None
+                    continue
+                # 이미 전부 받은 상태 (이전 실행이 이름 변경 직전에 중단됨)
+            else:
+                response.raise_for_status()
+
+                # 실제 파일명은 첨부파일 응답 헤더에서 확인 (별도 HEAD 요청 없음)
+                header_filename = filename_from_headers(response.headers)
+                if header_filename:
+                    remember_header_filename(download_url, header_filename)
+                    if name_from_header:
+                        final_path = name_from_header(header_filename)
+
+                if downloaded and response.status_code == 206:
+                    # 이어받기: Content-Range 시작 위치가 받은 크기와 같아야 함
+                    content_range = response.headers.get('Content-Range', '')
+                    range_match = re.match(r'bytes (\d+)-\d+/(\d+|\*)', content_range)
+                    if not range_match or int(range_match.group(1)) != downloaded:
+                        raise requests.RequestException(f"잘못된 이어받기 응답: {content_range}")
+                    total_size = int(range_match.group(2)) if range_match.group(2) != '*' else 0
+                    mode = 'ab'
+                else:
+                    # 처음부터 (또는 서버 파일이 바뀌어 전체 응답이 옴)
+                    downloaded = 0
+                    total_size = int(response.headers.get('content-length', 0))
+                    mode = 'wb'
+                    meta = _save_partial_meta(meta_path, download_url, response, total_size)
+
+                if max_bytes is not None and total_size > max_bytes:
+                    response.close()
+                    raise DownloadTooLarge(f"파일 크기 초과 ({total_size} > {max_bytes} bytes)")
+
+                # 처음부터 받을 때는 첫 바이트로 형식 확인 (오류 페이지/이미지면 바로 중단)
+                # 저장 이름에 확장자가 없으면(미리 받기 임시 이름 등) 응답 헤더/URL의 파일명으로 검사
+                check_name = pick_check_name(os.path.basename(final_path), header_filename,
+                                             _url_filename(download_url))
+                head = b'' if mode == 'wb' and check_name else None
+
+                # 임시 파일로 다운로드 (청크마다 우선순위에 따라 속도 양보)
+                with get_scheduler().stream(priority) as stream, open(temp_path, mode) as f:
+                    chunk_started = time.monotonic()
+                    for chunk in response.iter_content(chunk_size=DOWNLOAD_CHUNK_SIZE):
+                        if chunk:
+                            stream.pace(len(chunk), time.monotonic() - chunk_started, cancel_event)
+                        if cancel_event is not None and cancel_event.is_set():
+                            response.close()
+                            raise DownloadCancelled("다운로드가 취소되었습니다.")
+                        if chunk:
+                            if head is not None:
+                                head += chunk[:HEADER_SIZE - len(head)]
+                                if len(head) >= HEADER_SIZE:
+                                    try:
+                                        check_header(head, check_name)
+                                    except InvalidFileContent:
+                                        response.close()
+                                        raise
+                                    head = None
+                            f.write(chunk)
+                            downloaded += len(chunk)
+                            if max_bytes is not None and downloaded > max_bytes:
+                                response.close()
+                                raise DownloadTooLarge(f"파일 크기 초과 ({downloaded} > {max_bytes} bytes)")
+
+                            if progress_callback and total_size > 0:
+                                percent = int((downloaded / total_size) * 100)
+                                progress_callback(percent)
+                        chunk_started = time.monotonic()
+
+                if total_size and downloaded < total_size:
+                    raise requests.RequestException(f"연결 끊김 ({downloaded}/{total_size} bytes)")
+
+            # 다 받은 파일 형식 확인 (.pptx는 끝의 ZIP 중앙 디렉터리까지) - 깨진 파일은 PPT 생성 단계로 넘기지 않음
+            check_complete(temp_path, pick_check_name(os.path.basename(final_path), header_filename,
+                                                      _url_filename(download_url)) or '')
+
+            # 완료 후 정식 파일명으로 변경
+            if os.path.exists(final_path):
+                os.remove(final_path)
+            os.rename(temp_path, final_path)
+            _remove_partial(temp_path, meta_path)
+
+            if store is not None:
+                try:
+                    store.add_file(final_path, download_url,
+                                   etag=meta.get('etag') if meta else None,
+                                   last_modified=meta.get('last_modified') if meta else None)
+                except Exception as e:
+                    print(f"[보관소] 등록 실패: {e}")
+
+            return final_path
+
+        except DownloadCancelled:
+            raise
+
+        except (DownloadTooLarge, InvalidFileContent):
+            _remove_partial(temp_path, meta_path)
+            raise
+
+        except requests.RequestException as e:
+            # HTTP 오류 응답(404 등)은 재시도해도 같으므로 바로 실패
+            is_http_error = isinstance(e, requests.HTTPError)
+            attempt += 1
+            if is_http_error or attempt > max_retries:
+                if is_http_error or meta is None:
+                    _remove_partial(temp_path, meta_path)
+                raise Exception(f"다운로드 실패: {e}")
+            print(f"[다운로드] 연결 오류, 이어받기 재시도 ({attempt}/{max_retries}): {e}")
+            time.sleep(DOWNLOAD_RETRY_BACKOFF * attempt)
 
-        # 임시 파일로 다운로드
-        with open(temp_path, 'wb') as f:
-            for chunk in response.iter_content(chunk_size=8192):
-                if chunk:
-                    f.write(chunk)
-                    downloaded += len(chunk)
+        except Exception as e:
+            # 파일 쓰기 오류 등: 임시 파일 삭제
+            _remove_partial(temp_path, meta_path)
+            raise Exception(f"다운로드 실패: {e}")
 
-                    if progress_callback and total_size > 0:
-                        percent = int((downloaded / total_size) * 100)
-                        progress_callback(percent)
 
-        # 완료 후 정식 파일명으로 변경
-        if os.path.exists(save_path):
-            os.remove(save_path)
-        os.rename(temp_path, save_path)
+class DownloadManager:
+    """
+    여러 곡을 동시에 다운로드합니다.
+
+    - 작업 스레드 수 제한 (max_workers) + 호스트별 동시 요청 수 제한 (per_host_limit)
+    - 완료 콜백은 작업 순서대로 호출 (3번이 먼저 끝나도 1, 2번 완료 후 전달)
+    - 전체 진행률은 작업별 진행률의 평균으로 하나의 콜백에 전달
+    - cancel() 시 시작 전 작업은 건너뛰고, 진행 중인 다운로드는 이어받기 가능한 상태로 중단
+    - 대역폭 우선순위 (priority, 기본 'agent'): 사용자가 고른 곡(interactive) 다운로드에 속도를 양보
+
+    작업(job)은 dict입니다:
+        'post_url'          : 게시물 URL (download_url이 없으면 get_download_info로 조회)
+        'download_url'      : 이미 알고 있는 첨부파일 URL (선택)
+        'filename'          : 이미 알고 있는 파일명 (선택)
+        'resolve'           : 다운로드 정보를 직접 구하는 함수 () -> {'download_url', 'filename'} (선택)
+        'fallback_filename' : 파일명을 찾지 못했을 때 사용할 이름
+        'save_dir'          : 저장 폴더
+        'prefix'            : 파일명 앞에 붙일 문자열 (예: "3. ")
+        'skip_existing'     : 같은 이름의 파일이 있으면 다운로드하지 않음 (기본값: True)
+    """
 
-        return True
+    def __init__(self, max_workers=DOWNLOAD_WORKERS, per_host_limit=DOWNLOAD_PER_HOST, cancel_event=None,
+                 priority=PRIORITY_AGENT):
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.priority = priority
+        self.cancel_event = cancel_event or threading.Event()
+        self._host_semaphores = {}
+        self._lock = threading.Lock()
+
+    def cancel(self):
+        """진행 중인 다운로드를 중단합니다."""
+        self.cancel_event.set()
+
+    def _host_slot(self, url):
+        host = urlsplit(url).netloc.lower()
+        with self._lock:
+            semaphore = self._host_semaphores.get(host)
+            if semaphore is None:
+                semaphore = threading.BoundedSemaphore(self.per_host_limit)
+                self._host_semaphores[host] = semaphore
+            return semaphore
+
+    def _run_job(self, index, job, report_progress, on_status):
+        """작업 하나 처리 (작업 스레드에서 실행)"""
+        result = {'index': index, 'job': job, 'status': 'failed', 'filename': None,
+                  'save_path': None, 'error': None}
+
+        if self.cancel_event.is_set():
+            result['status'] = 'cancelled'
+            return result
 
-    except Exception as e:
-        # 실패 시 임시 파일 삭제
-        if os.path.exists(temp_path):
-            try:
-                os.remove(temp_path)
-            except:
-                pass
-        raise Exception(f"다운로드 실패: {e}")
+        try:
+            # 1. 다운로드 정보
+            if on_status:
+                on_status(index, 'resolving')
+            if job.get('download_url'):
+                info = {'download_url': job['download_url'], 'filename': job.get('filename')}
+            elif job.get('resolve'):
+                info = job['resolve']()
+            else:
+                with self._host_slot(job['post_url']):
+                    info = get_download_info(job['post_url'])
+
+            if not info or not info.get('download_url'):
+                raise Exception("다운로드 링크 없음 (최근 확인됨)" if info and info.get('cached_miss')
+                                else "다운로드 링크 없음")
+
+            # 2. 파일명/저장 경로
+            filename = sanitize_filename(info.get('filename') or job.get('fallback_filename') or "download.ppt")
+            new_filename = f"{job.get('prefix', '')}{filename}"
+            save_path = os.path.join(job['save_dir'], new_filename)
+            result['filename'] = new_filename
+            result['save_path'] = save_path
+
+            if job.get('skip_existing', True) and os.path.exists(save_path):
+                result['status'] = 'exists'
+                report_progress(index, 100)
+                return result
+
+            # 3. 다운로드 (제목으로 만든 파일명이면 응답 헤더의 실제 파일명으로 저장)
+            def header_path(header_filename):
+                return os.path.join(job['save_dir'],
+                                    f"{job.get('prefix', '')}{sanitize_filename(header_filename)}")
+
+            if on_status:
+                on_status(index, 'downloading')
+            with self._host_slot(info['download_url']):
+                save_path = download_file(info['download_url'], save_path,
+                                          progress_callback=lambda percent: report_progress(index, percent),
+                                          cancel_event=self.cancel_event,
+                                          name_from_header=header_path if info.get('filename_guessed') else None,
+                                          priority=self.priority)
+
+            result['filename'] = os.path.basename(save_path)
+            result['save_path'] = save_path
+            result['status'] = 'done'
+            report_progress(index, 100)
+
+        except DownloadCancelled:
+            result['status'] = 'cancelled'
+        except Exception as e:
+            result['error'] = str(e)
+            report_progress(index, 100)  # 실패한 작업도 끝난 것으로 계산
+
+        return result
+
+    def run(self, jobs, on_complete=None, on_progress=None, on_status=None):
+        """
+        작업들을 동시에 실행하고 모두 끝날 때까지 기다립니다. (호출한 스레드를 막으므로 작업 스레드에서 호출)
+
+        Args:
+            jobs: 작업 dict 리스트
+            on_complete: 완료 콜백 (result) - 작업 순서대로, 호출한 스레드에서 실행
+                         result: {'index', 'job', 'status'('done'/'exists'/'failed'/'cancelled'),
+                                  'filename', 'save_path', 'error'}
+            on_progress: 전체 진행률 콜백 (percent) - 정수 값이 바뀔 때만 호출
+            on_status: 작업 상태 콜백 (index, 'resolving'/'downloading') - 작업 스레드에서 실행
+
+        Returns:
+            list: 작업 순서대로 정렬된 result 리스트
+        """
+        jobs = list(jobs)
+        if not jobs:
+            return []
+
+        progress = [0] * len(jobs)
+        last_reported = [-1]
+
+        def report_progress(index, percent):
+            with self._lock:
+                progress[index] = percent
+                overall = sum(progress) // len(progress)
+                if overall == last_reported[0]:
+                    return
+                last_reported[0] = overall
+            if on_progress:
+                on_progress(overall)
+
+        results = []
+        with ThreadPoolExecutor(max_workers=min(self.max_workers, len(jobs)),
+                                thread_name_prefix="download") as executor:
+            futures = [executor.submit(self._run_job, i, job, report_progress, on_status)
+                       for i, job in enumerate(jobs)]
+
+            # 순서대로 기다리면 완료 콜백도 작업 순서대로 전달됨
+            for future in futures:
+                result = future.result()
+                results.append(result)
+                if on_complete:
+                    on_complete(result)
+
+        return results
 
 
 def search_and_get_first(keyword):
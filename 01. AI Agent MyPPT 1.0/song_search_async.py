@@ -0,0 +1,124 @@
+"""
+song_search 비동기(asyncio) API
+검색/다운로드 정보/파일 다운로드를 코루틴으로 제공합니다.
+
+  - async_search_songs(keyword, sources)
+  - async_get_download_info(post_url)
+  - async_download_file(download_url, save_path)
+
+실제 요청은 song_search의 동기 함수가 공용 작업 풀에서 처리하고(http_client의 호스트별 연결 풀 공유),
+이벤트 루프는 대기만 하므로 여러 검색/다운로드를 한 루프에서 동시에 기다릴 수 있습니다.
+(aiohttp 같은 비동기 HTTP 라이브러리를 추가하지 않기 위한 구성)
+
+취소: 코루틴(Task)이 취소되면 진행 중인 작업에 중단 신호(cancel_event)를 보내고
+작업이 실제로 멈출 때까지 기다린 뒤 취소를 전달합니다.
+  - async_search_songs: 남은 사이트 검색은 다음 페이지 전에 멈춤 (작업 풀을 계속 차지하지 않음)
+  - async_download_file: 받던 파일은 이어받기 가능한 상태로 남음
+
+GUI 스레드에서는 get_runner().submit(코루틴)으로 백그라운드 이벤트 루프에 작업을 넘깁니다.
+"""
+
+import asyncio
+import functools
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+from song_search import search_songs, get_download_info, download_file, DownloadCancelled
+
+ASYNC_WORKERS = 8  # 동기 요청을 실제로 처리하는 작업 스레드 수
+
+_executor = ThreadPoolExecutor(max_workers=ASYNC_WORKERS, thread_name_prefix="song_async")
+
+_runner = None
+_runner_lock = threading.Lock()
+
+
+async def _run_blocking(func, *args, **kwargs):
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_executor, functools.partial(func, *args, **kwargs))
+
+
+async def _run_cancellable(func, *args, cancelled_errors=(), **kwargs):
+    """
+    cancel_event를 받는 동기 함수를 실행합니다.
+    Task가 취소되면 cancel_event를 설정하고 작업 스레드가 멈출 때까지 기다린 뒤 CancelledError를 전달합니다.
+    """
+    cancel_event = threading.Event()
+    loop = asyncio.get_running_loop()
+    future = loop.run_in_executor(_executor, functools.partial(func, *args, cancel_event=cancel_event, **kwargs))
+
+    try:
+        return await asyncio.shield(future)
+    except asyncio.CancelledError:
+        cancel_event.set()
+        try:
+            await future
+        except cancelled_errors:
+            pass
+        except Exception as e:
+            print(f"[{func.__name__}] 취소 중 오류: {e}")
+        raise
+
+
+async def async_search_songs(keyword, sources=None, **kwargs):
+    """
+    search_songs의 비동기 버전 (인자 동일)
+    Task가 취소되면 남은 사이트 검색을 멈추고 CancelledError를 전달합니다.
+
+    Returns:
+        list: 통합 검색 결과 리스트 [SearchResult, ...]
+    """
+    return await _run_cancellable(search_songs, keyword, sources=sources, **kwargs)
+
+
+async def async_get_download_info(post_url, use_cache=True):
+    """
+    get_download_info의 비동기 버전
+
+    Returns:
+        dict: {'download_url': ..., 'filename': ..., 'title': ..., 'filename_guessed': bool}
+    """
+    return await _run_blocking(get_download_info, post_url, use_cache=use_cache)
+
+
+async def async_download_file(download_url, save_path, progress_callback=None, **kwargs):
+    """
+    download_file의 비동기 버전 (progress_callback은 작업 스레드에서 호출됨)
+    Task가 취소되면 다운로드를 중단시키고, 작업 스레드가 멈춘 뒤 CancelledError를 전달합니다.
+
+    Returns:
+        str: 실제 저장된 파일 경로
+    """
+    return await _run_cancellable(download_file, download_url, save_path, progress_callback=progress_callback,
+                                  cancelled_errors=DownloadCancelled, **kwargs)
+
+
+class LoopRunner:
+    """백그라운드 스레드에서 도는 이벤트 루프 (GUI 스레드에서 코루틴을 실행할 때 사용)"""
+
+    def __init__(self):
+        self.loop = asyncio.new_event_loop()
+        self._thread = threading.Thread(target=self.loop.run_forever, name="song_async_loop", daemon=True)
+        self._thread.start()
+
+    def submit(self, coro):
+        """
+        코루틴을 루프에서 실행합니다.
+
+        Returns:
+            concurrent.futures.Future - cancel()로 코루틴 취소, add_done_callback으로 완료 확인
+        """
+        return asyncio.run_coroutine_threadsafe(coro, self.loop)
+
+    def stop(self):
+        self.loop.call_soon_threadsafe(self.loop.stop)
+        self._thread.join(timeout=5)
+
+
+def get_runner():
+    """공용 이벤트 루프 실행기 (처음 호출 시 시작)"""
+    global _runner
+    with _runner_lock:
+        if _runner is None:
+            _runner = LoopRunner()
+        return _runner
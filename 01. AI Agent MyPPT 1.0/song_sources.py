@@ -0,0 +1,375 @@
+"""
+검색 사이트 어댑터 모듈
+검색 사이트마다 다른 부분(검색 URL, 게시물 링크 형식, 결과 채택 조건, 점수)을 어댑터 클래스로 분리하고,
+이름 → 어댑터 등록부(registry)로 관리합니다.
+
+사이트별로 다음을 가집니다:
+  - 토큰 버킷 요청 제한: 일괄 검색 시 한 사이트에 요청이 몰리지 않도록 초당 요청 수 제한
+  - 회로 차단기: 연속으로 실패한 사이트는 대기 시간 동안 건너뜀
+    (응답 없는 사이트 때문에 찬송가마다 제한 시간을 기다리지 않도록)
+  - 검색 결과 여러 페이지: 확실한 결과(is_confident)가 나올 때까지만 다음 페이지를 요청 (최대 max_pages)
+  - 시간 예산: search(timeout)는 요청 한 번이 아니라 사이트 검색 전체(페이지 요청 + 요청 제한 대기)의 제한 시간
+
+새 사이트 추가: SourceAdapter를 상속해 name/base_url/search_url과 필요한 훅을 정의하고 register_source() 호출
+"""
+
+import re
+import threading
+import time
+from urllib.parse import quote, urljoin
+
+import requests
+
+import http_client
+from html_parser import parse_search_page
+from search_result import SearchResult, ResultSet
+
+# 검색 결과 공통 선택자 (Tistory 검색 결과 구조)
+RESULT_SELECTOR = '.searchList li, .search-result-item, article, .post-item'
+
+# 결과에서 제외할 제목 표기 (사용자 요청)
+EXCLUDED_TITLE_WORDS = ["통일찬송가", "배경없는", "무배경"]
+
+_registry = {}
+_registry_lock = threading.Lock()
+
+
+class TokenBucket:
+    """
+    토큰 버킷 요청 제한.
+    초당 rate개씩 토큰이 채워지고(최대 capacity개), 요청마다 토큰 1개를 사용합니다.
+    """
+
+    def __init__(self, rate, capacity):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self, timeout=None):
+        """
+        토큰을 얻을 때까지 기다립니다.
+
+        Returns:
+            bool: 얻었으면 True, timeout 안에 얻지 못하면 False
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return True
+                wait = (1 - self._tokens) / self.rate
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                wait = min(wait, remaining)
+            time.sleep(wait)
+
+
+class CircuitBreaker:
+    """
+    회로 차단기.
+    연속 실패가 failure_threshold회에 도달하면 cooldown초 동안 요청을 막고(open),
+    대기 후에는 한 번만 시험 요청을 허용합니다(half-open). 시험 요청이 성공하면 다시 정상(closed).
+    """
+
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half_open'
+
+    def __init__(self, failure_threshold=3, cooldown=120):
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.state = self.CLOSED
+        self._failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow(self):
+        """지금 요청을 보내도 되는지 여부"""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.cooldown:
+                self.state = self.HALF_OPEN
+                return True
+            # open(대기 중) 또는 half-open(시험 요청 진행 중)
+            return False
+
+    def is_blocked(self):
+        """상태를 바꾸지 않고 지금 막혀 있는지만 확인 (대기 중이거나 시험 요청 진행 중)"""
+        with self._lock:
+            if self.state == self.OPEN:
+                return time.monotonic() - self._opened_at < self.cooldown
+            return self.state == self.HALF_OPEN
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self._failures = 0
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self.state == self.HALF_OPEN or self._failures >= self.failure_threshold:
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+    def remaining_cooldown(self):
+        """차단 해제까지 남은 시간(초)"""
+        with self._lock:
+            if self.state != self.OPEN:
+                return 0
+            return max(0.0, self.cooldown - (time.monotonic() - self._opened_at))
+
+
+class SourceAdapter:
+    """
+    검색 사이트 어댑터 기본 클래스.
+    하위 클래스는 name, base_url, search_url(검색어 자리: {keyword})을 정의하고
+    필요하면 is_post_link / accept / score 훅을 재정의합니다.
+    """
+
+    name = None
+    base_url = None
+    search_url = None
+
+    # 공통 선택자로 결과를 못 찾았을 때 사용할 링크 선택자
+    fallback_selector = 'a[href*="/"]'
+
+    # 요청 제한 (초당 요청 수, 연속 허용 수)
+    rate_limit = 2.0
+    burst = 4
+
+    # 회로 차단기 (연속 실패 횟수, 차단 시간(초))
+    failure_threshold = 3
+    cooldown = 120
+
+    # 검색 결과 페이지 수 (확실한 결과가 없을 때만 다음 페이지 요청)
+    max_pages = 3
+
+    def __init__(self):
+        self.bucket = TokenBucket(self.rate_limit, self.burst)
+        self.breaker = CircuitBreaker(self.failure_threshold, self.cooldown)
+
+    def set_rate_limit(self, rate, burst=None):
+        """
+        요청 제한을 바꿉니다.
+
+        Args:
+            rate: 초당 요청 수 (None이면 제한 없음 - 벤치마크/재생 서버용)
+            burst: 연속 허용 수 (생략 시 클래스 기본값)
+        """
+        self.bucket = TokenBucket(rate, burst or self.burst) if rate else None
+
+    # --- 훅 ---
+
+    def build_search_url(self, keyword, page=1):
+        """검색 URL 생성 (2페이지부터 Tistory 검색의 ?page=N)"""
+        url = self.search_url.format(keyword=quote(keyword))
+        if page > 1:
+            url += f"?page={page}"
+        return url
+
+    def is_post_link(self, href):
+        """게시물 링크인지 (기본: 숫자로 끝나는 링크, 예: /2645)"""
+        return bool(re.search(r'/\d+$', href))
+
+    def accept(self, title, keyword):
+        """제목을 결과로 채택할지 (기본: 모두 채택)"""
+        return True
+
+    def score(self, title, keyword):
+        """관련도 점수 (낮을수록 좋음)"""
+        raise NotImplementedError
+
+    def is_confident(self, result, keyword):
+        """
+        더 찾아볼 필요가 없는 결과인지 (이런 결과가 있으면 다음 페이지를 요청하지 않음)
+        기본: 모든 결과를 확실한 것으로 보고 첫 페이지만 검색
+        """
+        return True
+
+    # --- 공통 처리 ---
+
+    def extract(self, html, keyword):
+        """
+        검색 결과 페이지 HTML에서 게시물 목록을 추출합니다. (네트워크 요청 없음)
+
+        Returns:
+            list: 점수순으로 정렬된 검색 결과 리스트 [SearchResult, ...]
+        """
+        results, _ = self._extract_page(html, keyword)
+        results.sort(key=lambda x: x.score)
+        return results
+
+    def _extract_page(self, html, keyword):
+        """
+        Returns:
+            (결과 리스트(페이지 순서), 게시물 링크 수) - 링크가 없으면 마지막 페이지를 지난 것
+        """
+        results = ResultSet()
+        post_links = 0
+
+        soup = parse_search_page(html)
+        articles = soup.select(RESULT_SELECTOR)
+        if not articles:
+            # 대체 선택자 시도
+            articles = soup.select(self.fallback_selector)
+
+        for article in articles:
+            try:
+                # 링크 찾기
+                link = article if article.name == 'a' else article.find('a')
+                if not link or not link.get('href'):
+                    continue
+
+                href = link.get('href')
+                if not self.is_post_link(href):
+                    continue
+                post_links += 1
+
+                full_url = urljoin(self.base_url, href)
+
+                # 제목 추출
+                title = link.get_text(strip=True)
+                if not title:
+                    title_elem = article.find(['h2', 'h3', '.title', '.tit'])
+                    if title_elem:
+                        title = title_elem.get_text(strip=True)
+
+                if not title or len(title) <= 3:  # 너무 짧은 제목 제외
+                    continue
+                if not self.accept(title, keyword):
+                    continue
+                if any(bad_word in title for bad_word in EXCLUDED_TITLE_WORDS):
+                    continue
+
+                # 중복 체크 (URL 색인)
+                if not results.contains_url(full_url):
+                    results.add(SearchResult(title, full_url, self.name, score=self.score(title, keyword)))
+            except Exception:
+                continue
+
+        return results.to_list(), post_links
+
+    def _fetch_page(self, keyword, page, timeout):
+        """
+        검색 결과 페이지 한 장 요청 (요청 제한 + 회로 차단기 적용)
+        토큰을 먼저 얻은 뒤 차단기에 허락을 받고(open → half-open 전환은 실제로 요청할 때만),
+        요청 결과는 예외 종류와 관계없이 차단기에 기록합니다. (half-open에 머무르지 않도록)
+        """
+        if self.breaker.is_blocked():
+            raise SourceUnavailable(self._blocked_message())
+        if self.bucket is not None and not self.bucket.acquire(timeout=timeout):
+            raise SourceUnavailable(f"{self.name} 요청 제한 대기 시간 초과")
+        if not self.breaker.allow():
+            raise SourceUnavailable(self._blocked_message())
+
+        succeeded = False
+        try:
+            response = http_client.get_cached(self.build_search_url(keyword, page), timeout=timeout)
+            response.raise_for_status()
+            succeeded = True
+            return response.text
+        finally:
+            if succeeded:
+                self.breaker.record_success()
+            else:
+                self.breaker.record_failure()
+
+    def _blocked_message(self):
+        cooldown = self.breaker.remaining_cooldown()
+        if cooldown:
+            return f"{self.name} 일시 차단 중 ({cooldown:.0f}초 후 재시도)"
+        return f"{self.name} 일시 차단 중 (시험 요청 진행 중)"
+
+    def search(self, keyword, raise_errors=False, timeout=http_client.DEFAULT_TIMEOUT, cancel_event=None):
+        """
+        사이트에서 검색합니다. (요청 제한 + 회로 차단기 적용)
+
+        Args:
+            keyword: 검색어
+            raise_errors: True면 네트워크 오류/차단 상태를 예외로 발생시킴
+            timeout: 사이트 검색 전체 제한 시간(초) - 여러 페이지 요청과 요청 제한 대기를 합친 시간
+                     (남은 시간이 다음 페이지 요청/토큰 대기의 제한 시간이 됨)
+            cancel_event: threading.Event - 설정되면 다음 페이지를 요청하지 않고 SearchCancelled 발생
+                          (새 검색으로 바뀐 이전 검색이 작업 풀을 계속 차지하지 않도록)
+
+        Returns:
+            list: 검색 결과 리스트 [SearchResult, ...]
+        """
+        results = ResultSet()
+        budget_end = time.monotonic() + timeout
+
+        for page in range(1, self.max_pages + 1):
+            if cancel_event is not None and cancel_event.is_set():
+                raise SearchCancelled(f"{self.name} 검색 취소")
+            remaining = budget_end - time.monotonic()
+            if page > 1 and remaining <= 0:
+                print(f"[{self.name}] 검색 시간 초과 - {page - 1}페이지까지의 결과 사용")
+                break
+            try:
+                html = self._fetch_page(keyword, page, max(remaining, 0.1))
+            except (requests.RequestException, SourceUnavailable) as e:
+                if page > 1:
+                    # 다음 페이지 실패는 앞 페이지 결과로 마무리
+                    print(f"[{self.name}] {page}페이지 검색 오류: {e}")
+                    break
+                if raise_errors:
+                    raise
+                print(f"[{self.name}] 검색 오류: {e}")
+                # 오류 발생해도 빈 결과 반환 (다른 소스 검색 계속)
+                return []
+
+            page_results, post_links = self._extract_page(html, keyword)
+            new_count = results.extend(page_results)
+
+            # 마지막 페이지를 지났거나(게시물 없음/같은 페이지 반복) 확실한 결과를 찾았으면 중단
+            if not post_links or (page > 1 and not new_count):
+                break
+            if any(self.is_confident(result, keyword) for result in results):
+                break
+
+        results = results.to_list()
+        results.sort(key=lambda x: x.score)
+        return results
+
+
+class SourceUnavailable(Exception):
+    """회로 차단기/요청 제한으로 사이트에 요청하지 않음"""
+
+
+class SearchCancelled(Exception):
+    """cancel_event로 검색이 취소됨 (결과가 없는 것이 아니므로 실패 캐시/검색 캐시에 기록하지 않음)"""
+
+
+def register_source(adapter):
+    """어댑터를 등록합니다. (같은 이름이면 교체)"""
+    with _registry_lock:
+        _registry[adapter.name] = adapter
+    return adapter
+
+
+def get_source(name):
+    """
+    이름으로 어댑터를 찾습니다.
+
+    Returns:
+        SourceAdapter 또는 None
+    """
+    with _registry_lock:
+        return _registry.get(name)
+
+
+def source_names():
+    """등록된 사이트 이름 목록 (등록 순서)"""
+    with _registry_lock:
+        return list(_registry)